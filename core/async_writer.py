@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+from queue import Queue, Full
+import numpy as np
+import cv2
+from loguru import logger
+
+
+class AsyncImageWriter:
+    """后台图像写入器，在工作线程中完成编码和写盘，避免阻塞游戏循环
+
+    队列已满或超出磁盘预算时直接丢弃并计数，submit永远不会阻塞。
+    """
+
+    def __init__(self, config=None, jpeg_quality=90):
+        """
+        Args:
+            config: 写入器配置（workers、queue_size、png_compression、max_disk_mb）
+            jpeg_quality: JPEG质量，由ScreenCapture按质量设置传入
+        """
+        self.config = config or {}
+        self.workers = self.config.get("workers", 2)  # 工作线程数
+        self.queue_size = self.config.get("queue_size", 16)  # 队列长度
+        self.png_compression = self.config.get("png_compression", 3)  # PNG压缩级别 0-9，越大越慢
+        self.jpeg_quality = jpeg_quality  # JPEG质量
+        max_disk_mb = self.config.get("max_disk_mb", 1024)  # 磁盘使用预算(MB)，0表示不限制
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024) if max_disk_mb else 0
+
+        self.queue = Queue(maxsize=self.queue_size)
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.written = 0
+        self.dropped_queue_full = 0
+        self.dropped_budget = 0
+        self.failed = 0
+        self.bytes_written = 0
+
+        self._threads = []
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"AsyncImageWriter-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        logger.info(f"异步图像写入器已启动，线程数: {self.workers}，队列长度: {self.queue_size}，PNG压缩级别: {self.png_compression}")
+
+    def _over_budget(self, extra=0):
+        return self.max_disk_bytes and self.bytes_written + extra > self.max_disk_bytes
+
+    def submit(self, image, filename):
+        """提交一张图像等待写入，不阻塞
+
+        Args:
+            image: BGR/灰度numpy数组、PIL图像或Frame对象，提交时会复制一份
+            filename: 目标文件路径，扩展名决定编码格式
+
+        Returns:
+            bool: 是否成功入队
+        """
+        with self.lock:
+            if self._over_budget():
+                self.dropped_budget += 1
+                return False
+
+        image = getattr(image, "image", image)
+        if isinstance(image, np.ndarray):
+            # 调用方可能复用该缓冲区，入队前复制
+            image = image.copy()
+        else:
+            # PIL图像为RGB格式
+            image = np.asarray(image.convert("RGB"))[:, :, ::-1].copy()
+
+        try:
+            self.queue.put_nowait((image, filename))
+        except Full:
+            with self.lock:
+                self.dropped_queue_full += 1
+            return False
+
+        with self.lock:
+            self.submitted += 1
+        return True
+
+    def _encode(self, image, filename):
+        """按扩展名编码图像"""
+        ext = os.path.splitext(filename)[1].lower() or ".png"
+        if ext == ".png":
+            params = [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression]
+        elif ext in (".jpg", ".jpeg"):
+            params = [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+        else:
+            params = []
+        ok, encoded = cv2.imencode(ext, image, params)
+        if not ok:
+            raise ValueError(f"图像编码失败: {filename}")
+        return encoded
+
+    def _worker(self):
+        """工作线程：编码并写盘"""
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                image, filename = item
+                encoded = self._encode(image, filename)
+
+                with self.lock:
+                    if self._over_budget(encoded.nbytes):
+                        self.dropped_budget += 1
+                        continue
+                    # 先占用预算，避免多个线程同时超出
+                    self.bytes_written += encoded.nbytes
+
+                directory = os.path.dirname(filename)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(filename, "wb") as f:
+                    f.write(encoded.tobytes())
+
+                with self.lock:
+                    self.written += 1
+            except Exception as e:
+                with self.lock:
+                    self.failed += 1
+                logger.error(f"异步写入图像失败: {e}")
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        """等待队列中的图像全部处理完成"""
+        self.queue.join()
+
+    def close(self):
+        """处理完剩余图像后停止工作线程"""
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        logger.info(f"异步图像写入器已停止，统计: {self.get_stats()}")
+
+    def get_stats(self):
+        """获取写入统计信息"""
+        with self.lock:
+            return {
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped_queue_full": self.dropped_queue_full,
+                "dropped_budget": self.dropped_budget,
+                "failed": self.failed,
+                "bytes_written": self.bytes_written,
+                "queued": self.queue.qsize(),
+            }
@@ -128,6 +128,8 @@ class BaseGameScript(ABC):
             self.image_recognition = ImageRecognition(
                 self.config.get("image_recognition", {})
             )
+            # 与屏幕捕获共用后台写入器
+            self.image_recognition.set_async_writer(self.screen_capture.async_writer)
 
             # 初始化窗口定位组件
             self.window_locator = WindowLocator()
@@ -199,6 +201,10 @@ class BaseGameScript(ABC):
         # 调用停止后钩子
         self.on_stop()
 
+        # 释放图像识别的批量匹配线程池
+        if getattr(self, "image_recognition", None) is not None:
+            self.image_recognition.close()
+
     def _main_loop(self):
         """
         主循环 - 集成智能垃圾回收
@@ -0,0 +1,600 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import glob
+import time
+import importlib
+import threading
+import numpy as np
+import cv2
+from PIL import Image
+from loguru import logger
+
+try:
+    from .screen_metrics import get_screen_metrics
+except ImportError:
+    # 处理独立运行时的导入
+    from core.screen_metrics import get_screen_metrics
+
+
+# 已注册的截图后端，名称 -> 后端类
+CAPTURE_BACKENDS = {}
+
+
+def register_capture_backend(name):
+    """注册截图后端的类装饰器，注册后即可在配置的capture_method中使用该名称"""
+    def decorator(cls):
+        cls.name = name
+        CAPTURE_BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def get_capture_backend(name):
+    """根据名称获取截图后端类
+
+    Args:
+        name: 已注册的后端名称，或"模块路径:类名"形式的外部后端
+
+    Returns:
+        后端类或None
+    """
+    if name in CAPTURE_BACKENDS:
+        return CAPTURE_BACKENDS[name]
+
+    if isinstance(name, str) and ":" in name:
+        module_name, class_name = name.split(":", 1)
+        try:
+            backend_cls = getattr(importlib.import_module(module_name), class_name)
+            CAPTURE_BACKENDS[name] = backend_cls
+            return backend_cls
+        except Exception as e:
+            logger.error(f"加载外部截图后端失败: {name}, {e}")
+    return None
+
+
+def has_display():
+    """当前进程能否访问真实显示器：Windows和macOS总是可以，其他系统需要X11或Wayland会话"""
+    if sys.platform.startswith("win") or sys.platform == "darwin":
+        return True
+    return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def _display_signature(metrics):
+    """根据系统报告的显示器布局和DPI缩放生成显示配置的标识，用作自动选择结果的缓存键"""
+    layout = ";".join(f"{m['width']}x{m['height']}+{m['left']}+{m['top']}@{m.get('dpi_scale', 1.0):g}"
+                      for m in metrics.monitors())
+    return f"{sys.platform}|{layout}"
+
+
+def _validate_frame(backend, frame, expected_size):
+    """检查后端返回的整屏画面尺寸和格式是否正确，返回错误描述，正确时返回None
+
+    Args:
+        expected_size: 参照的整屏尺寸 (宽, 高)，来自配置或与输入模块相同的系统显示器信息，
+                       不使用后端自己报告的尺寸，否则无法发现后端内部一致但与系统坐标不符的情况
+    """
+    if frame is None:
+        return "返回None"
+    if frame.dtype != np.uint8 or frame.ndim not in (2, 3):
+        return f"格式错误: dtype={frame.dtype}, shape={frame.shape}"
+    channels = {"BGRA": 4, "RGB": 3, "BGR": 3, "GRAY": 1}.get(backend.color_order)
+    if (frame.shape[2] if frame.ndim == 3 else 1) != channels:
+        return f"通道数与声明的{backend.color_order}不符: shape={frame.shape}"
+    size = (frame.shape[1], frame.shape[0])
+    # 抓到的像素尺寸与系统坐标不一致时（如系统缩放不是100%），识别结果换算到点击坐标会发生偏移
+    if expected_size and tuple(expected_size) != size:
+        return f"画面尺寸 {size} 与参照尺寸 {tuple(expected_size)} 不一致"
+    return None
+
+
+def benchmark_capture_backend(backend, duration=0.1, min_grabs=3, expected_size=None):
+    """对截图后端进行微基准测试
+
+    Returns:
+        (中位数抓取耗时秒数, None) 或 (None, 错误描述)
+    """
+    timings = []
+    deadline = time.perf_counter() + duration
+    while len(timings) < min_grabs or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        frame = backend.grab()
+        timings.append(time.perf_counter() - start)
+        if len(timings) == 1:
+            error = _validate_frame(backend, frame, expected_size)
+            if error:
+                return None, error
+    return float(np.median(timings)), None
+
+
+def _load_selection_cache(cache_file):
+    """读取自动选择结果的缓存文件"""
+    if not cache_file or not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"读取截图方法缓存失败: {e}")
+        return {}
+
+
+def select_capture_backend(config=None, metrics=None):
+    """为capture_method为"auto"时自动选择截图后端
+
+    依次创建候选后端并在短时间内测试抓取速度，校验整屏画面的尺寸和格式后选择最快的正确后端。
+    没有可用的显示器时跳过requires_display为True的候选后端。
+    画面尺寸以系统显示器信息（与输入模块换算坐标时使用的相同）为参照。
+    结果按显示配置缓存到磁盘，显示器布局和缩放不变时直接使用缓存，不创建任何后端。
+
+    配置项（screen_capture.auto）：
+        candidates: 候选后端名称列表
+        benchmark_seconds: 测试总时长（秒），平均分配给各候选后端
+        expected_size: 期望的整屏尺寸 [宽, 高]，null表示使用系统报告的虚拟桌面尺寸
+        cache_file: 缓存文件路径（相对路径相对于项目根目录），null表示不缓存
+
+    Args:
+        metrics: 屏幕信息服务，None表示使用进程内共享的实例
+
+    Returns:
+        后端名称，没有可用后端时返回"mss"
+    """
+    config = config or {}
+    auto_config = config.get("auto", {}) or {}
+    candidates = auto_config.get("candidates", ["mss", "pil", "pyautogui"])
+    duration = auto_config.get("benchmark_seconds", 0.3) / max(1, len(candidates))
+    cache_file = auto_config.get("cache_file", "cache/capture_backend.json")
+    if cache_file:
+        # 与模板目录一致，相对路径基于项目根目录而不是当前工作目录
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        cache_file = os.path.join(project_root, cache_file)
+    metrics = metrics or get_screen_metrics()
+    expected_size = auto_config.get("expected_size") or metrics.screen_size()
+
+    signature = _display_signature(metrics)
+    cache = _load_selection_cache(cache_file)
+    cached = cache.get(signature)
+    if cached and cached.get("backend") in candidates and get_capture_backend(cached["backend"]) is not None:
+        logger.info(f"使用缓存的截图方法: {cached['backend']}（显示配置: {signature}）")
+        return cached["backend"]
+
+    results = {}
+    display_available = has_display()
+    for name in candidates:
+        backend_cls = get_capture_backend(name)
+        if backend_cls is None:
+            logger.warning(f"自动选择截图方法时跳过未知后端: {name}")
+            continue
+        if backend_cls.requires_display and not display_available:
+            # 无显示器的环境（如CI、SSH会话）中这类后端创建或抓取会失败甚至阻塞，直接跳过
+            logger.info(f"没有可用的显示器，跳过截图后端: {name}")
+            continue
+        try:
+            backend = backend_cls(config)
+        except Exception as e:
+            logger.info(f"截图后端 {name} 不可用: {e}")
+            continue
+        try:
+            elapsed, error = benchmark_capture_backend(backend, duration, expected_size=expected_size)
+        except Exception as e:
+            elapsed, error = None, str(e)
+        finally:
+            try:
+                backend.close()
+            except Exception:
+                pass
+        if error:
+            logger.warning(f"截图后端 {name} 未通过校验: {error}")
+        else:
+            results[name] = elapsed
+            logger.info(f"截图后端 {name} 单帧耗时: {elapsed * 1000:.2f}ms")
+
+    if not results:
+        logger.warning("没有通过校验的截图后端，默认使用mss")
+        return "mss"
+
+    best = min(results, key=results.get)
+    logger.info(f"自动选择截图方法: {best}")
+    if cache_file:
+        cache[signature] = {"backend": best, "grab_ms": {k: v * 1000 for k, v in results.items()},
+                            "time": time.time()}
+        try:
+            directory = os.path.dirname(cache_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(cache_file, "w", encoding="utf-8") as f:
+                json.dump(cache, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.warning(f"保存截图方法缓存失败: {e}")
+    return best
+
+
+class CaptureBackend:
+    """截图后端基类
+
+    子类需要实现grab方法，返回指定区域的numpy数组，通道顺序由color_order声明。
+    区域monitor为mss风格的字典 {"left", "top", "width", "height"}，None表示整个屏幕。
+    """
+
+    name = None
+    color_order = "BGR"  # grab返回数组的通道顺序："BGRA"、"RGB"、"BGR"、"GRAY"
+    thread_safe = True  # 实例能否跨线程共享，不能共享时每个线程需要创建自己的实例
+    requires_display = True  # 是否需要真实显示器
+
+    def __init__(self, config=None):
+        self.config = config or {}
+
+    def grab(self, monitor=None):
+        """抓取指定区域，返回numpy数组（可能是只读视图），没有可用画面时返回None"""
+        raise NotImplementedError
+
+    def grab_image(self, monitor=None):
+        """抓取指定区域，返回RGB格式的PIL图像"""
+        img = self.grab(monitor)
+        if img is None:
+            return None
+        if img.ndim == 2:
+            return Image.fromarray(img).convert("RGB")
+        code = {
+            "BGRA": cv2.COLOR_BGRA2RGB,
+            "BGR": cv2.COLOR_BGR2RGB,
+        }.get(self.color_order)
+        return Image.fromarray(cv2.cvtColor(img, code) if code is not None else np.ascontiguousarray(img))
+
+    def monitors(self):
+        """返回显示器列表（mss格式，索引0为所有显示器组成的虚拟屏幕），不支持时返回空列表"""
+        return []
+
+    def monitor_count(self):
+        """获取连接的显示器数量"""
+        return max(1, len(self.monitors()) - 1)
+
+    def screen_size(self):
+        """获取屏幕尺寸 (width, height)，无法获取时返回None"""
+        monitors = self.monitors()
+        if monitors:
+            return (monitors[0]["width"], monitors[0]["height"])
+        return None
+
+    def close(self):
+        """释放后端资源"""
+        pass
+
+
+@register_capture_backend("mss")
+class MssBackend(CaptureBackend):
+    """基于mss库的截图后端，直接返回原始BGRA缓冲区的零拷贝视图"""
+
+    color_order = "BGRA"
+    thread_safe = False  # mss句柄不能跨线程共享
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        import mss
+        self.sct = mss.mss()
+        logger.info("使用mss库进行屏幕捕获")
+
+    def grab(self, monitor=None):
+        screenshot = self.sct.grab(monitor or self.sct.monitors[0])
+        width, height = screenshot.size
+        # 将mss的原始BGRA缓冲区包装为numpy视图（不复制数据）
+        return np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(height, width, 4)
+
+    def grab_image(self, monitor=None):
+        screenshot = self.sct.grab(monitor or self.sct.monitors[0])
+        return Image.frombytes("RGB", screenshot.size, screenshot.rgb)
+
+    def monitors(self):
+        return self.sct.monitors
+
+    def close(self):
+        self.sct.close()
+
+
+@register_capture_backend("pil")
+class PilBackend(CaptureBackend):
+    """基于PIL ImageGrab的截图后端"""
+
+    color_order = "RGB"
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        # PIL方式不需要特殊初始化
+        logger.info("使用PIL库进行屏幕捕获")
+
+    def grab(self, monitor=None):
+        return np.asarray(self.grab_image(monitor))
+
+    def grab_image(self, monitor=None):
+        from PIL import ImageGrab
+
+        if monitor is None:
+            # 全屏捕获
+            return ImageGrab.grab(all_screens=True)
+        # 区域捕获
+        x1, y1 = monitor["left"], monitor["top"]
+        return ImageGrab.grab(bbox=(x1, y1, x1 + monitor["width"], y1 + monitor["height"]))
+
+    def screen_size(self):
+        # 虚拟桌面尺寸与ImageGrab.grab(all_screens=True)一致，通过系统查询获得，无需截图
+        return get_screen_metrics().screen_size()
+
+
+@register_capture_backend("pyautogui")
+class PyAutoGuiBackend(CaptureBackend):
+    """基于pyautogui的截图后端"""
+
+    color_order = "RGB"
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        import pyautogui
+        # 禁用pyautogui的安全检查
+        pyautogui.FAILSAFE = False
+        self.pyautogui = pyautogui
+        logger.info("使用pyautogui库进行屏幕捕获")
+
+    def grab(self, monitor=None):
+        return np.asarray(self.grab_image(monitor))
+
+    def grab_image(self, monitor=None):
+        if monitor is None:
+            # 全屏捕获
+            return self.pyautogui.screenshot()
+        # 区域捕获
+        return self.pyautogui.screenshot(region=(monitor["left"], monitor["top"], monitor["width"], monitor["height"]))
+
+    def monitor_count(self):
+        return len(self.pyautogui.screens()) if hasattr(self.pyautogui, "screens") else 1
+
+    def screen_size(self):
+        return tuple(self.pyautogui.size())
+
+
+class _PngDirectorySource:
+    """图片目录回放源，按文件名排序依次回放"""
+
+    def __init__(self, path, fps):
+        patterns = ("*.png", "*.jpg", "*.jpeg", "*.bmp")
+        self.files = sorted(f for pattern in patterns for f in glob.glob(os.path.join(path, pattern)))
+        self.fps = fps
+        self.color_order = "BGR"
+        self._cached_index = -1
+        self._cached_image = None
+
+    def __len__(self):
+        return len(self.files)
+
+    def timestamp(self, index):
+        """帧相对于第一帧的时间（秒）"""
+        return index / self.fps
+
+    def read(self, index):
+        if index != self._cached_index:
+            self._cached_image = cv2.imread(self.files[index], cv2.IMREAD_COLOR)
+            self._cached_index = index
+        return self._cached_image
+
+
+class _NpySource:
+    """内存映射的原始帧回放源，文件为形状 (N, H, W[, C]) 的.npy数组"""
+
+    def __init__(self, path, fps, color_order):
+        self.frames = np.load(path, mmap_mode="r")
+        self.fps = fps
+        self.color_order = "GRAY" if self.frames.ndim == 3 else color_order
+
+    def __len__(self):
+        return len(self.frames)
+
+    def timestamp(self, index):
+        return index / self.fps
+
+    def read(self, index):
+        # 内存映射视图，访问第N帧无需读取其他帧
+        return self.frames[index]
+
+
+class _ArchiveSource:
+    """帧归档回放源，按录制时的时间戳回放"""
+
+    def __init__(self, path, fps):
+        try:
+            from .frame_archive import FrameArchiveReader
+        except ImportError:
+            from core.frame_archive import FrameArchiveReader
+        self.archive = FrameArchiveReader(path)
+        duration = self.archive.timestamp(len(self.archive) - 1) if len(self.archive) > 1 else 0
+        # 用录制的平均帧间隔估计帧率，用于计算最后一帧的显示时长
+        self.fps = (len(self.archive) - 1) / duration if duration > 0 else fps
+        channels = int(self.archive.index["channels"][0]) if len(self.archive) else 3
+        self.color_order = "GRAY" if channels == 1 else "BGR"
+
+    def __len__(self):
+        return len(self.archive)
+
+    def timestamp(self, index):
+        return self.archive.timestamp(index)
+
+    def read(self, index):
+        return self.archive.read(index)
+
+
+class _VideoSource:
+    """视频文件回放源"""
+
+    def __init__(self, path, fps):
+        self.path = path
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise IOError(f"无法打开视频文件: {path}")
+        self.length = int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or fps
+        self.color_order = "BGR"
+        self._position = 0  # 下一次read()将读取的帧索引
+        self._cached_index = -1
+        self._cached_image = None
+
+    def __len__(self):
+        return self.length
+
+    def timestamp(self, index):
+        return index / self.fps
+
+    def read(self, index):
+        if index == self._cached_index:
+            return self._cached_image
+
+        if index < self._position or index - self._position > self.fps:
+            # 向后跳转或跨度较大时直接定位
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+            self._position = index
+        while self._position < index:
+            # 小跨度向前时跳过中间帧而不解码
+            self.capture.grab()
+            self._position += 1
+
+        ok, image = self.capture.read()
+        self._position += 1
+        if not ok:
+            return None
+        self._cached_index = index
+        self._cached_image = image
+        return image
+
+    def close(self):
+        self.capture.release()
+
+
+@register_capture_backend("replay")
+class ReplayBackend(CaptureBackend):
+    """回放截图后端，从图片目录、内存映射原始帧文件、帧归档或视频文件提供画面，无需显示器
+
+    配置项（screen_capture.replay）：
+        source: 回放源路径（图片目录、.npy文件、帧归档文件或视频文件）
+        source_type: 源类型 "auto"、"png_dir"、"npy"、"archive"、"video"
+        mode: "realtime" 按录制时间轴回放（可用speed加速），"step" 每次抓取返回下一帧
+        speed: realtime模式下的回放倍速
+        fps: 源中没有时间信息时使用的帧率
+        loop: 回放结束后是否从头循环
+        color_order: .npy源的通道顺序
+    """
+
+    requires_display = False
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        replay_config = self.config.get("replay", self.config) or {}
+        self.source_path = replay_config.get("source")
+        self.mode = replay_config.get("mode", "realtime")
+        self.speed = replay_config.get("speed", 1.0)
+        self.loop = replay_config.get("loop", False)
+        fps = replay_config.get("fps", 30)
+
+        if not self.source_path:
+            raise ValueError("回放后端需要配置replay.source")
+
+        self.source = self._open_source(self.source_path, replay_config.get("source_type", "auto"), fps,
+                                        replay_config.get("color_order", "BGR"))
+        if len(self.source) == 0:
+            raise ValueError(f"回放源中没有帧: {self.source_path}")
+        self.color_order = self.source.color_order
+
+        self.lock = threading.Lock()
+        self._next_index = 0
+        self._start_time = None
+        self._finished = False
+
+        first = self.source.read(0)
+        self.frame_height, self.frame_width = first.shape[:2]
+
+        logger.info(f"使用回放源进行屏幕捕获: {self.source_path}，共 {len(self.source)} 帧，模式: {self.mode}，倍速: {self.speed}")
+
+    def _open_source(self, path, source_type, fps, color_order):
+        """根据路径和类型打开回放源"""
+        if source_type == "auto":
+            if os.path.isdir(path):
+                source_type = "png_dir"
+            elif path.lower().endswith(".npy"):
+                source_type = "npy"
+            elif os.path.exists(path + ".idx"):
+                source_type = "archive"
+            else:
+                source_type = "video"
+
+        if source_type == "png_dir":
+            return _PngDirectorySource(path, fps)
+        if source_type == "npy":
+            return _NpySource(path, fps, color_order)
+        if source_type == "archive":
+            return _ArchiveSource(path, fps)
+        if source_type == "video":
+            return _VideoSource(path, fps)
+        raise ValueError(f"未知的回放源类型: {source_type}")
+
+    def _current_index(self):
+        """计算本次抓取应返回的帧索引，回放结束时返回None"""
+        count = len(self.source)
+
+        if self.mode == "step":
+            if self._next_index >= count:
+                if not self.loop:
+                    return None
+                self._next_index = 0
+            index = self._next_index
+            self._next_index += 1
+            return index
+
+        now = time.perf_counter()
+        if self._start_time is None:
+            self._start_time = now
+        elapsed = (now - self._start_time) * self.speed
+
+        duration = self.source.timestamp(count - 1) + 1.0 / self.source.fps
+        if elapsed >= duration:
+            if not self.loop:
+                return None
+            self._start_time = now
+            self._next_index = 0
+            elapsed = 0.0
+
+        # 在时间轴上找到当前时刻正在显示的帧
+        index = self._next_index
+        while index + 1 < count and self.source.timestamp(index + 1) <= elapsed:
+            index += 1
+        self._next_index = index
+        return index
+
+    def grab(self, monitor=None):
+        with self.lock:
+            index = self._current_index()
+            if index is None:
+                if not self._finished:
+                    logger.info("回放已结束")
+                    self._finished = True
+                return None
+            image = self.source.read(index)
+
+        if image is None or monitor is None:
+            return image
+        # 回放画面的左上角视为屏幕原点
+        x1, y1 = monitor["left"], monitor["top"]
+        return image[y1:y1 + monitor["height"], x1:x1 + monitor["width"]]
+
+    def rewind(self):
+        """重新从第一帧开始回放"""
+        with self.lock:
+            self._next_index = 0
+            self._start_time = None
+            self._finished = False
+
+    def monitors(self):
+        screen = {"left": 0, "top": 0, "width": self.frame_width, "height": self.frame_height}
+        return [screen, dict(screen)]
+
+    def close(self):
+        if hasattr(self.source, "close"):
+            self.source.close()
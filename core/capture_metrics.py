@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+
+
+class LatencyHistogram:
+    """HDR风格的延迟直方图
+
+    按2的幂分组，每组再线性划分为2^precision_bits个子桶，记录为O(1)且内存固定，
+    任意分位数的相对误差不超过1/2^precision_bits。数值单位为纳秒。
+    """
+
+    def __init__(self, precision_bits=4, max_value=1 << 40):
+        """
+        Args:
+            precision_bits: 每个数量级的子桶位数，4表示相对误差约6%
+            max_value: 可记录的最大值，超出时按最大值计（默认约18分钟）
+        """
+        self.precision_bits = precision_bits
+        self.sub_count = 1 << precision_bits
+        self.max_value = max_value
+        self.counts = [0] * (self._index(max_value) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value):
+        """数值所在的桶下标"""
+        if value < self.sub_count:
+            return value
+        shift = value.bit_length() - self.precision_bits - 1
+        return (shift + 1) * self.sub_count + (value >> shift) - self.sub_count
+
+    def _bucket_high(self, index):
+        """桶内可记录的最大值"""
+        if index < self.sub_count:
+            return index
+        shift = index // self.sub_count - 1
+        sub = index % self.sub_count + self.sub_count
+        return ((sub + 1) << shift) - 1
+
+    def record(self, value):
+        """记录一个数值（纳秒）"""
+        value = min(max(int(value), 0), self.max_value)
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        """获取分位数（q为0-100），返回所在桶的上界，不超过实际最大值"""
+        if not self.count:
+            return 0
+        target = max(1, int(self.count * q / 100.0 + 0.5))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self._bucket_high(index), self.max)
+        return self.max
+
+    def summary(self):
+        """汇总统计，单位为毫秒"""
+        to_ms = 1e-6
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * to_ms if self.count else 0.0,
+            "min_ms": (self.min or 0) * to_ms,
+            "p50_ms": self.percentile(50) * to_ms,
+            "p90_ms": self.percentile(90) * to_ms,
+            "p99_ms": self.percentile(99) * to_ms,
+            "p999_ms": self.percentile(99.9) * to_ms,
+            "max_ms": self.max * to_ms,
+        }
+
+
+class CaptureMetrics:
+    """截图流水线指标：按阶段和后端记录延迟直方图，并统计失败和空结果次数
+
+    阶段：sleep（节拍等待）、grab（后端抓取）、convert（颜色转换）、resize（缩放）、total（单帧总耗时）
+    """
+
+    STAGES = ("sleep", "grab", "convert", "resize", "total")
+
+    def __init__(self, enabled=True, precision_bits=4):
+        self.enabled = enabled
+        self.precision_bits = precision_bits
+        self.lock = threading.Lock()
+        self._histograms = {}  # (阶段, 后端) -> LatencyHistogram
+        self._counters = {}  # (计数项, 后端) -> 次数
+
+    def record(self, stage, backend, elapsed_ns):
+        """记录某阶段的耗时（纳秒）"""
+        if not self.enabled:
+            return
+        key = (stage, backend)
+        with self.lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram(self.precision_bits)
+            histogram.record(elapsed_ns)
+
+    def increment(self, counter, backend, amount=1):
+        """累加计数项，如failures（抓取异常）、none（返回None）"""
+        if not self.enabled:
+            return
+        key = (counter, backend)
+        with self.lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def get_metrics(self):
+        """获取指标快照
+
+        Returns:
+            {"enabled": bool,
+             "stages": {阶段: {后端: 直方图汇总}},
+             "counters": {计数项: {后端: 次数}}}
+        """
+        with self.lock:
+            stages = {}
+            for (stage, backend), histogram in self._histograms.items():
+                stages.setdefault(stage, {})[backend] = histogram.summary()
+            counters = {}
+            for (counter, backend), value in self._counters.items():
+                counters.setdefault(counter, {})[backend] = value
+        return {"enabled": self.enabled, "stages": stages, "counters": counters}
+
+    def reset(self):
+        """清空所有指标"""
+        with self.lock:
+            self._histograms.clear()
+            self._counters.clear()
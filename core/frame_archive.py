@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import mmap
+import threading
+import numpy as np
+from loguru import logger
+
+try:
+    from .screen_capture import Frame
+except ImportError:
+    # 处理独立运行时的导入
+    from core.screen_capture import Frame
+
+
+# 帧归档格式：
+#   数据文件：64字节头部 + 按64字节对齐依次追加的原始像素数据，按块预分配并内存映射写入
+#   索引文件（数据文件名 + ".idx"）：每帧一条定长记录，写入一帧后立即追加，进程崩溃时已写入的帧仍可读取
+ARCHIVE_MAGIC = b"SFAR"
+ARCHIVE_VERSION = 1
+_HEADER_SIZE = 64
+_ALIGNMENT = 64
+INDEX_DTYPE = np.dtype([
+    ("offset", np.uint64),  # 像素数据在数据文件中的偏移
+    ("nbytes", np.uint64),
+    ("seq", np.uint64),  # 帧序列号
+    ("timestamp_ns", np.int64),  # 捕获时间
+    ("height", np.uint32),
+    ("width", np.uint32),
+    ("channels", np.uint32),
+    ("region", np.int32, (4,)),  # 捕获区域 (x1, y1, x2, y2)，无区域时为全-1
+    ("scale_factor", np.float64),
+])
+
+
+def index_path(path):
+    """归档文件对应的索引文件路径"""
+    return path + ".idx"
+
+
+class FrameArchiveWriter:
+    """帧归档写入器，将帧及元数据追加到分块内存映射的归档文件"""
+
+    def __init__(self, path, chunk_mb=64):
+        """
+        Args:
+            path: 归档数据文件路径
+            chunk_mb: 每次扩展文件并映射的块大小(MB)
+        """
+        self.path = path
+        granularity = mmap.ALLOCATIONGRANULARITY
+        self.chunk_size = max(granularity, int(chunk_mb * 1024 * 1024) // granularity * granularity)
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._file = open(path, "w+b")
+        self._index_file = open(index_path(path), "wb")
+        header = bytearray(_HEADER_SIZE)
+        header[:4] = ARCHIVE_MAGIC
+        header[4:8] = ARCHIVE_VERSION.to_bytes(4, "little")
+        self._file.write(header)
+        self._file.flush()
+
+        self._offset = _HEADER_SIZE  # 下一帧写入的文件偏移
+        self._chunk_start = 0
+        self._chunk_map = None
+        self._chunk_view = None
+        self.frame_count = 0
+        self._map_chunk(0, self.chunk_size)
+
+        logger.info(f"帧归档已创建: {path}，分块大小: {self.chunk_size / 1024 / 1024:.0f}MB")
+
+    def _map_chunk(self, start, length):
+        """扩展文件并映射从start开始的一个块"""
+        self._release_chunk()
+        if os.fstat(self._file.fileno()).st_size < start + length:
+            self._file.truncate(start + length)
+        self._chunk_map = mmap.mmap(self._file.fileno(), length, offset=start)
+        self._chunk_view = np.frombuffer(self._chunk_map, dtype=np.uint8)
+        self._chunk_start = start
+
+    def _release_chunk(self):
+        if self._chunk_map is not None:
+            self._chunk_view = None
+            self._chunk_map.flush()
+            self._chunk_map.close()
+            self._chunk_map = None
+
+    def append(self, frame):
+        """追加一帧
+
+        Args:
+            frame: Frame对象，image需为numpy数组
+        """
+        image = np.ascontiguousarray(frame.image)
+        nbytes = image.nbytes
+
+        with self.lock:
+            offset = self._offset
+            chunk_end = self._chunk_start + len(self._chunk_view)
+            if offset + nbytes > chunk_end:
+                # 当前块放不下，从下一个块边界开始映射，单帧超过块大小时映射更大的块
+                granularity = mmap.ALLOCATIONGRANULARITY
+                start = offset // granularity * granularity
+                length = max(self.chunk_size, -(-(offset - start + nbytes) // granularity) * granularity)
+                self._map_chunk(start, length)
+
+            local = offset - self._chunk_start
+            self._chunk_view[local:local + nbytes] = image.reshape(-1)
+
+            record = np.zeros((), dtype=INDEX_DTYPE)
+            record["offset"] = offset
+            record["nbytes"] = nbytes
+            record["seq"] = frame.seq
+            record["timestamp_ns"] = frame.timestamp_ns
+            record["height"], record["width"] = image.shape[:2]
+            record["channels"] = image.shape[2] if image.ndim == 3 else 1
+            record["region"] = frame.region if frame.region is not None else (-1, -1, -1, -1)
+            record["scale_factor"] = frame.scale_factor
+            self._index_file.write(record.tobytes())
+            self._index_file.flush()
+
+            self._offset = (offset + nbytes + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+            self.frame_count += 1
+
+    def close(self):
+        """写回映射并将数据文件截断到实际大小"""
+        with self.lock:
+            if self._file is None:
+                return
+            self._release_chunk()
+            self._file.truncate(self._offset)
+            self._file.close()
+            self._index_file.close()
+            self._file = None
+        logger.info(f"帧归档已关闭: {self.path}，共 {self.frame_count} 帧")
+
+
+class FrameArchiveReader:
+    """帧归档读取器，通过内存映射随机访问任意帧而无需读取其他帧"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(_HEADER_SIZE)
+        if header[:4] != ARCHIVE_MAGIC:
+            raise ValueError(f"不是帧归档文件: {path}")
+
+        self.index = np.fromfile(index_path(path), dtype=INDEX_DTYPE)
+        self.data = np.memmap(path, dtype=np.uint8, mode="r")
+        self._start_ns = int(self.index["timestamp_ns"][0]) if len(self.index) else 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def timestamp(self, index):
+        """帧相对于第一帧的时间（秒）"""
+        return (int(self.index["timestamp_ns"][index]) - self._start_ns) / 1e9
+
+    def read(self, index):
+        """读取第index帧的像素（只读的内存映射视图）"""
+        record = self.index[index]
+        offset, nbytes = int(record["offset"]), int(record["nbytes"])
+        height, width, channels = int(record["height"]), int(record["width"]), int(record["channels"])
+        shape = (height, width) if channels == 1 else (height, width, channels)
+        return self.data[offset:offset + nbytes].reshape(shape)
+
+    def read_frame(self, index):
+        """读取第index帧，返回带原始元数据的Frame"""
+        record = self.index[index]
+        region = tuple(int(v) for v in record["region"])
+        return Frame(self.read(index), int(record["seq"]), int(record["timestamp_ns"]),
+                     None if region == (-1, -1, -1, -1) else region, float(record["scale_factor"]))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.read_frame(index)
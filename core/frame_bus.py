@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import threading
+import numpy as np
+from multiprocessing import shared_memory
+from loguru import logger
+
+try:
+    from .screen_capture import Frame
+except ImportError:
+    # 处理独立运行时的导入
+    from core.screen_capture import Frame
+
+
+# 共享内存布局：总头部 + slots个槽位，每个槽位为槽位头部 + 像素数据
+_BUS_MAGIC = 0x53464255  # "SFBU"
+_BUS_HEADER_DTYPE = np.dtype([
+    ("magic", np.uint32),
+    ("slot_count", np.uint32),
+    ("slot_capacity", np.uint64),  # 每个槽位可容纳的像素字节数
+    ("write_count", np.uint64),  # 已写入的帧数
+    ("latest_slot", np.int64),  # 最新帧所在槽位，-1表示尚无帧
+    ("tracker_id", np.uint64),  # 写入进程使用的资源跟踪器标识，0表示未知
+], align=True)
+_SLOT_HEADER_DTYPE = np.dtype([
+    ("lock", np.uint64),  # 顺序锁计数，奇数表示正在写入
+    ("seq", np.uint64),  # 帧序列号
+    ("timestamp_ns", np.int64),  # 捕获时间
+    ("height", np.uint32),
+    ("width", np.uint32),
+    ("channels", np.uint32),
+    ("region", np.int32, (4,)),  # 捕获区域 (x1, y1, x2, y2)，无区域时为全-1
+    ("scale_factor", np.float64),
+], align=True)
+_HEADER_SIZE = 64
+_SLOT_HEADER_SIZE = 64
+
+
+def _resource_tracker_id():
+    """当前进程使用的资源跟踪器的标识（其通信管道的inode）
+    
+    由同一进程通过multiprocessing派生的子进程（spawn、fork、forkserver）继承同一个跟踪器，标识相同。
+    只有POSIX系统会跟踪共享内存，其他系统返回0。
+    """
+    if os.name != "posix":
+        return 0
+    try:
+        from multiprocessing import resource_tracker
+        return os.fstat(resource_tracker.getfd()).st_ino
+    except Exception:
+        return 0
+
+
+def _attach_shared_memory(name):
+    """以只连接、不负责清理的方式打开已存在的共享内存
+    
+    Returns:
+        (shm, tracked): tracked为True表示旧版本Python在连接时将共享内存登记到了当前进程的资源跟踪器
+    """
+    try:
+        # Python 3.13+ 可直接关闭资源跟踪
+        return shared_memory.SharedMemory(name=name, track=False), False
+    except TypeError:
+        return shared_memory.SharedMemory(name=name), os.name == "posix"
+
+
+def _release_tracking(shm, writer_tracker_id):
+    """取消读取端在旧版本Python上对共享内存的跟踪登记
+    
+    读取进程使用自己的资源跟踪器时，进程退出后跟踪器会删除仍在使用的共享内存，需要取消登记；
+    与写入进程共享同一个跟踪器时（如由写入进程派生的子进程），登记的是写入端的同一条记录，
+    取消会使写入端关闭时跟踪器报KeyError、写入进程崩溃时共享内存无人清理，因此保留。
+    """
+    if writer_tracker_id and writer_tracker_id == _resource_tracker_id():
+        return False
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return True
+
+
+class _FrameBusLayout:
+    """在共享内存上建立头部和槽位的numpy视图"""
+
+    def __init__(self, shm, slot_count, slot_capacity):
+        self.shm = shm
+        self.slot_count = slot_count
+        self.slot_capacity = slot_capacity
+        self.slot_stride = _SLOT_HEADER_SIZE + slot_capacity
+
+        self.header = np.ndarray((), dtype=_BUS_HEADER_DTYPE, buffer=shm.buf, offset=0)
+        self.slot_headers = []
+        self.slot_data = []
+        for index in range(slot_count):
+            offset = _HEADER_SIZE + index * self.slot_stride
+            self.slot_headers.append(np.ndarray((), dtype=_SLOT_HEADER_DTYPE, buffer=shm.buf, offset=offset))
+            self.slot_data.append(np.ndarray((slot_capacity,), dtype=np.uint8, buffer=shm.buf,
+                                             offset=offset + _SLOT_HEADER_SIZE))
+
+    def release(self):
+        """释放对共享内存的引用，之后才能关闭共享内存"""
+        self.header = None
+        self.slot_headers = []
+        self.slot_data = []
+
+
+class FrameBusWriter:
+    """基于共享内存的帧总线写入端
+
+    由捕获进程创建，将每帧写入小型环形槽位；任意数量的读取进程可以零拷贝地读取。
+    每个槽位使用顺序锁（seqlock）：写入前后各递增一次计数，读取方据此检测读取期间是否被覆盖。
+    """
+
+    def __init__(self, name=None, slots=4, max_frame_bytes=1920 * 1080 * 3):
+        """
+        Args:
+            name: 共享内存名称，None表示自动生成（可通过self.name获取后传给读取进程）
+            slots: 槽位数
+            max_frame_bytes: 单帧最大字节数
+        """
+        slot_capacity = (max_frame_bytes + 63) // 64 * 64
+        size = _HEADER_SIZE + slots * (_SLOT_HEADER_SIZE + slot_capacity)
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = self.shm.name
+        self.layout = _FrameBusLayout(self.shm, slots, slot_capacity)
+
+        header = self.layout.header
+        header["magic"] = _BUS_MAGIC
+        header["slot_count"] = slots
+        header["slot_capacity"] = slot_capacity
+        header["write_count"] = 0
+        header["latest_slot"] = -1
+        # 共享内存由写入进程的资源跟踪器负责，写入进程崩溃时也会被清理
+        header["tracker_id"] = _resource_tracker_id()
+
+        self.lock = threading.Lock()  # 同一进程内多个线程写入时串行化
+        self.frames_skipped = 0  # 超出槽位容量而未写入的帧数
+        logger.info(f"帧总线已创建: {self.name}，槽位数: {slots}，单帧容量: {slot_capacity / 1024 / 1024:.1f}MB")
+
+    def write(self, frame):
+        """写入一帧
+
+        Args:
+            frame: Frame对象或numpy数组
+
+        Returns:
+            bool: 是否写入成功
+        """
+        image = frame.image if isinstance(frame, Frame) else frame
+        if image.nbytes > self.layout.slot_capacity:
+            self.frames_skipped += 1
+            logger.warning(f"帧大小 {image.nbytes} 超出帧总线槽位容量 {self.layout.slot_capacity}，已跳过")
+            return False
+
+        with self.lock:
+            self._write_slot(frame, image)
+        return True
+
+    def _write_slot(self, frame, image):
+        """按顺序锁协议将帧写入下一个槽位"""
+        header = self.layout.header
+        index = int(header["write_count"] % self.layout.slot_count)
+        slot = self.layout.slot_headers[index]
+
+        # 计数变为奇数，读取方看到后会重试
+        slot["lock"] += 1
+        self.layout.slot_data[index][:image.nbytes] = np.ascontiguousarray(image).reshape(-1)
+        slot["height"], slot["width"] = image.shape[:2]
+        slot["channels"] = image.shape[2] if image.ndim == 3 else 1
+        if isinstance(frame, Frame):
+            slot["seq"] = frame.seq
+            slot["timestamp_ns"] = frame.timestamp_ns
+            slot["region"] = frame.region if frame.region is not None else (-1, -1, -1, -1)
+            slot["scale_factor"] = frame.scale_factor
+        else:
+            slot["seq"] = int(header["write_count"]) + 1
+            slot["timestamp_ns"] = time.perf_counter_ns()
+            slot["region"] = (-1, -1, -1, -1)
+            slot["scale_factor"] = 1.0
+        # 计数恢复为偶数，写入完成
+        slot["lock"] += 1
+
+        header["latest_slot"] = index
+        header["write_count"] += 1
+
+    def close(self, unlink=True):
+        """关闭帧总线，unlink为True时同时删除共享内存"""
+        self.layout.release()
+        self.shm.close()
+        if unlink:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class FrameBusReader:
+    """基于共享内存的帧总线读取端，可在任意进程中按名称连接"""
+
+    def __init__(self, name, max_retries=100):
+        self.shm, tracked = _attach_shared_memory(name)
+        self.name = name
+        self.max_retries = max_retries
+
+        header = np.ndarray((), dtype=_BUS_HEADER_DTYPE, buffer=self.shm.buf, offset=0)
+        if int(header["magic"]) != _BUS_MAGIC:
+            if tracked:
+                _release_tracking(self.shm, 0)
+            self.shm.close()
+            raise ValueError(f"共享内存 {name} 不是帧总线")
+        slot_count, slot_capacity = int(header["slot_count"]), int(header["slot_capacity"])
+        # 是否与写入进程共享资源跟踪器（共享时共享内存的清理完全由写入端负责）
+        self.shares_writer_tracker = tracked and not _release_tracking(self.shm, int(header["tracker_id"]))
+        del header
+        self.layout = _FrameBusLayout(self.shm, slot_count, slot_capacity)
+        self._buffer = None
+
+    def _slot_frame(self, index):
+        """根据槽位头部构造指向共享内存的Frame视图"""
+        slot = self.layout.slot_headers[index]
+        height, width, channels = int(slot["height"]), int(slot["width"]), int(slot["channels"])
+        shape = (height, width) if channels == 1 else (height, width, channels)
+        image = self.layout.slot_data[index][:height * width * channels].reshape(shape)
+        region = tuple(int(v) for v in slot["region"])
+        return Frame(image, int(slot["seq"]), int(slot["timestamp_ns"]),
+                     None if region == (-1, -1, -1, -1) else region, float(slot["scale_factor"]))
+
+    def view_latest(self, min_seq=None):
+        """零拷贝地获取最新帧
+
+        返回的图像直接指向共享内存，处理完成后应调用is_valid(ticket)确认期间未被写入端覆盖。
+
+        Args:
+            min_seq: 只返回序列号大于该值的帧
+
+        Returns:
+            (Frame, ticket) 或 (None, None)
+        """
+        for _ in range(self.max_retries):
+            index = int(self.layout.header["latest_slot"])
+            if index < 0:
+                return None, None
+            lock = int(self.layout.slot_headers[index]["lock"])
+            if lock % 2:
+                # 写入端正在写该槽位
+                continue
+            frame = self._slot_frame(index)
+            if int(self.layout.slot_headers[index]["lock"]) != lock:
+                continue
+            if min_seq is not None and frame.seq <= min_seq:
+                return None, None
+            return frame, (index, lock)
+        return None, None
+
+    def is_valid(self, ticket):
+        """检查view_latest返回的帧在此之前是否保持未被覆盖"""
+        index, lock = ticket
+        return int(self.layout.slot_headers[index]["lock"]) == lock
+
+    def read_latest(self, min_seq=None):
+        """读取最新帧的副本（复制到读取端自己的缓冲区），保证数据一致
+
+        Returns:
+            Frame或None。返回的图像位于读取端复用的缓冲区，下一次read_latest时会被覆盖
+        """
+        for _ in range(self.max_retries):
+            frame, ticket = self.view_latest(min_seq)
+            if frame is None:
+                return None
+            if self._buffer is None or self._buffer.shape != frame.image.shape:
+                self._buffer = np.empty_like(frame.image)
+            np.copyto(self._buffer, frame.image)
+            if self.is_valid(ticket):
+                frame.image = self._buffer
+                return frame
+        logger.warning(f"帧总线读取多次重试仍不一致: {self.name}")
+        return None
+
+    def wait_for_frame(self, min_seq=None, timeout=1.0, poll_interval=0.001):
+        """等待出现序列号大于min_seq的新帧并读取副本，超时返回None"""
+        deadline = time.perf_counter() + timeout
+        while True:
+            frame = self.read_latest(min_seq)
+            if frame is not None or time.perf_counter() >= deadline:
+                return frame
+            time.sleep(poll_interval)
+
+    def close(self):
+        """断开与共享内存的连接（不删除共享内存）"""
+        self.layout.release()
+        self.shm.close()
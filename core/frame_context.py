@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+from loguru import logger
+
+
+class FrameContextSampler:
+    """在捕获时采样鼠标位置和前台窗口，附加到帧的元数据中
+
+    每帧只调用GetCursorPos和GetForegroundWindow这两个廉价的系统调用；
+    窗口标题和类名需要向窗口发送消息，只在前台窗口句柄变化时查询一次并缓存。
+    """
+
+    def __init__(self, cursor=True, foreground=True, window_text=True,
+                 get_cursor=None, get_foreground=None, get_window_info=None):
+        """
+        Args:
+            cursor: 是否采样鼠标位置
+            foreground: 是否采样前台窗口句柄
+            window_text: 是否附加前台窗口的标题和类名
+            get_cursor: 返回 (x, y) 的函数，None表示使用系统API
+            get_foreground: 返回前台窗口句柄的函数，None表示使用系统API
+            get_window_info: 根据句柄返回 (标题, 类名) 的函数，None表示使用系统API
+        """
+        self.cursor = cursor
+        self.foreground = foreground
+        self.window_text = window_text
+        self._get_cursor = get_cursor
+        self._get_foreground = get_foreground
+        self._get_window_info = get_window_info
+        if None in (get_cursor, get_foreground, get_window_info):
+            self._init_system_api()
+        self._window_cache = (None, None)  # (句柄, 窗口信息)
+        self.failures = 0
+
+    def _init_system_api(self):
+        """按平台准备默认的采样函数"""
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+            user32 = ctypes.windll.user32
+            point = wintypes.POINT()
+
+            def get_cursor():
+                user32.GetCursorPos(ctypes.byref(point))
+                return (point.x, point.y)
+
+            def get_window_info(hwnd):
+                title = ctypes.create_unicode_buffer(256)
+                class_name = ctypes.create_unicode_buffer(256)
+                user32.GetWindowTextW(hwnd, title, 256)
+                user32.GetClassNameW(hwnd, class_name, 256)
+                return title.value, class_name.value
+
+            self._get_cursor = self._get_cursor or get_cursor
+            self._get_foreground = self._get_foreground or user32.GetForegroundWindow
+            self._get_window_info = self._get_window_info or get_window_info
+        else:
+            # 其他平台只支持鼠标位置
+            if self._get_cursor is None:
+                import pyautogui
+                self._get_cursor = lambda: tuple(pyautogui.position())
+            self._get_foreground = self._get_foreground or (lambda: None)
+            self._get_window_info = self._get_window_info or (lambda hwnd: (None, None))
+
+    def _foreground_window(self):
+        """前台窗口信息，句柄不变时复用缓存的标题和类名"""
+        hwnd = self._get_foreground()
+        if not hwnd:
+            return None
+        cached_hwnd, info = self._window_cache
+        if hwnd != cached_hwnd:
+            info = {"handle": hwnd}
+            if self.window_text:
+                info["title"], info["class"] = self._get_window_info(hwnd)
+            self._window_cache = (hwnd, info)
+        return info
+
+    def sample(self):
+        """采样一次，返回 {"cursor": (x, y), "foreground_window": {"handle", "title", "class"}}"""
+        context = {}
+        try:
+            if self.cursor:
+                context["cursor"] = self._get_cursor()
+            if self.foreground:
+                context["foreground_window"] = self._foreground_window()
+        except Exception as e:
+            self.failures += 1
+            logger.debug(f"采样帧上下文失败: {e}")
+        return context
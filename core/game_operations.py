@@ -4,6 +4,12 @@
 import time
 from loguru import logger
 
+try:
+    from .screen_capture import FramePacer
+except ImportError:
+    # 处理独立运行时的导入
+    from core.screen_capture import FramePacer
+
 
 class GameStuckError(Exception):
     """游戏卡死异常，当检测到游戏可能卡死时抛出"""
@@ -30,12 +36,45 @@ class GameOperations:
         self.max_clicks = self.config.get("max_clicks", 10)  # 最大点击次数
         self.stuck_threshold = self.config.get("stuck_threshold", 5)  # 卡死检测阈值
         
+        # 帧缓存：新鲜度窗口内的连续识别复用同一帧（及其灰度转换），0表示禁用
+        ops_config = self.config.get("game_operations", {}) or {}
+        self.frame_cache_ttl = ops_config.get("frame_cache_ttl", 0.016)  # 帧新鲜度窗口(秒)
+        self._cached_frame = None
+        self.frame_cache_hits = 0
+        
         # 状态跟踪
         self.click_count = {}
         self.last_positions = {}
         
         logger.info("游戏操作模块初始化完成")
     
+    def _capture(self):
+        """获取当前画面的Frame
+        
+        新鲜度窗口内复用上一次获取的帧；流式捕获运行时直接读取最新帧而不阻塞抓屏。
+        """
+        cached = self._cached_frame
+        if cached is not None and time.perf_counter_ns() - cached.timestamp_ns <= self.frame_cache_ttl * 1e9:
+            self.frame_cache_hits += 1
+            return cached
+        
+        frame = None
+        if self.screen_capture.is_streaming():
+            # 复制环形缓冲区的槽位：帧会被缓存并用于多次匹配，期间生产者可能覆盖该槽位
+            frame = self.screen_capture.latest_frame(copy=True)
+        if frame is None:
+            frame = self.screen_capture.capture_frame()
+            if frame is not None and self.frame_cache_ttl > 0 and getattr(self.screen_capture, "zero_copy", False):
+                # 零拷贝帧是复用的捕获缓冲区，下一次捕获会覆盖其像素，缓存前复制
+                frame = frame.copy()
+        
+        self._cached_frame = frame if self.frame_cache_ttl > 0 else None
+        return frame
+    
+    def invalidate_frame_cache(self):
+        """丢弃缓存的帧，输入操作改变画面后调用"""
+        self._cached_frame = None
+    
     def appear(self, template_name, timeout=None, interval=None, threshold=None):
         """等待图像出现，返回匹配结果
         
@@ -52,13 +91,16 @@ class GameOperations:
         interval = interval if interval is not None else self.default_interval
         
         start_time = time.time()
+        # 按截止时间控制检查频率，捕获和识别的耗时计入检查间隔
+        pacer = FramePacer(frame_budget=interval)
         
         while time.time() - start_time < timeout:
+            pacer.wait()
+            
             # 捕获屏幕
-            screenshot = self.screen_capture.capture()
+            screenshot = self._capture()
             if screenshot is None:
                 logger.warning("屏幕捕获失败，重试中...")
-                time.sleep(interval)
                 continue
             
             # 查找模板
@@ -67,9 +109,6 @@ class GameOperations:
             if result and result.get("found", False):
                 logger.debug(f"找到模板: {template_name}，位置: {result['position']}")
                 return result
-            
-            # 等待指定间隔
-            time.sleep(interval)
         
         logger.warning(f"等待模板出现超时: {template_name}")
         return {"found": False, "template_name": template_name}
@@ -90,13 +129,16 @@ class GameOperations:
         interval = interval if interval is not None else self.default_interval
         
         start_time = time.time()
+        # 按截止时间控制检查频率，捕获和识别的耗时计入检查间隔
+        pacer = FramePacer(frame_budget=interval)
         
         while time.time() - start_time < timeout:
+            pacer.wait()
+            
             # 捕获屏幕
-            screenshot = self.screen_capture.capture()
+            screenshot = self._capture()
             if screenshot is None:
                 logger.warning("屏幕捕获失败，重试中...")
-                time.sleep(interval)
                 continue
             
             # 查找模板
@@ -105,9 +147,6 @@ class GameOperations:
             if not result or not result.get("found", False):
                 logger.debug(f"模板已消失: {template_name}")
                 return True
-            
-            # 等待指定间隔
-            time.sleep(interval)
         
         logger.warning(f"等待模板消失超时: {template_name}")
         return False
@@ -138,7 +177,7 @@ class GameOperations:
             return False
         
         # 获取位置
-        x, y = result["position"]
+        x, y = result.get("screen_position", result["position"])
         x+=offect_x
         y+=offect_y
 
@@ -148,6 +187,7 @@ class GameOperations:
         
         # 点击
         success = self.input_controller.click(x, y, button, clicks)
+        self.invalidate_frame_cache()
         
         if success:
             # 更新点击计数
@@ -155,6 +195,12 @@ class GameOperations:
             # 记录最后位置
             self.last_positions[template_name] = (x, y)
             logger.debug(f"成功点击模板: {template_name}，位置: ({x}, {y})")
+            if "frame_timestamp_ns" in result:
+                latency_ms = (time.perf_counter_ns() - result["frame_timestamp_ns"]) / 1e6
+                logger.debug(f"捕获到点击延迟: {latency_ms:.1f}ms（帧序列号: {result['frame_seq']}）")
+            if "frame_context" in result:
+                # 捕获时的鼠标位置和前台窗口，用于排查误点击
+                logger.debug(f"捕获时上下文: {result['frame_context']}")
             
             # 点击后延迟
             if click_delay is not None:
@@ -185,10 +231,11 @@ class GameOperations:
             return False
         
         # 获取位置
-        x, y = result["position"]
+        x, y = result.get("screen_position", result["position"])
         
         # 拖动
         success = self.input_controller.drag(x, y, end_x, end_y)
+        self.invalidate_frame_cache()
         
         if success:
             logger.debug(f"成功拖动模板: {template_name}，从({x}, {y})到({end_x}, {end_y})")
@@ -217,13 +264,14 @@ class GameOperations:
             return False
         
         # 获取位置
-        x, y = result["position"]
+        x, y = result.get("screen_position", result["position"])
         
         # 点击以激活输入框
         self.input_controller.click(x, y)
         
         # 输入文本
         success = self.input_controller.typewrite(text, interval)
+        self.invalidate_frame_cache()
         
         if success:
             logger.debug(f"成功在模板位置输入文本: {template_name}，文本: {text}")
@@ -252,6 +300,7 @@ class GameOperations:
         
         # 按下组合键
         success = self.input_controller.hotkey(*keys)
+        self.invalidate_frame_cache()
         
         if success:
             logger.debug(f"成功按下组合键: {' + '.join(keys)}，当模板出现: {template_name}")
@@ -297,11 +346,11 @@ class GameOperations:
             current_pos = self.last_positions.get(template_name)
             if current_pos:
                 # 捕获屏幕
-                screenshot = self.screen_capture.capture()
+                screenshot = self._capture()
                 if screenshot is not None:
                     result = self.image_recognition.find_template(screenshot, template_name)
                     if result and result.get("found", False):
-                        new_pos = result["position"]
+                        new_pos = result.get("screen_position", result["position"])
                         # 如果位置没有变化，可能卡死
                         if new_pos == current_pos:
                             raise GameStuckError(f"模板 {template_name} 可能卡死，位置未变化: {new_pos}")
@@ -311,4 +360,5 @@ class GameOperations:
         """
         返回上一级
         """
+        self.invalidate_frame_cache()
         return self.input_controller.key_press('esc')
\ No newline at end of file
@@ -2,13 +2,24 @@
 # -*- coding: utf-8 -*-
 
 import os
+import math
 import cv2
+import yaml
 import numpy as np
 from loguru import logger
 from queue import Queue
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple, List, Dict, Any
 
+try:
+    from .screen_capture import Frame
+    from .template_cache import CompiledTemplateCache
+except ImportError:
+    # 处理独立运行时的导入
+    from core.screen_capture import Frame
+    from core.template_cache import CompiledTemplateCache
+
 
 class NumpyArrayPool:
     """numpy数组对象池，用于减少内存分配和释放的开销"""
@@ -142,6 +153,67 @@ class ImageRecognition:
         
         # 缓存已加载的模板
         self.template_cache = {}
+        
+        # 模板编译缓存：由 python -m core.template_cache 生成，加载模板时直接映射预解码的灰度图和金字塔
+        self.compiled_cache = None
+        compiled_cache_path = self.config.get("compiled_cache")
+        if compiled_cache_path:
+            compiled_cache_path = os.path.join(project_root, compiled_cache_path)
+            if os.path.exists(compiled_cache_path):
+                try:
+                    self.compiled_cache = CompiledTemplateCache(compiled_cache_path)
+                    logger.info(f"已映射模板编译缓存: {self.compiled_cache.data_path}，共 {len(self.compiled_cache)} 个模板")
+                except Exception as e:
+                    logger.warning(f"模板编译缓存不可用，将逐个读取模板: {e}")
+        self.compiled_hits = 0
+        self.compiled_misses = 0
+        
+        # 匹配引擎："standard"全分辨率匹配，"pyramid"由粗到细的金字塔匹配（可在模板清单中按模板指定）
+        self.engine = self.config.get("engine", "standard")
+        pyramid_config = self.config.get("pyramid", {}) or {}
+        self.pyramid_levels = pyramid_config.get("levels", 2)  # 金字塔层数，每层尺寸减半
+        self.pyramid_top_k = pyramid_config.get("top_k", 3)  # 以全分辨率验证的候选数
+        self.pyramid_min_template_size = pyramid_config.get("min_template_size", 8)  # 缩小后模板的最小边长
+        self.template_engines = {}  # 模板名 -> 匹配引擎
+        self._template_pyramids = {}  # (模板名, 层数) -> 模板金字塔
+        self._frame_pyramid_seq = None
+        self._frame_pyramids = {}  # (搜索区域偏移, 尺寸) -> 当前帧的金字塔
+        self._pyramid_lock = threading.Lock()
+        
+        # 就近搜索：先在模板上次命中位置附近搜索，未命中再搜索整个区域
+        locality_config = self.config.get("locality", {}) or {}
+        self.locality_enabled = locality_config.get("enabled", True)
+        self.locality_margin = locality_config.get("margin", 16)  # 上次位置周围的搜索边距(像素)
+        self._last_hits = {}  # 模板名 -> 上次命中的帧坐标
+        self.locality_hits = 0
+        self.locality_misses = 0
+        self._locality_lock = threading.Lock()
+        
+        # 模板清单：为模板声明搜索区域和匹配引擎，匹配前先裁剪到搜索区域
+        self.search_regions = {}  # 模板名 -> {"roi": (x1, y1, x2, y2), "relative_to": "screen"/"window"}
+        self._load_manifest(self.config.get("manifest", "manifest.yaml"))
+        
+        # 后台图像写入器，设置后save_screenshot_region不再阻塞调用线程
+        self.async_writer = None
+        
+        # 按帧序列号缓存最近一帧的灰度图，同一帧多次匹配时只转换一次
+        self._gray_cache_seq = None
+        self._gray_cache = None
+        self._gray_cache_lock = threading.Lock()
+        
+        # 脏区复用：帧携带图块变化状态时，搜索区域未变化则直接复用上次的匹配结果
+        self.reuse_unchanged = self.config.get("reuse_unchanged", True)
+        self._match_memo = {}  # (模板名, 阈值) -> (帧序列号, 帧形状, 帧区域, 匹配结果)
+        self.reuse_hits = 0
+        
+        # 批量匹配线程池，find_templates首次调用时创建
+        self.batch_workers = self.config.get("batch_workers", min(8, os.cpu_count() or 1))
+        self._match_executor = None
+        self._match_executor_lock = threading.Lock()
+    
+    def set_async_writer(self, writer):
+        """设置后台图像写入器（通常与屏幕捕获共用），None表示同步写入"""
+        self.async_writer = writer
     
     def _get_temp_array(self, shape, dtype=np.uint8):
         """获取临时数组，优先从对象池获取"""
@@ -154,6 +226,33 @@ class ImageRecognition:
         if self.array_pool and array is not None:
             self.array_pool.return_array(array)
     
+    def _get_gray(self, screenshot):
+        """获取截图的灰度图
+        
+        Args:
+            screenshot: numpy数组或Frame对象，Frame会按序列号缓存转换结果
+            
+        Returns:
+            灰度numpy数组
+        """
+        if isinstance(screenshot, Frame):
+            if screenshot.is_gray:
+                # 灰度捕获模式的帧无需转换
+                return screenshot.image
+            with self._gray_cache_lock:
+                if self._gray_cache_seq == screenshot.seq:
+                    return self._gray_cache
+            gray = self._get_gray(screenshot.image)
+            with self._gray_cache_lock:
+                self._gray_cache_seq = screenshot.seq
+                self._gray_cache = gray
+            return gray
+        
+        if len(screenshot.shape) == 3:
+            return cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
+        # 已是灰度图（如零拷贝帧模式），matchTemplate不会修改输入，无需复制
+        return screenshot
+    
     def load_template(self, template_name):
         """加载模板图像"""
         # 检查缓存
@@ -167,6 +266,19 @@ class ImageRecognition:
         if not os.path.splitext(template_name)[1]:
             template_path = os.path.join(self.template_dir, template_name + ".png")
         
+        # 优先使用编译缓存中未过期的条目，同时预置模板金字塔
+        if self.compiled_cache is not None:
+            rel_path = os.path.relpath(template_path, self.template_dir).replace(os.sep, "/")
+            compiled = self.compiled_cache.get(rel_path, template_path)
+            if compiled is not None:
+                self.compiled_hits += 1
+                pyramid = compiled["pyramid"]
+                for levels in range(len(pyramid)):
+                    self._template_pyramids[(template_name, levels)] = pyramid[:levels + 1]
+                self.template_cache[template_name] = compiled["gray"]
+                return compiled["gray"]
+            self.compiled_misses += 1
+        
         try:
             # 读取模板图像
             template = cv2.imread(template_path)
@@ -189,7 +301,7 @@ class ImageRecognition:
         """在截图中查找模板
         
         Args:
-            screenshot: 截图数组
+            screenshot: 截图数组或Frame对象
             template_name: 模板名称
             
         Returns:
@@ -198,46 +310,402 @@ class ImageRecognition:
         template = self.load_template(template_name)
         if template is None:
             return None
+        
+        # 使用传入的阈值或默认阈值
+        match_threshold = threshold if threshold is not None else self.threshold
+        
+        # 搜索区域自上次匹配以来没有变化时直接复用结果
+        reused = self._reuse_match(screenshot, template_name, match_threshold)
+        if reused is not None:
+            return reused
             
         try:
             # 确保截图是灰度图像（与模板保持一致）
-            if len(screenshot.shape) == 3:
-                screenshot_gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
+            screenshot_gray = self._get_gray(screenshot)
+            return self._match_template(screenshot, screenshot_gray, template, template_name, match_threshold)
+        except Exception as e:
+            logger.error(f"模板匹配失败: {e}")
+            return None
+    
+    def _match_template(self, screenshot, screenshot_gray, template, template_name, match_threshold):
+        """在已转换的灰度图上匹配单个模板并记录结果"""
+        # 只在模板的搜索区域内匹配，结果再换算回整帧坐标
+        screenshot_gray, (offset_x, offset_y) = self._crop_to_search_rect(
+            screenshot_gray, template, template_name, screenshot)
+        
+        # 先在上次命中位置附近的小窗口内搜索，未命中再搜索整个区域
+        best = self._locality_match(screenshot_gray, template, template_name, (offset_x, offset_y), match_threshold)
+        if best is None and self._template_engine(template_name) == "pyramid":
+            best = self._pyramid_match(screenshot, screenshot_gray, (offset_x, offset_y), template, template_name)
+        if best is None:
+            best = self._full_match(screenshot_gray, template)
+        max_val, max_loc = best
+        
+        if max_val >= match_threshold:
+            x, y = max_loc[0] + offset_x, max_loc[1] + offset_y
+            logger.debug(f"找到模板 '{template_name}' 位置: ({x}, {y}), 相似度: {max_val:.3f}")
+            match = {"found": True, "template_name": template_name,"position":(x, y)}
+            if self.locality_enabled:
+                self._last_hits[template_name] = (x, y)
+        else:
+            logger.debug(f"未找到模板 '{template_name}', 最高相似度: {max_val:.3f}")
+            match = {"found": False, "template_name": template_name}
+        
+        self._remember_match(screenshot, template_name, match_threshold, match)
+        return self._with_frame_info(match, screenshot)
+    
+    def _locality_match(self, screenshot_gray, template, template_name, offset, match_threshold):
+        """在模板上次命中位置附近的小窗口内匹配
+        
+        Returns:
+            (相似度, 位置)，没有历史位置或窗口内未达到阈值时返回None
+        """
+        if not self.locality_enabled:
+            return None
+        last = self._last_hits.get(template_name)
+        if last is None:
+            return None
+        
+        template_h, template_w = template.shape[:2]
+        frame_h, frame_w = screenshot_gray.shape[:2]
+        last_x, last_y = last[0] - offset[0], last[1] - offset[1]
+        x1, y1 = max(0, last_x - self.locality_margin), max(0, last_y - self.locality_margin)
+        x2 = min(frame_w, last_x + template_w + self.locality_margin)
+        y2 = min(frame_h, last_y + template_h + self.locality_margin)
+        
+        best = None
+        if x2 - x1 >= template_w and y2 - y1 >= template_h:
+            result = cv2.matchTemplate(screenshot_gray[y1:y2, x1:x2], template, self.method)
+            _, max_val, _, (x, y) = cv2.minMaxLoc(result)
+            if max_val >= match_threshold:
+                best = (max_val, (x1 + x, y1 + y))
+        
+        with self._locality_lock:
+            if best is not None:
+                self.locality_hits += 1
             else:
-                screenshot_gray = screenshot.copy()
+                self.locality_misses += 1
+        return best
+    
+    def forget_position(self, template_name=None):
+        """清除模板（None表示全部模板）的历史命中位置"""
+        if template_name is None:
+            self._last_hits.clear()
+        else:
+            self._last_hits.pop(template_name, None)
+    
+    def get_locality_stats(self):
+        """获取就近搜索的命中统计"""
+        with self._locality_lock:
+            total = self.locality_hits + self.locality_misses
+            return {
+                "hits": self.locality_hits,
+                "misses": self.locality_misses,
+                "hit_rate": self.locality_hits / total if total else 0.0,
+                "tracked_templates": len(self._last_hits),
+            }
+    
+    def _full_match(self, screenshot_gray, template):
+        """全分辨率模板匹配，返回 (最高相似度, 位置)"""
+        # 使用对象池获取匹配结果数组
+        match_result = self._get_temp_array(
+            (screenshot_gray.shape[0] - template.shape[0] + 1,
+             screenshot_gray.shape[1] - template.shape[1] + 1),
+            dtype=np.float32
+        )
+        
+        try:
+            # 执行模板匹配，移除dst参数以解决兼容性问题
+            result = cv2.matchTemplate(screenshot_gray, template, self.method)
+            np.copyto(match_result, result)
             
-            # 使用对象池获取匹配结果数组
-            match_result = self._get_temp_array(
-                (screenshot_gray.shape[0] - template.shape[0] + 1,
-                 screenshot_gray.shape[1] - template.shape[1] + 1),
-                dtype=np.float32
-            )
+            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(match_result)
+            return max_val, max_loc
             
-            try:
-                # 执行模板匹配，移除dst参数以解决兼容性问题
-                result = cv2.matchTemplate(screenshot_gray, template, self.method)
-                np.copyto(match_result, result)
-                
-                # 使用传入的阈值或默认阈值
-                match_threshold = threshold if threshold is not None else self.threshold
-                
-                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(match_result)
-                
-                if max_val >= match_threshold:
-                    x, y = max_loc
-                    logger.debug(f"找到模板 '{template_name}' 位置: ({x}, {y}), 相似度: {max_val:.3f}")
-                    return {"found": True, "template_name": template_name,"position":(x, y)}
-                    
-                logger.debug(f"未找到模板 '{template_name}', 最高相似度: {max_val:.3f}")
-                return {"found": False, "template_name": template_name}
-                
-            finally:
-                # 归还数组到对象池
-                self._return_temp_array(match_result)
-                
+        finally:
+            # 归还数组到对象池
+            self._return_temp_array(match_result)
+    
+    def _template_engine(self, template_name):
+        """模板使用的匹配引擎，模板清单中的设置优先于全局配置"""
+        return self.template_engines.get(os.path.splitext(template_name)[0], self.engine)
+    
+    def _pyramid_levels(self, template):
+        """按模板尺寸确定实际使用的金字塔层数，缩小后的模板边长不小于min_template_size"""
+        levels = 0
+        size = min(template.shape[:2])
+        while levels < self.pyramid_levels and (size >> (levels + 1)) >= self.pyramid_min_template_size:
+            levels += 1
+        return levels
+    
+    def _build_pyramid(self, image, levels):
+        """逐层pyrDown，返回各层图像（第0层为原图）"""
+        pyramid = [image]
+        for _ in range(levels):
+            pyramid.append(cv2.pyrDown(pyramid[-1]))
+        return pyramid
+    
+    def _frame_pyramid_level(self, screenshot, screenshot_gray, offset, levels):
+        """获取帧（搜索区域）缩小后的图像，Frame按序列号和搜索区域缓存"""
+        if not isinstance(screenshot, Frame):
+            return self._build_pyramid(screenshot_gray, levels)[levels]
+        
+        key = (offset, screenshot_gray.shape)
+        with self._pyramid_lock:
+            if self._frame_pyramid_seq != screenshot.seq:
+                self._frame_pyramid_seq = screenshot.seq
+                self._frame_pyramids = {}
+            pyramid = self._frame_pyramids.get(key)
+        if pyramid is None or len(pyramid) <= levels:
+            pyramid = self._build_pyramid(screenshot_gray, levels)
+            with self._pyramid_lock:
+                if self._frame_pyramid_seq == screenshot.seq:
+                    self._frame_pyramids[key] = pyramid
+        return pyramid[levels]
+    
+    def _template_pyramid_level(self, template, template_name, levels):
+        """获取模板缩小后的图像，按模板名称缓存"""
+        key = (template_name, levels)
+        pyramid = self._template_pyramids.get(key)
+        if pyramid is None:
+            pyramid = self._build_pyramid(template, levels)
+            self._template_pyramids[key] = pyramid
+        return pyramid[levels]
+    
+    def _pyramid_match(self, screenshot, screenshot_gray, offset, template, template_name):
+        """由粗到细的金字塔匹配
+        
+        先在缩小的帧和模板上匹配并取相似度最高的top_k个候选位置，
+        再只在各候选位置附近以全分辨率匹配，最终相似度总是全分辨率下的结果。
+        
+        Returns:
+            (最高相似度, 位置)，模板过小或匹配方法不适用时返回None（改用全分辨率匹配）
+        """
+        if self.method in (cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED):
+            return None
+        levels = self._pyramid_levels(template)
+        if levels == 0:
+            return None
+        
+        coarse_frame = self._frame_pyramid_level(screenshot, screenshot_gray, offset, levels)
+        coarse_template = self._template_pyramid_level(template, template_name, levels)
+        if coarse_frame.shape[0] < coarse_template.shape[0] or coarse_frame.shape[1] < coarse_template.shape[1]:
+            return None
+        coarse = cv2.matchTemplate(coarse_frame, coarse_template, self.method)
+        
+        factor = 1 << levels
+        template_h, template_w = template.shape[:2]
+        frame_h, frame_w = screenshot_gray.shape[:2]
+        # 粗匹配位置换算到全分辨率后的误差范围
+        margin = factor * 2
+        suppress_h, suppress_w = max(1, coarse_template.shape[0] // 2), max(1, coarse_template.shape[1] // 2)
+        
+        best = None
+        for _ in range(self.pyramid_top_k):
+            _, coarse_val, _, (cx, cy) = cv2.minMaxLoc(coarse)
+            if coarse_val < -1:
+                # 候选已全部被抑制
+                break
+            # 抑制该候选附近的区域，下一个候选取其他位置
+            coarse[max(0, cy - suppress_h):cy + suppress_h + 1, max(0, cx - suppress_w):cx + suppress_w + 1] = -2
+            
+            # 在候选位置附近以全分辨率验证
+            x1, y1 = max(0, cx * factor - margin), max(0, cy * factor - margin)
+            x2 = min(frame_w, cx * factor + margin + template_w)
+            y2 = min(frame_h, cy * factor + margin + template_h)
+            if x2 - x1 < template_w or y2 - y1 < template_h:
+                continue
+            fine = cv2.matchTemplate(screenshot_gray[y1:y2, x1:x2], template, self.method)
+            _, fine_val, _, (fx, fy) = cv2.minMaxLoc(fine)
+            if best is None or fine_val > best[0]:
+                best = (fine_val, (x1 + fx, y1 + fy))
+        return best
+    
+    def find_templates(self, screenshot, template_names, threshold=None, early_stop=False):
+        """在同一截图中批量查找多个模板
+        
+        截图只转换一次灰度，各模板的匹配分发到线程池并行执行（OpenCV匹配时会释放GIL）。
+        
+        Args:
+            screenshot: 截图数组或Frame对象
+            template_names: 模板名称列表，early_stop时按列表顺序作为优先级
+            threshold: 匹配阈值，None表示使用默认值
+            early_stop: 按优先级找到第一个匹配后立即返回，尚未开始的匹配会被取消
+            
+        Returns:
+            {模板名称: 匹配结果} 字典，结果格式与find_template相同；
+            early_stop时只包含优先级不低于第一个匹配的模板
+        """
+        match_threshold = threshold if threshold is not None else self.threshold
+        results = {}
+        pending = []
+        screenshot_gray = None
+        
+        try:
+            for template_name in template_names:
+                template = self.load_template(template_name)
+                if template is None:
+                    results[template_name] = None
+                    continue
+                reused = self._reuse_match(screenshot, template_name, match_threshold)
+                if reused is not None:
+                    results[template_name] = reused
+                    continue
+                if screenshot_gray is None:
+                    screenshot_gray = self._get_gray(screenshot)
+                pending.append((template_name, self._get_match_executor().submit(
+                    self._match_template, screenshot, screenshot_gray, template, template_name, match_threshold)))
         except Exception as e:
-            logger.error(f"模板匹配失败: {e}")
+            logger.error(f"批量模板匹配失败: {e}")
+            for _, future in pending:
+                future.cancel()
+            return results
+        
+        futures = dict(pending)
+        ordered = {}
+        for template_name in template_names:
+            if template_name in results:
+                result = results[template_name]
+            else:
+                try:
+                    result = futures[template_name].result()
+                except Exception as e:
+                    logger.error(f"模板匹配失败: {template_name}, {e}")
+                    result = None
+            ordered[template_name] = result
+            if early_stop and result is not None and result.get("found", False):
+                # 优先级更低的匹配不再需要
+                for _, future in pending:
+                    future.cancel()
+                break
+        return ordered
+    
+    def _get_match_executor(self):
+        """获取批量匹配使用的线程池，首次使用时创建"""
+        if self._match_executor is None:
+            with self._match_executor_lock:
+                if self._match_executor is None:
+                    self._match_executor = ThreadPoolExecutor(max_workers=self.batch_workers,
+                                                              thread_name_prefix="TemplateMatch")
+        return self._match_executor
+    
+    def _load_manifest(self, manifest_name):
+        """加载模板目录中的模板清单（YAML或JSON）
+        
+        清单格式：
+            templates:
+              confirm:
+                roi: [1500, 900, 1920, 1080]  # 搜索区域 [x1, y1, x2, y2]
+                relative_to: window  # "screen"为屏幕坐标（默认），"window"相对捕获区域（窗口）左上角，
+                                     # 此时roi各值均不大于1时按窗口尺寸的比例计算
+                engine: pyramid  # 可选，该模板使用的匹配引擎
+        """
+        if not manifest_name:
+            return
+        path = os.path.join(self.template_dir, manifest_name)
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = yaml.safe_load(f) or {}
+            for template_name, entry in (manifest.get("templates") or {}).items():
+                if entry and entry.get("roi"):
+                    self.set_search_region(template_name, entry["roi"], entry.get("relative_to", "screen"))
+                if entry and entry.get("engine"):
+                    self.template_engines[os.path.splitext(template_name)[0]] = entry["engine"]
+            logger.info(f"已加载模板清单: {path}，搜索区域 {len(self.search_regions)} 个")
+        except Exception as e:
+            logger.error(f"加载模板清单失败: {path}, {e}")
+    
+    def set_search_region(self, template_name, roi, relative_to="screen"):
+        """设置模板的搜索区域
+        
+        Args:
+            template_name: 模板名称
+            roi: 搜索区域 (x1, y1, x2, y2)，None表示清除
+            relative_to: "screen"为屏幕坐标，"window"相对捕获区域左上角（各值均不大于1时按比例计算）
+        """
+        key = os.path.splitext(template_name)[0]
+        if roi is None:
+            self.search_regions.pop(key, None)
+            return
+        if relative_to not in ("screen", "window"):
+            raise ValueError(f"不支持的搜索区域坐标系: {relative_to}")
+        self.search_regions[key] = {"roi": tuple(roi), "relative_to": relative_to}
+    
+    def _search_rect(self, template_name, frame):
+        """模板在帧坐标下的搜索区域 (x1, y1, x2, y2)，None表示整帧"""
+        entry = self.search_regions.get(os.path.splitext(template_name)[0])
+        if entry is None:
+            return None
+        
+        image = frame.image if isinstance(frame, Frame) else frame
+        height, width = image.shape[:2]
+        scale = frame.scale_factor if isinstance(frame, Frame) else 1.0
+        x1, y1, x2, y2 = entry["roi"]
+        
+        if entry["relative_to"] == "window":
+            if max(x1, y1, x2, y2) <= 1:
+                # 按窗口尺寸的比例
+                return (int(x1 * width), int(y1 * height), math.ceil(x2 * width), math.ceil(y2 * height))
+            left = top = 0
+        elif isinstance(frame, Frame) and frame.region is not None:
+            left, top = frame.region[0], frame.region[1]
+        else:
+            left = top = 0
+        
+        return (max(0, int((x1 - left) * scale)), max(0, int((y1 - top) * scale)),
+                min(width, math.ceil((x2 - left) * scale)), min(height, math.ceil((y2 - top) * scale)))
+    
+    def _crop_to_search_rect(self, screenshot_gray, template, template_name, screenshot):
+        """将灰度图裁剪到模板的搜索区域
+        
+        Returns:
+            (裁剪后的视图, (x偏移, y偏移))，没有搜索区域或区域小于模板时返回整图
+        """
+        rect = self._search_rect(template_name, screenshot)
+        if rect is None:
+            return screenshot_gray, (0, 0)
+        x1, y1, x2, y2 = (int(v) for v in rect)
+        if x2 - x1 < template.shape[1] or y2 - y1 < template.shape[0]:
+            logger.debug(f"模板 '{template_name}' 的搜索区域 {rect} 小于模板，改为搜索整帧")
+            return screenshot_gray, (0, 0)
+        return screenshot_gray[y1:y2, x1:x2], (x1, y1)
+    
+    def _reuse_match(self, screenshot, template_name, threshold):
+        """帧的搜索区域自上次匹配后没有任何脏图块时，返回上次的匹配结果，否则返回None"""
+        if not self.reuse_unchanged or not isinstance(screenshot, Frame) or screenshot.tile_state is None:
+            return None
+        
+        memo = self._match_memo.get((template_name, threshold))
+        if memo is None:
+            return None
+        seq, shape, region, result = memo
+        if shape != screenshot.image.shape or region != screenshot.region or seq > screenshot.seq:
             return None
+        if not screenshot.tile_state.is_clean_since(seq, self._search_rect(template_name, screenshot)):
+            return None
+        
+        self.reuse_hits += 1
+        return self._with_frame_info(dict(result), screenshot)
+    
+    def _remember_match(self, screenshot, template_name, threshold, result):
+        """记录携带图块状态的帧上的匹配结果，供后续未变化的帧复用"""
+        if self.reuse_unchanged and isinstance(screenshot, Frame) and screenshot.tile_state is not None:
+            self._match_memo[(template_name, threshold)] = (
+                screenshot.seq, screenshot.image.shape, screenshot.region, dict(result))
+    
+    def _with_frame_info(self, result, screenshot):
+        """为匹配结果附加来源帧的序列号、捕获时间、屏幕坐标和捕获时的上下文，便于统计延迟和排查误点击"""
+        if isinstance(screenshot, Frame):
+            if "position" in result:
+                # position为帧坐标，screen_position考虑了捕获区域偏移和缩放
+                result["screen_position"] = screenshot.to_screen(*result["position"])
+            result["frame_seq"] = screenshot.seq
+            result["frame_timestamp_ns"] = screenshot.timestamp_ns
+            if screenshot.context:
+                result["frame_context"] = screenshot.context
+        return result
     
     def find_all_templates(self, screenshot, template_name, threshold=None):
         """在截图中查找所有匹配的模板，使用对象池优化内存使用"""
@@ -251,28 +719,32 @@ class ImageRecognition:
         
         # 临时数组变量
         screenshot_gray = None
+        pooled_gray = False
         result = None
         
         try:
-            # 转换截图为灰度图像
-            if len(screenshot.shape) == 3:
+            # 转换截图为灰度图像，Frame对象使用按序列号缓存的灰度图
+            if not isinstance(screenshot, Frame) and len(screenshot.shape) == 3:
                 screenshot_gray = self._get_temp_array(screenshot.shape[:2], np.uint8)
+                pooled_gray = True
                 cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY, dst=screenshot_gray)
             else:
-                screenshot_gray = screenshot.copy()
+                screenshot_gray = self._get_gray(screenshot)
+            search_gray, (offset_x, offset_y) = self._crop_to_search_rect(
+                screenshot_gray, template, template_name, screenshot)
             
             # 获取模板尺寸
             template_h, template_w = template.shape
             
             # 创建结果数组
             result_shape = (
-                screenshot_gray.shape[0] - template_h + 1,
-                screenshot_gray.shape[1] - template_w + 1
+                search_gray.shape[0] - template_h + 1,
+                search_gray.shape[1] - template_w + 1
             )
             result = self._get_temp_array(result_shape, np.float32)
             
             # 执行模板匹配，移除dst参数以解决兼容性问题
-            temp_result = cv2.matchTemplate(screenshot_gray, template, self.method)
+            temp_result = cv2.matchTemplate(search_gray, template, self.method)
             np.copyto(result, temp_result)
             
             # 查找所有匹配位置
@@ -287,14 +759,18 @@ class ImageRecognition:
                 # 获取匹配度
                 match_value = result[pt[1], pt[0]]
                 
-                matches.append({
+                # 换算回整帧坐标
+                center_x, center_y = center_x + offset_x, center_y + offset_y
+                pt = (int(pt[0]) + offset_x, int(pt[1]) + offset_y)
+                
+                matches.append(self._with_frame_info({
                     "found": True,
                     "position": (center_x, center_y),
                     "top_left": pt,
                     "bottom_right": (pt[0] + template_w, pt[1] + template_h),
                     "confidence": match_value,
                     "template_name": template_name
-                })
+                }, screenshot))
             
             return matches
         except Exception as e:
@@ -302,7 +778,7 @@ class ImageRecognition:
             return []
         finally:
             # 归还临时数组到对象池
-            if screenshot_gray is not None and len(screenshot.shape) == 3:
+            if pooled_gray:
                 self._return_temp_array(screenshot_gray)
             if result is not None:
                 self._return_temp_array(result)
@@ -310,10 +786,38 @@ class ImageRecognition:
     def clear_cache(self):
         """清空模板缓存和对象池"""
         self.template_cache.clear()
+        self._match_memo.clear()
+        self._template_pyramids.clear()
+        self._last_hits.clear()
+        with self._pyramid_lock:
+            self._frame_pyramid_seq = None
+            self._frame_pyramids = {}
+        with self._gray_cache_lock:
+            self._gray_cache_seq = None
+            self._gray_cache = None
         if self.array_pool:
             self.array_pool.clear_pool()
         logger.info("模板缓存和对象池已清空")
     
+    def close(self, wait=True):
+        """释放批量匹配线程池，之后再调用find_templates时会重新创建
+        
+        Args:
+            wait: 是否等待正在执行的匹配任务完成
+        """
+        with self._match_executor_lock:
+            executor, self._match_executor = self._match_executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+            logger.info("批量匹配线程池已关闭")
+    
+    def __del__(self):
+        """析构函数，释放线程池"""
+        try:
+            self.close(wait=False)
+        except Exception:
+            pass
+    
     def get_pool_stats(self):
         """获取对象池统计信息"""
         if self.array_pool:
@@ -326,6 +830,8 @@ class ImageRecognition:
         """保存截图区域作为模板"""
         try:
             x1, y1, x2, y2 = region
+            if isinstance(screenshot, Frame):
+                screenshot = screenshot.image
             region_img = screenshot[y1:y2, x1:x2]
             
             # 确保目录存在
@@ -333,6 +839,12 @@ class ImageRecognition:
             
             # 保存图像
             template_path = os.path.join(self.template_dir, filename)
+            if self.async_writer is not None:
+                if not self.async_writer.submit(region_img, template_path):
+                    logger.warning(f"后台写入队列已满或超出磁盘预算，模板未保存: {template_path}")
+                    return False
+                logger.info(f"模板已提交后台写入: {template_path}")
+                return True
             cv2.imwrite(template_path, region_img)
             
             logger.info(f"模板已保存: {template_path}")
@@ -12,6 +12,12 @@ import pydirectinput
 from loguru import logger
 from PIL import ImageGrab
 
+try:
+    from .screen_metrics import get_screen_metrics
+except ImportError:
+    # 处理独立运行时的导入
+    from core.screen_metrics import get_screen_metrics
+
 class InputController:
     """输入控制模块，负责处理鼠标和键盘的仿真输入"""
 
@@ -29,14 +35,25 @@ class InputController:
         # 禁用pyautogui的安全机制
         pyautogui.FAILSAFE = False
 
-        # 获取屏幕尺寸
-        screen = self.get_screen_shot()
-        self.screen_width, self.screen_height = screen.width, screen.height
-
         logger.info(
             f"输入控制器初始化完成，屏幕尺寸: {self.screen_width}x{self.screen_height}"
         )
 
+    @property
+    def screen_width(self):
+        """屏幕宽度（虚拟桌面范围），每次从屏幕信息服务的缓存读取，显示配置变化后自动更新"""
+        return get_screen_metrics().screen_size()[0]
+
+    @property
+    def screen_height(self):
+        """屏幕高度（虚拟桌面范围），每次从屏幕信息服务的缓存读取，显示配置变化后自动更新"""
+        return get_screen_metrics().screen_size()[1]
+
+    def _clamp_to_screen(self, x, y):
+        """将坐标限制在当前的屏幕范围内"""
+        width, height = get_screen_metrics().screen_size()
+        return max(0, min(x, width - 1)), max(0, min(y, height - 1))
+
     def get_screen_size(self):
         """获取屏幕尺寸"""
         warnings.warn(
@@ -60,8 +77,7 @@ class InputController:
             move_time = duration if duration is not None else self.move_duration
 
             # 确保坐标在屏幕范围内
-            x = max(0, min(x, self.screen_width - 1))
-            y = max(0, min(y, self.screen_height - 1))
+            x, y = self._clamp_to_screen(x, y)
 
             pyautogui.moveTo(x, y, duration=move_time)
 
@@ -77,8 +93,7 @@ class InputController:
         """移动鼠标到指定位置"""
         try:
             # 确保坐标在屏幕范围内
-            x = max(0, min(x, self.screen_width - 1))
-            y = max(0, min(y, self.screen_height - 1))
+            x, y = self._clamp_to_screen(x, y)
 
             # 使用指定持续时间或默认值
             move_time = duration if duration is not None else self.move_duration
@@ -168,10 +183,8 @@ class InputController:
         """拖动鼠标"""
         try:
             # 确保坐标在屏幕范围内
-            start_x = max(0, min(start_x, self.screen_width - 1))
-            start_y = max(0, min(start_y, self.screen_height - 1))
-            end_x = max(0, min(end_x, self.screen_width - 1))
-            end_y = max(0, min(end_y, self.screen_height - 1))
+            start_x, start_y = self._clamp_to_screen(start_x, start_y)
+            end_x, end_y = self._clamp_to_screen(end_x, end_y)
 
             # 使用指定持续时间或默认值
             drag_time = duration if duration is not None else self.move_duration
@@ -2,13 +2,494 @@
 # -*- coding: utf-8 -*-
 
 import time
+import weakref
+import itertools
+import threading
+from queue import Queue, Empty, Full
 import numpy as np
-import mss
-import mss.tools
 from PIL import Image
 import cv2
 from loguru import logger
 
+try:
+    from .capture_backends import get_capture_backend, select_capture_backend, CAPTURE_BACKENDS
+    from .capture_metrics import CaptureMetrics
+    from .window_target import WindowTarget
+except ImportError:
+    # 处理独立运行时的导入
+    from core.capture_backends import get_capture_backend, select_capture_backend, CAPTURE_BACKENDS
+    from core.capture_metrics import CaptureMetrics
+    from core.window_target import WindowTarget
+
+
+# 各后端通道顺序到BGR/灰度的颜色转换码，None表示无需转换
+_TO_BGR = {
+    "BGRA": cv2.COLOR_BGRA2BGR,
+    "RGB": cv2.COLOR_RGB2BGR,
+    "BGR": None,
+    "GRAY": cv2.COLOR_GRAY2BGR,
+}
+_TO_GRAY = {
+    "BGRA": cv2.COLOR_BGRA2GRAY,
+    "RGB": cv2.COLOR_RGB2GRAY,
+    "BGR": cv2.COLOR_BGR2GRAY,
+    "GRAY": None,
+}
+
+
+# 进程内全局的帧序列号计数器，保证不同ScreenCapture实例产生的序列号也不会重复
+_frame_sequence = itertools.count(1)
+
+
+def compute_tile_hashes(image, tile_size, weights=None, padded=None):
+    """计算图像按固定网格划分的每个图块的哈希值
+    
+    每个图块按8字节为一组解释为uint64，与固定的随机奇数权重相乘后求和（按2^64取模）。
+    
+    Args:
+        image: uint8图像，单通道或多通道
+        tile_size: 图块边长（像素），需为8的倍数
+        weights: 形状为 (tile_size, tile_size*通道数/8) 的uint64权重，None时自动生成
+        padded: 可复用的填充缓冲区，图像尺寸不是图块整数倍时使用
+        
+    Returns:
+        形状为 (行数, 列数) 的uint64哈希数组
+    """
+    height, width = image.shape[:2]
+    channels = image.shape[2] if image.ndim == 3 else 1
+    rows = -(-height // tile_size)
+    cols = -(-width // tile_size)
+    words_per_row = tile_size * channels // 8
+    
+    if weights is None:
+        weights = _tile_hash_weights(tile_size, words_per_row)
+    
+    if (rows * tile_size, cols * tile_size) != (height, width) or not image.flags.c_contiguous:
+        # 不足一个图块的边缘部分用0填充
+        padded_shape = (rows * tile_size, cols * tile_size) + image.shape[2:]
+        if padded is None or padded.shape != padded_shape:
+            padded = np.zeros(padded_shape, dtype=np.uint8)
+        padded[:height, :width] = image
+        image = padded
+    
+    words = image.reshape(rows * tile_size, -1).view(np.uint64).reshape(rows, tile_size, cols, words_per_row)
+    return np.einsum("rtck,tk->rc", words, weights)
+
+
+def _tile_hash_weights(tile_size, words_per_row):
+    """生成固定种子的随机奇数权重"""
+    rng = np.random.default_rng(0x5A5C)
+    return rng.integers(1, 2 ** 63, size=(tile_size, words_per_row), dtype=np.uint64) | np.uint64(1)
+
+
+class TileState:
+    """帧的图块变化状态
+    
+    Attributes:
+        tile_size: 图块边长（像素，帧坐标）
+        changed_seq: 形状为 (行数, 列数) 的数组，记录每个图块最后一次发生变化时的帧序列号
+        dirty_tiles: 相比上一帧发生变化的图块集合 {(行, 列), ...}
+    """
+    
+    __slots__ = ("tile_size", "changed_seq", "dirty_tiles")
+    
+    def __init__(self, tile_size, changed_seq, dirty_tiles):
+        self.tile_size = tile_size
+        self.changed_seq = changed_seq
+        self.dirty_tiles = dirty_tiles
+    
+    def is_clean_since(self, seq, rect=None):
+        """判断区域内的图块自指定帧之后是否都没有变化
+        
+        Args:
+            seq: 参照帧的序列号
+            rect: 帧坐标下的区域 (x1, y1, x2, y2)，None表示整帧
+        """
+        changed = self.changed_seq
+        if rect is not None:
+            x1, y1, x2, y2 = rect
+            changed = changed[max(0, y1) // self.tile_size:-(-y2 // self.tile_size),
+                              max(0, x1) // self.tile_size:-(-x2 // self.tile_size)]
+        return changed.size == 0 or int(changed.max()) <= seq
+
+
+class TileChangeTracker:
+    """按固定网格计算每帧的图块哈希，检测相比上一帧发生变化的图块"""
+    
+    def __init__(self, tile_size=64):
+        # 哈希按8字节分组，图块边长需为8的倍数
+        self.tile_size = max(8, (tile_size + 7) // 8 * 8)
+        self._weights = {}
+        self._padded = None
+        self._hashes = None
+        self._changed_seq = None
+        self._shape = None
+    
+    def update(self, image, seq):
+        """计算新一帧的图块哈希并与上一帧比较
+        
+        Returns:
+            TileState，形状变化后的第一帧所有图块均视为变化
+        """
+        channels = image.shape[2] if image.ndim == 3 else 1
+        weights = self._weights.get(channels)
+        if weights is None:
+            weights = _tile_hash_weights(self.tile_size, self.tile_size * channels // 8)
+            self._weights[channels] = weights
+        
+        # 尺寸不是图块整数倍时复用同一个填充缓冲区
+        padded_shape = (-(-image.shape[0] // self.tile_size) * self.tile_size,
+                        -(-image.shape[1] // self.tile_size) * self.tile_size) + image.shape[2:]
+        if padded_shape != image.shape and (self._padded is None or self._padded.shape != padded_shape):
+            self._padded = np.zeros(padded_shape, dtype=np.uint8)
+        hashes = compute_tile_hashes(image, self.tile_size, weights, self._padded)
+        
+        if self._hashes is None or self._shape != image.shape:
+            # 首帧或尺寸变化，全部图块视为变化
+            self._changed_seq = np.full(hashes.shape, seq, dtype=np.int64)
+            dirty = np.ones(hashes.shape, dtype=bool)
+        else:
+            dirty = hashes != self._hashes
+            self._changed_seq[dirty] = seq
+        
+        self._hashes = hashes
+        self._shape = image.shape
+        dirty_tiles = frozenset(map(tuple, np.argwhere(dirty).tolist()))
+        return TileState(self.tile_size, self._changed_seq.copy(), dirty_tiles)
+    
+    def reset(self):
+        """清除历史哈希，下一帧所有图块视为变化"""
+        self._hashes = None
+        self._shape = None
+
+
+class Frame:
+    """屏幕帧，携带像素缓冲区及捕获元数据
+    
+    Attributes:
+        image: 像素数据（numpy数组或PIL图像）
+        seq: 单调递增的帧序列号
+        timestamp_ns: 捕获时刻的time.perf_counter_ns()
+        region: 捕获区域的屏幕坐标 (x1, y1, x2, y2)
+        scale_factor: 相对屏幕坐标的缩放比例
+        tile_state: 图块变化状态（TileState），未启用脏区检测时为None
+        context: 捕获时采样的附加信息，如 {"cursor": (x, y), "foreground_window": {...}}，未启用时为None
+    """
+    
+    __slots__ = ("image", "seq", "timestamp_ns", "region", "scale_factor", "tile_state", "context")
+    
+    def __init__(self, image, seq, timestamp_ns, region=None, scale_factor=1.0, tile_state=None, context=None):
+        self.image = image
+        self.seq = seq
+        self.timestamp_ns = timestamp_ns
+        self.region = region
+        self.scale_factor = scale_factor
+        self.tile_state = tile_state
+        self.context = context
+    
+    @property
+    def shape(self):
+        """像素数组的形状"""
+        return self.image.shape
+    
+    @property
+    def is_gray(self):
+        """是否为单通道灰度帧"""
+        return getattr(self.image, "ndim", 3) == 2
+    
+    def to_screen(self, x, y):
+        """将帧内坐标转换为屏幕坐标"""
+        left, top = (self.region[0], self.region[1]) if self.region is not None else (0, 0)
+        return (int(x / self.scale_factor) + left, int(y / self.scale_factor) + top)
+    
+    def age_ms(self):
+        """帧从捕获至今经过的毫秒数"""
+        return (time.perf_counter_ns() - self.timestamp_ns) / 1e6
+    
+    def copy(self):
+        """复制像素数据，返回新的Frame（元数据保持不变）"""
+        return Frame(self.image.copy(), self.seq, self.timestamp_ns, self.region, self.scale_factor,
+                     self.tile_state, self.context)
+    
+    def __repr__(self):
+        return f"Frame(seq={self.seq}, shape={getattr(self.image, 'shape', None)}, region={self.region}, scale={self.scale_factor})"
+
+
+class FramePacer:
+    """基于截止时间的帧节拍器，限制最大捕获频率
+    
+    每帧开始前只休眠到上一帧开始时间加帧预算的截止时刻，调用方本身已经足够慢时不再额外等待；
+    单帧耗时超出预算时记录为超时，而不是盲目追加延迟。
+    """
+    
+    def __init__(self, max_fps=None, frame_budget=None, sleep=time.sleep, clock=time.perf_counter):
+        """
+        Args:
+            max_fps: 最大帧率，优先于frame_budget
+            frame_budget: 每帧时间预算（秒），0或None表示不限制
+            sleep: 休眠函数，可替换为Event.wait以便随时中断
+            clock: 单调时钟（秒），测试中可替换为可控的时钟
+        """
+        if max_fps:
+            frame_budget = 1.0 / max_fps
+        self.frame_budget = frame_budget or 0.0
+        self.sleep = sleep
+        self.clock = clock
+        self.lock = threading.Lock()
+        self._last_start = None
+        self.frames = 0
+        self.overruns = 0
+        self.max_overrun = 0.0
+        self.total_sleep = 0.0
+    
+    def wait(self):
+        """在开始新一帧前调用，休眠到本帧的截止时刻
+        
+        Returns:
+            float: 实际休眠的秒数
+        """
+        now = self.clock()
+        with self.lock:
+            remaining = self._last_start + self.frame_budget - now if self._last_start is not None else 0.0
+            # 先占用截止时刻，并发调用方依次排队；已落后时以当前时刻为新起点，不为追赶进度而连续抓帧
+            self._last_start = now + max(0.0, remaining)
+        
+        if remaining > 0:
+            self.sleep(remaining)
+            self.total_sleep += remaining
+            return remaining
+        return 0.0
+    
+    def record(self, elapsed):
+        """记录一帧的实际耗时（秒），超出预算时计为超时"""
+        self.frames += 1
+        if self.frame_budget and elapsed > self.frame_budget:
+            overrun = elapsed - self.frame_budget
+            self.overruns += 1
+            self.max_overrun = max(self.max_overrun, overrun)
+            logger.debug(f"帧耗时超出预算: {elapsed * 1000:.1f}ms > {self.frame_budget * 1000:.1f}ms")
+    
+    def get_stats(self):
+        """获取节拍统计信息"""
+        return {
+            "frame_budget_ms": self.frame_budget * 1000,
+            "frames": self.frames,
+            "overruns": self.overruns,
+            "max_overrun_ms": self.max_overrun * 1000,
+            "total_sleep_s": self.total_sleep,
+        }
+
+
+class AdaptiveRate:
+    """根据画面变化自适应调整捕获间隔
+    
+    连续帧未变化时按指数退避逐步拉长间隔，检测到变化的第一帧立即恢复到最高帧率，
+    间隔始终限制在 [1/max_fps, 1/min_fps] 之间。
+    """
+    
+    def __init__(self, max_fps, min_fps=2, backoff=1.5):
+        """
+        Args:
+            max_fps: 最高帧率（画面变化时）
+            min_fps: 最低帧率（画面长时间静止时）
+            backoff: 每个未变化帧的间隔放大倍数
+        """
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.max_interval = max(self.min_interval, 1.0 / min_fps if min_fps else self.min_interval)
+        self.backoff = max(1.0, backoff)
+        self.interval = self.min_interval
+        self._previous = None
+        self.changed_frames = 0
+        self.unchanged_frames = 0
+    
+    def _changed(self, frame):
+        """判断画面相比上一帧是否变化
+        
+        优先使用帧自带的图块变化状态（启用脏区检测时已计算，无额外开销）；
+        否则与上一帧逐像素比较整帧，单个像素的变化（如光标、文字）也能检测到。
+        """
+        tile_state = getattr(frame, "tile_state", None)
+        if tile_state is not None:
+            return bool(tile_state.dirty_tiles)
+        
+        image = np.asarray(getattr(frame, "image", frame))
+        if self._previous is None or self._previous.shape != image.shape or self._previous.dtype != image.dtype:
+            self._previous = image.copy()
+            return True
+        if np.array_equal(image, self._previous):
+            return False
+        # 复制到自有缓冲区，零拷贝模式下原图像会被下一帧覆盖
+        np.copyto(self._previous, image)
+        return True
+    
+    def observe(self, frame):
+        """根据新一帧更新捕获间隔
+        
+        Args:
+            frame: Frame对象或numpy数组，None表示捕获失败（保持当前间隔）
+            
+        Returns:
+            float: 下一帧的捕获间隔（秒）
+        """
+        if frame is None:
+            return self.interval
+        if self._changed(frame):
+            self.changed_frames += 1
+            self.interval = self.min_interval
+        else:
+            self.unchanged_frames += 1
+            # 从最高帧率的间隔开始指数放大，min_interval为0时从1ms起步
+            self.interval = min(self.max_interval, max(self.interval, self.min_interval, 0.001) * self.backoff)
+        return self.interval
+    
+    def get_stats(self):
+        """获取自适应帧率统计信息"""
+        return {
+            "current_fps": 1.0 / self.interval if self.interval else None,
+            "min_fps": 1.0 / self.max_interval if self.max_interval else None,
+            "max_fps": 1.0 / self.min_interval if self.min_interval else None,
+            "changed_frames": self.changed_frames,
+            "unchanged_frames": self.unchanged_frames,
+        }
+
+
+class PipelineStageStats:
+    """流水线单个阶段的吞吐统计：处理帧数、忙碌时间和等待上下游的时间"""
+    
+    def __init__(self, name):
+        self.name = name
+        self.frames = 0
+        self.busy = 0.0  # 实际工作时间（秒）
+        self.blocked = 0.0  # 等待队列的时间（秒）
+        self.failures = 0  # 失败次数（如捕获失败）
+        self.started = time.perf_counter()
+    
+    def get_stats(self):
+        wall = max(time.perf_counter() - self.started, 1e-9)
+        return {
+            "frames": self.frames,
+            "fps": self.frames / wall,
+            "busy_ms_per_frame": self.busy / self.frames * 1000 if self.frames else 0.0,
+            "utilization": self.busy / wall,
+            "blocked_s": self.blocked,
+            "failures": self.failures,
+        }
+
+
+class FrameRingBuffer:
+    """最新帧环形缓冲区，生产者线程写入预分配的槽位，消费者无阻塞地读取最新帧
+    
+    缓冲区满时直接覆盖最旧的槽位（丢弃最旧帧），生产者永不阻塞。
+    像素复制在锁外进行，每个槽位带写入版本号：读取方复制后重新检查版本号，
+    复制期间槽位被生产者改写时重新读取，保证返回的像素与元数据属于同一帧。
+    """
+    
+    def __init__(self, size=3):
+        self.size = max(2, size)
+        self.slots = None
+        self.lock = threading.Lock()
+        self._versions = None  # 各槽位的写入版本号，生产者开始改写槽位时递增
+        self._write_index = 0
+        self._latest_index = -1
+        self._latest_read = True
+        self.frames_written = 0
+        self.frames_dropped = 0  # 未被读取就被新帧取代的帧数
+        self.torn_reads = 0  # 复制期间槽位被改写而重新读取的次数
+    
+    def _allocate(self, image):
+        """按首帧的形状预分配全部槽位"""
+        self.slots = [Frame(np.empty_like(image), 0, 0) for _ in range(self.size)]
+        self._versions = [0] * self.size
+        self._write_index = 0
+        self._latest_index = -1
+    
+    def write(self, frame):
+        """将一帧的像素复制到下一个槽位并发布为最新帧"""
+        image = frame.image
+        with self.lock:
+            if self.slots is None or self.slots[0].image.shape != image.shape or self.slots[0].image.dtype != image.dtype:
+                self._allocate(image)
+            index = self._write_index
+            slot = self.slots[index]
+            # 先递增版本号再改写像素，正在复制该槽位的读取方可以发现
+            self._versions[index] += 1
+        
+        np.copyto(slot.image, image)
+        
+        with self.lock:
+            slot.seq = frame.seq
+            slot.timestamp_ns = frame.timestamp_ns
+            slot.region = frame.region
+            slot.scale_factor = frame.scale_factor
+            slot.tile_state = frame.tile_state
+            slot.context = frame.context
+            if not self._latest_read:
+                self.frames_dropped += 1
+            self._latest_index = index
+            self._latest_read = False
+            self._write_index = (index + 1) % self.size
+            self.frames_written += 1
+    
+    def latest(self, copy=False):
+        """获取最新帧，尚无帧时返回None
+        
+        返回的Frame对象总是元数据的快照，不会随生产者写入而改变。
+        
+        Args:
+            copy: 是否复制像素。不复制时像素为槽位本身，生产者再写入size-1帧后会被覆盖；
+                  复制时保证像素与seq、timestamp_ns属于同一帧
+        """
+        while True:
+            with self.lock:
+                if self._latest_index < 0:
+                    return None
+                index = self._latest_index
+                slot = self.slots[index]
+                versions = self._versions
+                version = versions[index]
+                snapshot = Frame(slot.image, slot.seq, slot.timestamp_ns, slot.region, slot.scale_factor,
+                                 slot.tile_state, slot.context)
+                self._latest_read = True
+            if not copy:
+                return snapshot
+            
+            image = snapshot.image.copy()
+            with self.lock:
+                if self._versions is versions and versions[index] == version:
+                    snapshot.image = image
+                    return snapshot
+                self.torn_reads += 1
+    
+    def get_stats(self):
+        """获取缓冲区统计信息"""
+        with self.lock:
+            return {
+                "size": self.size,
+                "frames_written": self.frames_written,
+                "frames_dropped": self.frames_dropped,
+                "torn_reads": self.torn_reads,
+            }
+
+
+class _ThreadBackend:
+    """线程私有的截图后端句柄，所属线程结束时随线程局部存储一起释放并关闭后端"""
+    
+    __slots__ = ("backend", "__weakref__")
+    
+    def __init__(self, backend):
+        self.backend = backend
+    
+    def close(self):
+        backend, self.backend = self.backend, None
+        if backend is not None:
+            backend.close()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
 
 class ScreenCapture:
     """屏幕捕获模块，负责高效地捕获屏幕内容"""
@@ -21,38 +502,167 @@ class ScreenCapture:
         self.use_delay = self.config.get("use_delay", True)  # 是否使用延迟，默认使用
         self.delay = self.config.get("capture_delay", 0.01)  # 默认延迟0.01秒
         
+        # 帧节拍：限制最大捕获频率，只休眠帧预算的剩余时间。未配置max_capture_fps时，以capture_delay作为帧预算
+        self.max_capture_fps = self.config.get("max_capture_fps", None)
+        if self.max_capture_fps:
+            self.pacer = FramePacer(max_fps=self.max_capture_fps)
+        else:
+            self.pacer = FramePacer(frame_budget=self.delay if self.use_delay else 0.0)
+        
+        # 流水线指标：按阶段和后端记录延迟直方图及失败次数，开销很低可常开
+        metrics_config = self.config.get("metrics", {}) or {}
+        self.metrics = CaptureMetrics(enabled=metrics_config.get("enabled", True),
+                                      precision_bits=metrics_config.get("precision_bits", 4))
+        
         # 截图方法配置
         self.capture_method = self.config.get("capture_method", "mss")  # 默认使用mss
         
+        # 帧模式配置："standard"每次返回新分配的BGR图像，"zero_copy"直接包装原始缓冲区并输出到可复用的灰度缓冲区
+        self.frame_mode = self.config.get("frame_mode", "standard")
+        self.zero_copy = self.frame_mode == "zero_copy"
+        # 颜色模式："bgr"三通道，"gray"直接从原始缓冲区转换为单通道灰度图（识别模块将跳过自身的颜色转换）
+        self.color_mode = self.config.get("color_mode", "gray" if self.zero_copy else "bgr")
+        # 线程局部存储：不能跨线程共享的后端在每个线程中各自创建，零拷贝输出缓冲区也按线程隔离
+        self._thread_local = threading.local()
+        self._thread_backends = weakref.WeakSet()
+        self._thread_backends_lock = threading.Lock()
+        # 保护图块跟踪器等跨帧状态，允许多个线程同时调用capture()
+        self._frame_state_lock = threading.Lock()
+        
+        # 流式捕获配置
+        stream_config = self.config.get("stream", {}) or {}
+        self.stream_target_fps = stream_config.get("target_fps", 30)  # 目标帧率
+        self.stream_ring_size = stream_config.get("ring_size", 3)  # 环形缓冲区槽位数
+        self._stream_thread = None
+        self._stream_stop = threading.Event()
+        self._frame_ring = None
+        self.stream_pacer = None
+        
+        # 自适应帧率配置：画面静止时指数降低continuous_capture和流式捕获的频率，画面变化时立即恢复
+        adaptive_config = self.config.get("adaptive_rate", {}) or {}
+        self.adaptive_rate = adaptive_config.get("enabled", False)
+        self.adaptive_min_fps = adaptive_config.get("min_fps", 2)
+        self.adaptive_max_fps = adaptive_config.get("max_fps", None)  # None表示使用各模式本身的帧率
+        self.adaptive_backoff = adaptive_config.get("backoff", 1.5)
+        self.stream_rate = None
+        self.continuous_rate = None
+        
+        # 流水线捕获：捕获线程与处理线程并行，阶段之间为有界队列
+        pipeline_config = self.config.get("pipeline", {}) or {}
+        self.pipeline_queue_size = pipeline_config.get("queue_size", 2)  # 阶段间队列长度
+        self.pipeline_max_failures = pipeline_config.get("max_consecutive_failures", 50)  # 连续捕获失败多少次后结束
+        self._pipeline_stop = threading.Event()
+        self._pipeline_stats = None
+        
+        # 脏区检测配置：按固定网格计算图块哈希，供识别模块跳过未变化的画面
+        dirty_config = self.config.get("dirty_tiles", {}) or {}
+        self.tile_tracker = TileChangeTracker(dirty_config.get("tile_size", 64)) if dirty_config.get("enabled", False) else None
+        self.dirty_tiles = frozenset()  # 最近一帧相比上一帧发生变化的图块
+        
+        # 帧上下文配置：捕获时采样鼠标位置和前台窗口并附加到帧上，排查误点击时无需事后再查询
+        context_config = self.config.get("frame_context", {}) or {}
+        self.context_sampler = None
+        if context_config.get("enabled", False):
+            try:
+                from .frame_context import FrameContextSampler
+            except ImportError:
+                from core.frame_context import FrameContextSampler
+            self.context_sampler = FrameContextSampler(cursor=context_config.get("cursor", True),
+                                                       foreground=context_config.get("foreground", True),
+                                                       window_text=context_config.get("window_text", True))
+        
+        # 会话录制配置：将每帧及元数据追加到内存映射的帧归档，可直接作为回放源
+        recording_config = self.config.get("recording", {}) or {}
+        self.recording_chunk_mb = recording_config.get("chunk_mb", 64)
+        self.recorder = None
+        if recording_config.get("path"):
+            self.start_recording(recording_config["path"])
+        
+        # 帧总线配置：将每帧写入共享内存，供其他进程零拷贝读取
+        self.frame_bus = None
+        self._owns_frame_bus = False
+        bus_config = self.config.get("frame_bus", {}) or {}
+        if bus_config.get("enabled", False):
+            try:
+                from .frame_bus import FrameBusWriter
+            except ImportError:
+                from core.frame_bus import FrameBusWriter
+            self.attach_frame_bus(FrameBusWriter(
+                name=bus_config.get("name"),
+                slots=bus_config.get("slots", 4),
+                max_frame_bytes=bus_config.get("max_frame_bytes", 1920 * 1080 * 3),
+            ), owned=True)
+        
         # 质量设置
         self.quality = self.config.get("quality", "medium")  # 默认中等质量
         self._setup_quality_settings()
         
+        # 后台写入配置：save_screenshot在工作线程中编码写盘，JPEG质量沿用质量设置中的jpeg_quality
+        writer_config = self.config.get("async_writer", {}) or {}
+        if writer_config.get("enabled", False):
+            try:
+                from .async_writer import AsyncImageWriter
+            except ImportError:
+                from core.async_writer import AsyncImageWriter
+            self.async_writer = AsyncImageWriter(writer_config, jpeg_quality=self.jpeg_quality)
+        else:
+            self.async_writer = None
+        
         # 根据截图方法初始化相应的对象
         self._init_capture_method()
         
         # 设置捕获区域
         self._setup_capture_region()
         
+        # 窗口绑定配置：按句柄跟踪窗口矩形，窗口移动或缩放时自动更新捕获区域
+        self.window_target = None
+        window_config = self.config.get("window", {}) or {}
+        if window_config.get("hwnd") or window_config.get("title") or window_config.get("class"):
+            self.bind_window(hwnd=window_config.get("hwnd"),
+                             title=window_config.get("title"),
+                             window_class=window_config.get("class"),
+                             revalidate_interval=window_config.get("revalidate_interval", 0.5),
+                             client_area=window_config.get("client_area", True))
+        
         logger.info(f"屏幕捕获初始化完成，捕获方法: {self.capture_method}，捕获区域: {self.monitor}，质量设置: {self.quality}")
     
     def _init_capture_method(self):
-        """根据配置的截图方法初始化相应的对象"""
-        if self.capture_method == "mss":
-            self.sct = mss.mss()
-            logger.info("使用mss库进行屏幕捕获")
-        elif self.capture_method == "pil":
-            # PIL方式不需要特殊初始化
-            logger.info("使用PIL库进行屏幕捕获")
-        elif self.capture_method == "pyautogui":
-            import pyautogui
-            # 禁用pyautogui的安全检查
-            pyautogui.FAILSAFE = False
-            logger.info("使用pyautogui库进行屏幕捕获")
-        else:
-            logger.warning(f"未知的截图方法: {self.capture_method}，默认使用mss")
+        """根据配置的截图方法，从后端注册表中创建相应的截图后端"""
+        if self.capture_method == "auto":
+            # 测试各候选后端后选择最快的正确后端，结果按显示配置缓存
+            self.capture_method = select_capture_backend(self.config)
+        backend_cls = get_capture_backend(self.capture_method)
+        if backend_cls is None:
+            logger.warning(f"未知的截图方法: {self.capture_method}，默认使用mss（可用: {list(CAPTURE_BACKENDS)}）")
             self.capture_method = "mss"
-            self.sct = mss.mss()
+            backend_cls = get_capture_backend("mss")
+        self.backend = backend_cls(self.config)
+        self._backend_thread = threading.get_ident()
+    
+    def _get_backend(self):
+        """获取当前线程可用的截图后端
+        
+        线程安全的后端以及创建ScreenCapture的线程直接使用self.backend；
+        其他线程首次调用时惰性创建自己的后端实例，线程结束时自动关闭
+        """
+        if self.backend.thread_safe or threading.get_ident() == self._backend_thread:
+            return self.backend
+        
+        handle = getattr(self._thread_local, "backend", None)
+        if handle is None or handle.backend is None:
+            handle = _ThreadBackend(type(self.backend)(self.config))
+            self._thread_local.backend = handle
+            with self._thread_backends_lock:
+                self._thread_backends.add(handle)
+            logger.debug(f"为线程 {threading.current_thread().name} 创建截图后端: {self.capture_method}")
+        return handle.backend
+    
+    def _release_thread_backend(self):
+        """提前关闭当前线程的截图后端（线程结束时也会自动关闭）"""
+        handle = getattr(self._thread_local, "backend", None)
+        if handle is not None:
+            self._thread_local.backend = None
+            handle.close()
     
     def _setup_quality_settings(self):
         """根据质量设置调整参数"""
@@ -75,182 +685,234 @@ class ScreenCapture:
     def _setup_capture_region(self):
         """设置捕获区域"""
         if self.region is None:
-            # 全屏捕获
-            if self.capture_method == "mss":
-                self.monitor = self.sct.monitors[self.sct_monitor]  # 显示器
-            else:
-                # PIL和pyautogui不需要设置monitor对象
-                self.monitor = None
+            # 全屏捕获，后端不提供显示器信息时（如PIL和pyautogui）由后端自行抓取整个屏幕
+            monitors = self.backend.monitors()
+            self.monitor = monitors[self.sct_monitor] if 0 <= self.sct_monitor < len(monitors) else None
         else:
             # 指定区域捕获
-            if self.capture_method == "mss":
-                x1, y1, x2, y2 = self.region
-                self.monitor = {
-                    "top": y1,
-                    "left": x1,
-                    "width": x2 - x1,
-                    "height": y2 - y1
-                }
-            else:
-                # PIL和pyautogui直接使用region参数
-                self.monitor = None
+            x1, y1, x2, y2 = self.region
+            self.monitor = {
+                "top": y1,
+                "left": x1,
+                "width": x2 - x1,
+                "height": y2 - y1
+            }
     
     def get_monitor_count(self):
         """获取连接的显示器数量"""
-        if self.capture_method == "mss":
-            return len(self.sct.monitors) - 1  # 减1因为第一个是虚拟显示器
-        elif self.capture_method == "pyautogui":
-            return len(pyautogui.screens())
-        else:
-            return 1  # PIL 默认返回1
+        return self._get_backend().monitor_count()
 
+    def _get_frame_buffer(self, name, shape, dtype=np.uint8):
+        """获取当前线程可复用的帧缓冲区，形状变化时重新分配"""
+        buffers = getattr(self._thread_local, "frame_buffers", None)
+        if buffers is None:
+            buffers = self._thread_local.frame_buffers = {}
+        buffer = buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            buffers[name] = buffer
+        return buffer
+    
+    def _finish_zero_copy(self, raw, color_code, backend_name=None):
+        """将原始图像一次性转换为目标颜色模式并写入可复用缓冲区，必要时缩放
+        
+        注意：返回的数组在下一次捕获时会被覆盖，如需长期保存请自行copy()
+        """
+        channel_shape = () if self.color_mode == "gray" else (3,)
+        start = time.perf_counter_ns()
+        if color_code is None:
+            img = raw
+        else:
+            img = self._get_frame_buffer("converted", raw.shape[:2] + channel_shape)
+            cv2.cvtColor(raw, color_code, dst=img)
+        
+        if self.scale_factor != 1.0:
+            converted = time.perf_counter_ns()
+            self.metrics.record("convert", backend_name, converted - start)
+            new_width = int(img.shape[1] * self.scale_factor)
+            new_height = int(img.shape[0] * self.scale_factor)
+            scaled = self._get_frame_buffer("scaled", (new_height, new_width) + channel_shape)
+            cv2.resize(img, (new_width, new_height), dst=scaled, interpolation=cv2.INTER_AREA)
+            self.metrics.record("resize", backend_name, time.perf_counter_ns() - converted)
+            return scaled
+        
+        if img is raw:
+            # 源本身已是目标格式时复制到可复用缓冲区，避免把后端内部的只读视图交给调用方
+            img = self._get_frame_buffer("converted", raw.shape)
+            np.copyto(img, raw)
+        self.metrics.record("convert", backend_name, time.perf_counter_ns() - start)
+        return img
+    
     def capture(self, as_numpy=True):
-        """捕获屏幕"""
+        """捕获屏幕
+        
+        color_mode为"gray"时返回单通道灰度图；frame_mode为"zero_copy"且as_numpy为True时，
+        返回的数组为内部复用的缓冲区，下一次捕获时会被覆盖
+        """
+        frame = self.capture_frame(as_numpy)
+        return frame.image if frame is not None else None
+    
+    def capture_frame(self, as_numpy=True):
+        """捕获屏幕并返回带序列号、捕获时间、区域和缩放比例的Frame对象
+        
+        Returns:
+            Frame或None（捕获失败）
+        """
+        # 按截止时间节拍，只等待距上一帧开始的剩余预算
+        slept = self.pacer.wait()
+        start = time.perf_counter()
+        frame = self._capture_frame(as_numpy)
+        elapsed = time.perf_counter() - start
+        self.pacer.record(elapsed)
+        
+        backend_name = self._backend_name()
+        self.metrics.record("sleep", backend_name, slept * 1e9)
+        self.metrics.record("total", backend_name, elapsed * 1e9)
+        return frame
+    
+    def _capture_frame(self, as_numpy=True, backend=None):
+        """抓取一帧并附加元数据，不包含捕获延迟"""
+        if self.window_target is not None:
+            self._sync_window_region()
+        timestamp_ns = time.perf_counter_ns()
+        img = self._grab_frame(as_numpy, backend)
+        if img is None:
+            return None
+        
+        frame = Frame(img, next(_frame_sequence), timestamp_ns, self._capture_bounds(), self.scale_factor)
+        if self.context_sampler is not None:
+            frame.context = self.context_sampler.sample()
+        if self.tile_tracker is not None and as_numpy:
+            with self._frame_state_lock:
+                frame.tile_state = self.tile_tracker.update(img, frame.seq)
+                self.dirty_tiles = frame.tile_state.dirty_tiles
+        if self.frame_bus is not None and as_numpy:
+            self.frame_bus.write(frame)
+        if self.recorder is not None and as_numpy:
+            self.recorder.append(frame)
+        return frame
+    
+    def _backend_name(self, backend=None):
+        """指标中使用的后端名称"""
+        return getattr(backend or self.backend, "name", None) or self.capture_method
+    
+    def _capture_bounds(self):
+        """当前捕获区域的屏幕坐标 (x1, y1, x2, y2)，无法确定时返回None"""
+        if self.region is not None:
+            return tuple(self.region)
+        if self.monitor is not None:
+            left, top = self.monitor["left"], self.monitor["top"]
+            return (left, top, left + self.monitor["width"], top + self.monitor["height"])
+        return None
+    
+    def _grab_frame(self, as_numpy=True, backend=None, monitor=None):
+        """抓取一帧并完成颜色转换和缩放，不包含捕获延迟
+        
+        Args:
+            as_numpy: 是否返回numpy数组
+            backend: 使用的截图后端，None表示使用当前线程的后端
+            monitor: 抓取区域，None表示使用当前捕获区域
+        """
+        backend = backend or self._get_backend()
+        backend_name = self._backend_name(backend)
+        metrics = self.metrics
         try:
-            screenshot = None
-            
-            if self.capture_method == "mss":
-                # 使用mss捕获屏幕
-                screenshot = self.sct.grab(self.monitor)
-                
-                if as_numpy:
-                    # 转换为numpy数组
-                    img = np.array(screenshot)
-                    # mss返回的是BGRA格式，转换为BGR
-                    img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-                else:
-                    # 返回PIL图像
-                    img = Image.frombytes("RGB", screenshot.size, screenshot.rgb)
-                    
-            elif self.capture_method == "pil":
-                # 使用PIL ImageGrab捕获屏幕
-                from PIL import ImageGrab
-                
-                if self.region is None:
-                    # 全屏捕获
-                    screenshot = ImageGrab.grab(all_screens=True)
-                else:
-                    # 区域捕获
-                    x1, y1, x2, y2 = self.region
-                    screenshot = ImageGrab.grab(bbox=(x1, y1, x2, y2))
-                
-                if as_numpy:
-                    # 转换为numpy数组
-                    img = np.array(screenshot)
-                    # PIL返回的是RGB格式，转换为BGR
-                    img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-                else:
-                    img = screenshot
-                    
-            elif self.capture_method == "pyautogui":
-                # 使用pyautogui捕获屏幕
-                import pyautogui
-                
-                if self.region is None:
-                    # 全屏捕获
-                    screenshot = pyautogui.screenshot()
-                else:
-                    # 区域捕获
-                    x1, y1, x2, y2 = self.region
-                    screenshot = pyautogui.screenshot(region=(x1, y1, x2-x1, y2-y1))
-                
-                if as_numpy:
-                    # 转换为numpy数组
-                    img = np.array(screenshot)
-                    # pyautogui返回的是RGB格式，转换为BGR
-                    img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-                else:
-                    img = screenshot
+            monitor = monitor if monitor is not None else self.monitor
             
-            # 根据质量设置调整分辨率
-            if self.scale_factor != 1.0:
-                if as_numpy:
-                    new_width = int(img.shape[1] * self.scale_factor)
-                    new_height = int(img.shape[0] * self.scale_factor)
-                    img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_AREA)
-                else:
+            start = time.perf_counter_ns()
+            if not as_numpy:
+                # 返回PIL图像
+                img = backend.grab_image(monitor)
+                grabbed = time.perf_counter_ns()
+                metrics.record("grab", backend_name, grabbed - start)
+                if img is None:
+                    metrics.increment("none", backend_name)
+                elif self.scale_factor != 1.0:
                     new_width = int(img.width * self.scale_factor)
                     new_height = int(img.height * self.scale_factor)
                     img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+                    metrics.record("resize", backend_name, time.perf_counter_ns() - grabbed)
+                return img
+            
+            raw = backend.grab(monitor)
+            grabbed = time.perf_counter_ns()
+            metrics.record("grab", backend_name, grabbed - start)
+            if raw is None:
+                metrics.increment("none", backend_name)
+                return None
+            color_order = "GRAY" if raw.ndim == 2 else backend.color_order
+            code = (_TO_GRAY if self.color_mode == "gray" else _TO_BGR)[color_order]
+            
+            if self.zero_copy:
+                # 零拷贝：直接使用后端的原始缓冲区视图并一次性转换到可复用缓冲区
+                return self._finish_zero_copy(raw, code, backend_name)
+            
+            # 转换为目标颜色模式的新数组，灰度模式直接从原始格式转换为单通道
+            img = cv2.cvtColor(raw, code) if code is not None else np.array(raw)
+            converted = time.perf_counter_ns()
+            metrics.record("convert", backend_name, converted - grabbed)
             
-            # 根据配置添加延迟
-            if self.use_delay:
-                time.sleep(self.delay)
+            # 根据质量设置调整分辨率
+            if self.scale_factor != 1.0:
+                new_width = int(img.shape[1] * self.scale_factor)
+                new_height = int(img.shape[0] * self.scale_factor)
+                img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_AREA)
+                metrics.record("resize", backend_name, time.perf_counter_ns() - converted)
             
             return img
             
         except Exception as e:
+            metrics.increment("failures", backend_name)
             logger.error(f"屏幕捕获失败: {e}")
             return None
     
     def capture_region(self, x1, y1, x2, y2, as_numpy=True):
         """捕获指定区域"""
-        try:
-            screenshot = None
-            
-            if self.capture_method == "mss":
-                # 设置临时区域
-                temp_monitor = {
-                    "top": y1,
-                    "left": x1,
-                    "width": x2 - x1,
-                    "height": y2 - y1
-                }
-                
-                # 使用mss捕获指定区域
-                screenshot = self.sct.grab(temp_monitor)
-                
-                if as_numpy:
-                    # 转换为numpy数组
-                    img = np.array(screenshot)
-                    # mss返回的是BGRA格式，转换为BGR
-                    img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-                else:
-                    # 返回PIL图像
-                    img = Image.frombytes("RGB", screenshot.size, screenshot.rgb)
-                    
-            elif self.capture_method == "pil":
-                # 使用PIL ImageGrab捕获指定区域
-                from PIL import ImageGrab
-                screenshot = ImageGrab.grab(bbox=(x1, y1, x2, y2))
-                
-                if as_numpy:
-                    # 转换为numpy数组
-                    img = np.array(screenshot)
-                    # PIL返回的是RGB格式，转换为BGR
-                    img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-                else:
-                    img = screenshot
-                    
-            elif self.capture_method == "pyautogui":
-                # 使用pyautogui捕获指定区域
-                import pyautogui
-                screenshot = pyautogui.screenshot(region=(x1, y1, x2-x1, y2-y1))
-                
-                if as_numpy:
-                    # 转换为numpy数组
-                    img = np.array(screenshot)
-                    # pyautogui返回的是RGB格式，转换为BGR
-                    img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-                else:
-                    img = screenshot
-            
-            # 根据质量设置调整分辨率
-            if self.scale_factor != 1.0:
-                if as_numpy:
-                    new_width = int(img.shape[1] * self.scale_factor)
-                    new_height = int(img.shape[0] * self.scale_factor)
-                    img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_AREA)
-                else:
-                    new_width = int(img.width * self.scale_factor)
-                    new_height = int(img.height * self.scale_factor)
-                    img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            return img
+        # 设置临时区域
+        temp_monitor = {
+            "top": y1,
+            "left": x1,
+            "width": x2 - x1,
+            "height": y2 - y1
+        }
+        return self._grab_frame(as_numpy, monitor=temp_monitor)
+    
+    def capture_regions(self, regions):
+        """一次抓取多个区域的外接矩形，返回各区域的零拷贝切片
+        
+        Args:
+            regions: {名称: (x1, y1, x2, y2)} 字典或 [(名称, (x1, y1, x2, y2)), ...] 列表，坐标为屏幕坐标
             
-        except Exception as e:
-            logger.error(f"区域捕获失败: {e}")
+        Returns:
+            {名称: Frame} 字典，各Frame的image是同一次抓取结果的视图，region为该区域的屏幕坐标；
+            捕获失败时返回None。各区域的画面内容不同，每个Frame分配独立的序列号，
+            避免识别模块按序列号缓存的灰度图和金字塔在区域之间串用
+        """
+        items = list(regions.items()) if isinstance(regions, dict) else list(regions)
+        if not items:
+            return {}
+        
+        # 所有区域的外接矩形
+        bx1 = min(region[0] for _, region in items)
+        by1 = min(region[1] for _, region in items)
+        bx2 = max(region[2] for _, region in items)
+        by2 = max(region[3] for _, region in items)
+        
+        timestamp_ns = time.perf_counter_ns()
+        img = self._grab_frame(True, monitor={"top": by1, "left": bx1, "width": bx2 - bx1, "height": by2 - by1})
+        if img is None:
+            logger.error("多区域捕获失败")
             return None
+        
+        scale = self.scale_factor
+        views = {}
+        for name, (x1, y1, x2, y2) in items:
+            # 屏幕坐标换算为外接矩形图像内的坐标（考虑缩放）
+            sx1, sy1 = int((x1 - bx1) * scale), int((y1 - by1) * scale)
+            sx2, sy2 = int((x2 - bx1) * scale), int((y2 - by1) * scale)
+            views[name] = Frame(img[sy1:sy2, sx1:sx2], next(_frame_sequence), timestamp_ns, (x1, y1, x2, y2), scale)
+        
+        return views
     
     def save_screenshot(self, filename, region=None):
         """保存截图"""
@@ -263,6 +925,14 @@ class ScreenCapture:
                 x1, y1, x2, y2 = region
                 screenshot = self.capture_region(x1, y1, x2, y2, as_numpy=False)
             
+            if screenshot is not None and self.async_writer is not None:
+                # 交给后台写入器编码写盘，队列满时丢弃而不阻塞
+                if self.async_writer.submit(screenshot, filename):
+                    logger.debug(f"截图已提交后台写入: {filename}")
+                    return True
+                logger.warning(f"后台写入队列已满或超出磁盘预算，截图已丢弃: {filename}")
+                return False
+            
             if screenshot is not None:
                 # 根据文件扩展名决定保存格式和质量
                 if filename.lower().endswith(('.jpg', '.jpeg')):
@@ -287,21 +957,9 @@ class ScreenCapture:
     def get_screen_size(self):
         """获取屏幕尺寸"""
         try:
-            if self.capture_method == "mss":
-                monitor = self.sct.monitors[0]  # 主显示器
-                return (monitor["width"], monitor["height"])
-            elif self.capture_method == "pil":
-                from PIL import ImageGrab
-                # 使用PIL获取屏幕尺寸
-                screen = ImageGrab.grab(all_screens=True)
-                return (screen.width, screen.height)
-            elif self.capture_method == "pyautogui":
-                import pyautogui
-                # 使用pyautogui获取屏幕尺寸
-                return pyautogui.size()
-            else:
-                # 默认返回配置中的分辨率
-                return tuple(self.resolution)
+            size = self._get_backend().screen_size()
+            # 后端无法提供时返回配置中的分辨率
+            return tuple(size) if size else tuple(self.resolution)
         except Exception as e:
             logger.error(f"获取屏幕尺寸失败: {e}")
             return tuple(self.resolution)  # 返回配置的分辨率作为后备
@@ -317,6 +975,39 @@ class ScreenCapture:
             logger.error(f"设置捕获区域失败: {e}")
             return False
     
+    def bind_window(self, hwnd=None, title=None, window_class=None, revalidate_interval=0.5,
+                    client_area=True, win32=None):
+        """将捕获目标绑定到窗口，此后每次捕获前按间隔检查窗口矩形并自动更新捕获区域
+        
+        Args:
+            hwnd: 窗口句柄，已知时无需按标题查找
+            title: 窗口标题（部分匹配），仅在首次绑定或句柄失效时枚举窗口
+            window_class: 窗口类名
+            revalidate_interval: 重新读取窗口矩形的间隔（秒）
+            client_area: 是否只捕获客户区
+            win32: 替代win32gui的对象，用于测试
+            
+        Returns:
+            bool: 是否找到窗口
+        """
+        self.window_target = WindowTarget(hwnd, title, window_class, revalidate_interval, client_area, win32)
+        found = self._sync_window_region(force=True) is not None
+        if not found:
+            logger.warning(f"绑定窗口时未找到窗口: hwnd={hwnd}, title={title}, class={window_class}")
+        return found
+    
+    def unbind_window(self):
+        """解除窗口绑定，保留当前捕获区域"""
+        self.window_target = None
+    
+    def _sync_window_region(self, force=False):
+        """按窗口的最新矩形更新捕获区域，返回当前窗口矩形"""
+        rect = self.window_target.current_rect(force)
+        if rect is not None and (self.region is None or tuple(self.region) != rect):
+            with self._frame_state_lock:
+                self.set_capture_region(list(rect))
+        return rect
+    
     def reset_capture_region(self):
         """重置为全屏捕获"""
         try:
@@ -345,23 +1036,41 @@ class ScreenCapture:
             logger.error(f"捕获并处理失败: {e}")
             return None
     
+    def _create_adaptive_rate(self, max_fps):
+        """按配置创建自适应帧率控制器，未启用时返回None"""
+        if not self.adaptive_rate:
+            return None
+        return AdaptiveRate(self.adaptive_max_fps or max_fps, self.adaptive_min_fps, self.adaptive_backoff)
+    
     def continuous_capture(self, callback, interval=None, max_iterations=None):
-        """连续捕获屏幕并调用回调函数"""
+        """连续捕获屏幕并调用回调函数
+        
+        启用adaptive_rate时，interval作为画面变化时的最短间隔，画面静止时间隔逐步放大
+        """
         try:
             iteration = 0
             # 如果没有指定interval，使用质量设置中的处理延迟
             capture_interval = interval if interval is not None else self.processing_delay
+            rate = self.continuous_rate = self._create_adaptive_rate(1.0 / capture_interval if capture_interval else None)
+            pacer = FramePacer(frame_budget=capture_interval) if rate is not None else None
             
             while max_iterations is None or iteration < max_iterations:
+                if pacer is not None:
+                    # 按自适应间隔的截止时间等待，回调耗时计入间隔
+                    pacer.wait()
+                
                 # 捕获屏幕
-                screenshot = self.capture()
+                frame = self.capture_frame()
                 
-                if screenshot is not None:
+                if frame is not None:
                     # 调用回调函数
-                    callback(screenshot)
+                    callback(frame.image)
                 
-                # 等待指定间隔
-                time.sleep(capture_interval)
+                if rate is not None:
+                    pacer.frame_budget = rate.observe(frame)
+                else:
+                    # 等待指定间隔
+                    time.sleep(capture_interval)
                 iteration += 1
             
             logger.info(f"连续捕获完成，共迭代 {iteration} 次，使用间隔: {capture_interval}秒")
@@ -373,10 +1082,311 @@ class ScreenCapture:
             logger.error(f"连续捕获失败: {e}")
             return False
     
+    def pipelined_capture(self, callback, max_iterations=None, queue_size=None):
+        """流水线式连续捕获：后台线程捕获第N+1帧的同时，调用方线程中的回调处理第N帧
+        
+        两个阶段之间为有界队列，处理跟不上时捕获线程阻塞等待（背压），
+        有效帧率由较慢的阶段决定，而不是两个阶段耗时之和。帧率上限仍由帧节拍器控制。
+        
+        Args:
+            callback: 回调函数，参数为截图（numpy数组）
+            max_iterations: 最多捕获次数（与continuous_capture一致，捕获失败也计入），None表示直到调用stop_pipeline()
+            queue_size: 阶段间队列长度，None表示使用配置值
+            
+        Returns:
+            bool: 是否正常结束（连续捕获失败达到上限时返回False）
+        """
+        frames = Queue(maxsize=queue_size or self.pipeline_queue_size)
+        stop = self._pipeline_stop
+        stop.clear()
+        capture_stats = PipelineStageStats("capture")
+        process_stats = PipelineStageStats("process")
+        self._pipeline_stats = (capture_stats, process_stats)
+        
+        aborted = False
+        
+        def capture_loop():
+            # 捕获线程使用自己的后端实例，退出时关闭
+            nonlocal aborted
+            try:
+                iteration = 0
+                failures = 0
+                while not stop.is_set() and (max_iterations is None or iteration < max_iterations):
+                    start = time.perf_counter()
+                    frame = self.capture_frame()
+                    iteration += 1
+                    if frame is None:
+                        # 连续失败时指数退避，避免后端故障或回放结束时空转；超过上限则结束流水线
+                        failures += 1
+                        capture_stats.failures += 1
+                        if self.pipeline_max_failures and failures >= self.pipeline_max_failures:
+                            logger.error(f"流水线捕获连续失败 {failures} 次，停止捕获")
+                            aborted = True
+                            break
+                        stop.wait(min(0.1, 0.001 * 2 ** min(failures, 7)))
+                        continue
+                    failures = 0
+                    if self.zero_copy:
+                        # 零拷贝缓冲区会被下一帧覆盖，交给处理线程前复制
+                        frame = frame.copy()
+                    capture_stats.busy += time.perf_counter() - start
+                    capture_stats.frames += 1
+                    
+                    start = time.perf_counter()
+                    while not stop.is_set():
+                        try:
+                            frames.put(frame, timeout=0.1)
+                            break
+                        except Full:
+                            pass
+                    capture_stats.blocked += time.perf_counter() - start
+            except Exception as e:
+                logger.error(f"流水线捕获线程异常退出: {e}")
+            finally:
+                self._release_thread_backend()
+                try:
+                    frames.put_nowait(None)
+                except Full:
+                    # 队列已满时处理线程会在取完剩余帧后发现捕获线程已退出
+                    pass
+        
+        producer = threading.Thread(target=capture_loop, name="ScreenCapturePipeline", daemon=True)
+        producer.start()
+        
+        try:
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    frame = frames.get(timeout=0.1)
+                except Empty:
+                    if producer.is_alive():
+                        continue
+                    break
+                finally:
+                    process_stats.blocked += time.perf_counter() - start
+                if frame is None:
+                    break
+                
+                start = time.perf_counter()
+                callback(frame.image)
+                process_stats.busy += time.perf_counter() - start
+                process_stats.frames += 1
+            
+            logger.info(f"流水线捕获完成，统计: {self.get_pipeline_stats()}")
+            return not aborted
+        except KeyboardInterrupt:
+            logger.info("流水线捕获被中断")
+            return True
+        except Exception as e:
+            logger.error(f"流水线捕获失败: {e}")
+            return False
+        finally:
+            stop.set()
+            # 取出队列中剩余的帧，避免捕获线程阻塞在put上
+            while True:
+                try:
+                    frames.get_nowait()
+                except Empty:
+                    break
+            producer.join(timeout=2.0)
+    
+    def stop_pipeline(self):
+        """停止正在运行的pipelined_capture（可在回调或其他线程中调用）"""
+        self._pipeline_stop.set()
+    
+    def get_pipeline_stats(self):
+        """获取最近一次流水线捕获各阶段的吞吐统计"""
+        if self._pipeline_stats is None:
+            return {}
+        return {stage.name: stage.get_stats() for stage in self._pipeline_stats}
+    
+    def start_recording(self, path, chunk_mb=None):
+        """开始录制会话，此后捕获的每一帧都会追加到帧归档文件
+        
+        Args:
+            path: 归档文件路径，索引写入 path + ".idx"
+            chunk_mb: 分块大小(MB)，None表示使用配置值
+            
+        Returns:
+            bool: 是否成功开始录制
+        """
+        try:
+            from .frame_archive import FrameArchiveWriter
+        except ImportError:
+            from core.frame_archive import FrameArchiveWriter
+        
+        try:
+            self.stop_recording()
+            self.recorder = FrameArchiveWriter(path, chunk_mb or self.recording_chunk_mb)
+            logger.info(f"开始录制会话: {path}")
+            return True
+        except Exception as e:
+            logger.error(f"开始录制会话失败: {e}")
+            self.recorder = None
+            return False
+    
+    def stop_recording(self):
+        """停止录制会话"""
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return False
+        recorder.close()
+        return True
+    
+    def is_recording(self):
+        """是否正在录制会话"""
+        return self.recorder is not None
+    
+    def attach_frame_bus(self, writer, owned=False):
+        """将捕获的每一帧同时写入帧总线
+        
+        Args:
+            writer: FrameBusWriter实例，None表示断开
+            owned: 是否由ScreenCapture负责关闭该总线
+        """
+        if self.frame_bus is not None and self._owns_frame_bus:
+            self.frame_bus.close()
+        self.frame_bus = writer
+        self._owns_frame_bus = owned and writer is not None
+        if writer is not None:
+            logger.info(f"屏幕捕获已连接帧总线: {writer.name}")
+    
+    def start_stream(self, target_fps=None, ring_size=None):
+        """启动流式捕获，由独立的生产者线程持续向环形缓冲区写入最新帧
+        
+        Args:
+            target_fps: 目标帧率，None表示使用配置值
+            ring_size: 环形缓冲区槽位数，None表示使用配置值
+            
+        Returns:
+            bool: 是否成功启动
+        """
+        if self.is_streaming():
+            # 包括已请求停止但仍卡在抓取中的旧线程，避免两个生产者同时写入
+            logger.warning("流式捕获已在运行或上一次的捕获线程尚未退出")
+            return False
+        
+        self.stream_target_fps = target_fps or self.stream_target_fps
+        # 每次启动使用新的停止事件、缓冲区、节拍器和自适应帧率，启动后即可查询统计
+        stop = self._stream_stop = threading.Event()
+        ring = self._frame_ring = FrameRingBuffer(ring_size or self.stream_ring_size)
+        pacer = self.stream_pacer = FramePacer(max_fps=self.stream_target_fps, sleep=stop.wait)
+        rate = self.stream_rate = self._create_adaptive_rate(self.stream_target_fps)
+        self._stream_thread = threading.Thread(target=self._stream_loop, args=(stop, ring, pacer, rate),
+                                               name="ScreenCaptureStream", daemon=True)
+        self._stream_thread.start()
+        
+        logger.info(f"流式捕获已启动，目标帧率: {self.stream_target_fps}，缓冲区大小: {self._frame_ring.size}")
+        return True
+    
+    def _stream_loop(self, stop, ring, pacer, rate):
+        """生产者线程主循环，按目标帧率的截止时间抓帧
+        
+        只使用本次启动时创建的停止事件、缓冲区和节拍器，不受之后重新启动的影响
+        """
+        # 部分后端（如mss）不能跨线程共享，生产者线程使用自己的实例
+        backend = self._get_backend()
+        backend_name = self._backend_name(backend)
+        
+        try:
+            while not stop.is_set():
+                # 只休眠到下一帧的截止时间，落后时不额外等待
+                slept = pacer.wait()
+                start = time.perf_counter()
+                frame = self._capture_frame(as_numpy=True, backend=backend)
+                elapsed = time.perf_counter() - start
+                pacer.record(elapsed)
+                self.metrics.record("sleep", backend_name, slept * 1e9)
+                self.metrics.record("total", backend_name, elapsed * 1e9)
+                if frame is not None and not stop.is_set():
+                    ring.write(frame)
+                if rate is not None:
+                    pacer.frame_budget = rate.observe(frame)
+        except Exception as e:
+            logger.error(f"流式捕获线程异常退出: {e}")
+        finally:
+            self._release_thread_backend()
+    
+    def latest_frame(self, copy=False):
+        """获取流式捕获的最新帧，不阻塞
+        
+        Args:
+            copy: 是否返回副本，不复制时返回的帧在后续若干帧后会被覆盖
+            
+        Returns:
+            Frame或None（流未启动或尚未产生帧）
+        """
+        if self._frame_ring is None:
+            return None
+        return self._frame_ring.latest(copy=copy)
+    
+    def stop_stream(self, timeout=2.0):
+        """停止流式捕获
+        
+        Returns:
+            bool: 捕获线程是否已退出。超时仍未退出时（如卡在抓取中）返回False，
+                  线程退出前start_stream会拒绝启动，可稍后再次调用stop_stream等待
+        """
+        if self._stream_thread is None:
+            return False
+        
+        self._stream_stop.set()
+        self._stream_thread.join(timeout)
+        if self._stream_thread.is_alive():
+            logger.warning(f"流式捕获线程在 {timeout} 秒内未退出")
+            return False
+        self._stream_thread = None
+        
+        logger.info(f"流式捕获已停止，统计: {self._frame_ring.get_stats()}")
+        return True
+    
+    def is_streaming(self):
+        """流式捕获是否正在运行"""
+        return self._stream_thread is not None and self._stream_thread.is_alive()
+    
+    def get_stream_stats(self):
+        """获取流式捕获统计信息"""
+        if self._frame_ring is None:
+            return {}
+        stats = self._frame_ring.get_stats()
+        stats["pacing"] = self.stream_pacer.get_stats()
+        if self.stream_rate is not None:
+            stats["adaptive_rate"] = self.stream_rate.get_stats()
+        return stats
+    
+    def get_metrics(self):
+        """获取截图流水线指标
+        
+        Returns:
+            {"enabled": bool,
+             "stages": {阶段: {后端: {"count", "mean_ms", "min_ms", "p50_ms", "p90_ms", "p99_ms", "p999_ms", "max_ms"}}},
+             "counters": {"failures"/"none": {后端: 次数}}}
+            阶段包括sleep、grab、convert、resize、total
+        """
+        return self.metrics.get_metrics()
+    
+    def reset_metrics(self):
+        """清空截图流水线指标"""
+        self.metrics.reset()
+    
+    def get_pacing_stats(self):
+        """获取capture()的帧节拍统计信息（帧预算、超时次数等）"""
+        return self.pacer.get_stats()
+    
     def __del__(self):
         """析构函数，释放资源"""
         try:
-            if hasattr(self, 'sct'):
-                self.sct.close()
+            if getattr(self, '_stream_thread', None) is not None:
+                self.stop_stream()
+            if hasattr(self, 'backend'):
+                self.backend.close()
+            for handle in list(getattr(self, '_thread_backends', ())):
+                handle.close()
+            if getattr(self, '_owns_frame_bus', False):
+                self.frame_bus.close()
+            if getattr(self, 'recorder', None) is not None:
+                self.stop_recording()
+            if getattr(self, 'async_writer', None) is not None:
+                self.async_writer.close()
         except Exception as e:
             logger.error(f"释放屏幕捕获资源失败: {e}")
\ No newline at end of file
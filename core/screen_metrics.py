@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import threading
+from loguru import logger
+
+
+# Windows窗口消息：显示分辨率变化、DPI变化、系统设置变化（包括缩放比例）
+_WM_DISPLAYCHANGE = 0x007E
+_WM_DPICHANGED = 0x02E0
+_WM_SETTINGCHANGE = 0x001A
+
+
+class StubMetricsProvider:
+    """固定的显示器信息，用于无显示器的测试环境"""
+
+    def __init__(self, monitors=None, dpi_scale=1.0):
+        """
+        Args:
+            monitors: 显示器列表，每项为 {"left", "top", "width", "height"}，第一项为主显示器
+            dpi_scale: 缩放比例
+        """
+        self._monitors = monitors or [{"left": 0, "top": 0, "width": 1920, "height": 1080}]
+        self.dpi_scale = dpi_scale
+
+    def query(self):
+        return [dict(monitor, primary=index == 0, dpi_scale=monitor.get("dpi_scale", self.dpi_scale))
+                for index, monitor in enumerate(self._monitors)]
+
+
+class MssMetricsProvider:
+    """通过mss查询显示器布局，只读取布局而不截图"""
+
+    def query(self):
+        import mss
+        with mss.mss() as sct:
+            return [{"left": m["left"], "top": m["top"], "width": m["width"], "height": m["height"],
+                     "primary": index == 0, "dpi_scale": 1.0}
+                    for index, m in enumerate(sct.monitors[1:])]
+
+
+class Win32MetricsProvider:
+    """通过Win32 API查询显示器布局和DPI，不截图"""
+
+    def query(self):
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.windll.user32
+        try:
+            shcore = ctypes.windll.shcore
+        except OSError:
+            shcore = None
+
+        class MONITORINFO(ctypes.Structure):
+            _fields_ = [("cbSize", wintypes.DWORD), ("rcMonitor", wintypes.RECT),
+                        ("rcWork", wintypes.RECT), ("dwFlags", wintypes.DWORD)]
+
+        monitors = []
+
+        def callback(hmonitor, hdc, rect, lparam):
+            info = MONITORINFO()
+            info.cbSize = ctypes.sizeof(MONITORINFO)
+            user32.GetMonitorInfoW(hmonitor, ctypes.byref(info))
+            r = info.rcMonitor
+            dpi_scale = 1.0
+            if shcore is not None:
+                dpi_x, dpi_y = wintypes.UINT(), wintypes.UINT()
+                # MDT_EFFECTIVE_DPI = 0
+                if shcore.GetDpiForMonitor(hmonitor, 0, ctypes.byref(dpi_x), ctypes.byref(dpi_y)) == 0:
+                    dpi_scale = dpi_x.value / 96.0
+            monitors.append({"left": r.left, "top": r.top, "width": r.right - r.left, "height": r.bottom - r.top,
+                             "primary": bool(info.dwFlags & 1), "dpi_scale": dpi_scale})
+            return 1
+
+        proc_type = ctypes.WINFUNCTYPE(ctypes.c_int, wintypes.HMONITOR, wintypes.HDC,
+                                       ctypes.POINTER(wintypes.RECT), wintypes.LPARAM)
+        user32.EnumDisplayMonitors(None, None, proc_type(callback), 0)
+        # 主显示器排在第一位
+        monitors.sort(key=lambda m: not m["primary"])
+        return monitors
+
+
+def _default_provider():
+    """按平台选择显示器信息来源"""
+    if sys.platform == "win32":
+        return Win32MetricsProvider()
+    try:
+        import mss  # noqa: F401
+        return MssMetricsProvider()
+    except ImportError:
+        logger.warning("无法查询显示器信息，使用默认的1920x1080")
+        return StubMetricsProvider()
+
+
+class ScreenMetrics:
+    """屏幕信息服务：显示器几何、DPI缩放和虚拟桌面范围
+
+    通过轻量的系统查询获取，结果缓存到显示配置变化事件（或手动调用invalidate）为止。
+    """
+
+    def __init__(self, provider=None):
+        self.provider = provider or _default_provider()
+        self.lock = threading.Lock()
+        self._monitors = None
+        self.generation = 0  # 缓存失效次数，可用于判断显示配置是否变化
+        self.queries = 0
+        self._listeners = []
+        self._watcher = None
+
+    def monitors(self):
+        """获取显示器列表，每项为 {"left", "top", "width", "height", "primary", "dpi_scale"}，主显示器在前"""
+        with self.lock:
+            if self._monitors is None:
+                try:
+                    self._monitors = self.provider.query() or StubMetricsProvider().query()
+                except Exception as e:
+                    logger.error(f"查询显示器信息失败: {e}")
+                    self._monitors = StubMetricsProvider().query()
+                self.queries += 1
+            return self._monitors
+
+    def primary_monitor(self):
+        """获取主显示器"""
+        return self.monitors()[0]
+
+    def virtual_bounds(self):
+        """获取所有显示器组成的虚拟桌面范围 (left, top, right, bottom)"""
+        monitors = self.monitors()
+        return (min(m["left"] for m in monitors), min(m["top"] for m in monitors),
+                max(m["left"] + m["width"] for m in monitors), max(m["top"] + m["height"] for m in monitors))
+
+    def screen_size(self):
+        """获取虚拟桌面尺寸 (width, height)，与ImageGrab.grab(all_screens=True)的图像尺寸一致"""
+        left, top, right, bottom = self.virtual_bounds()
+        return (right - left, bottom - top)
+
+    def dpi_scale(self, index=0):
+        """获取指定显示器的DPI缩放比例（1.0表示100%）"""
+        monitors = self.monitors()
+        return monitors[index]["dpi_scale"] if 0 <= index < len(monitors) else 1.0
+
+    def add_listener(self, callback):
+        """注册显示配置变化时的回调函数"""
+        self._listeners.append(callback)
+
+    def invalidate(self):
+        """显示配置变化时调用，清除缓存并通知监听者"""
+        with self.lock:
+            self._monitors = None
+            self.generation += 1
+        logger.info("显示配置已变化，屏幕信息缓存已失效")
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"显示配置变化回调失败: {e}")
+
+    def start_display_watcher(self):
+        """在后台线程中监听Windows显示配置变化消息，收到后自动使缓存失效
+
+        Returns:
+            bool: 是否成功启动（非Windows平台返回False）
+        """
+        if sys.platform != "win32" or self._watcher is not None:
+            return self._watcher is not None
+        self._watcher = threading.Thread(target=self._watch_display_changes, name="DisplayWatcher", daemon=True)
+        self._watcher.start()
+        return True
+
+    def _watch_display_changes(self):
+        """创建隐藏的顶层窗口接收广播的显示变化消息（仅消息窗口收不到广播）"""
+        try:
+            import win32api
+            import win32gui
+
+            def wndproc(hwnd, msg, wparam, lparam):
+                if msg in (_WM_DISPLAYCHANGE, _WM_DPICHANGED, _WM_SETTINGCHANGE):
+                    self.invalidate()
+                return win32gui.DefWindowProc(hwnd, msg, wparam, lparam)
+
+            window_class = win32gui.WNDCLASS()
+            window_class.lpfnWndProc = wndproc
+            window_class.lpszClassName = "SAutoScriptDisplayWatcher"
+            window_class.hInstance = win32api.GetModuleHandle(None)
+            atom = win32gui.RegisterClass(window_class)
+            win32gui.CreateWindow(atom, "", 0, 0, 0, 0, 0, 0, 0, window_class.hInstance, None)
+            win32gui.PumpMessages()
+        except Exception as e:
+            logger.error(f"显示配置监听线程异常退出: {e}")
+            self._watcher = None
+
+
+_screen_metrics = None
+_screen_metrics_lock = threading.Lock()
+
+
+def get_screen_metrics():
+    """获取进程内共享的屏幕信息服务，首次调用时创建并启动显示配置监听"""
+    global _screen_metrics
+    with _screen_metrics_lock:
+        if _screen_metrics is None:
+            _screen_metrics = ScreenMetrics()
+            _screen_metrics.start_display_watcher()
+        return _screen_metrics
+
+
+def set_screen_metrics(metrics):
+    """替换共享的屏幕信息服务（如在测试中使用StubMetricsProvider）"""
+    global _screen_metrics
+    with _screen_metrics_lock:
+        _screen_metrics = metrics
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+import cv2
+import numpy as np
+from loguru import logger
+
+
+# 数据文件布局：16字节头部（魔数、版本、索引长度） + JSON索引 + 按64字节对齐的原始数组数据
+CACHE_MAGIC = b"SFTC"
+CACHE_VERSION = 2
+_HEADER_SIZE = 16
+_ALIGNMENT = 64
+TEMPLATE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def file_digest(path):
+    """计算文件内容的SHA-1"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _template_files(template_dir):
+    """模板目录下的所有模板图像，返回 [(相对路径, 绝对路径)]，相对路径使用"/"分隔"""
+    files = []
+    for root, _, names in os.walk(template_dir):
+        for name in sorted(names):
+            if os.path.splitext(name)[1].lower() in TEMPLATE_EXTENSIONS:
+                path = os.path.join(root, name)
+                files.append((os.path.relpath(path, template_dir).replace(os.sep, "/"), path))
+    return sorted(files)
+
+
+def _data_path(output_path, digest):
+    """带内容版本号的数据文件路径，如 cache/templates.tcache -> cache/templates.<digest>.tcache"""
+    root, ext = os.path.splitext(output_path)
+    return f"{root}.{digest}{ext}"
+
+
+def _replace_with_retry(source, target, attempts=5, delay=0.1):
+    """替换文件，Windows上目标文件正被其他进程短暂打开时重试"""
+    for attempt in range(attempts):
+        try:
+            os.replace(source, target)
+            return
+        except PermissionError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(delay)
+
+
+def _remove_old_versions(output_path, current):
+    """删除旧版本的数据文件，仍被其他进程映射的文件（Windows上无法删除）留到下次编译再清理"""
+    root, ext = os.path.splitext(output_path)
+    for path in glob.glob(f"{glob.escape(root)}.*{ext}"):
+        if os.path.abspath(path) == os.path.abspath(current):
+            continue
+        try:
+            os.remove(path)
+        except PermissionError:
+            logger.debug(f"旧版本模板缓存仍在使用，暂不删除: {path}")
+        except OSError as e:
+            logger.warning(f"删除旧版本模板缓存失败: {path}, {e}")
+
+
+def compile_templates(template_dir, output_path, pyramid_levels=2, min_template_size=8):
+    """编译模板目录为缓存文件
+
+    数据写入按内容哈希命名的新文件，再原子地切换指针文件output_path指向它。
+    正在映射旧数据文件的进程不受影响（Windows上被映射的文件无法替换或删除，因此从不覆盖数据文件）；
+    模板未变化时数据文件名不变，不会重复写入。
+
+    Args:
+        template_dir: 模板目录
+        output_path: 指针文件路径，即ImageRecognition配置的compiled_cache
+        pyramid_levels: 预先计算的金字塔最大层数
+        min_template_size: 缩小后模板的最小边长，模板过小时减少层数
+
+    Returns:
+        int: 编译的模板数
+
+    Raises:
+        PermissionError: 指针文件被占用，多次重试后仍无法切换
+    """
+    start = time.perf_counter()
+    entries = {}
+    blobs = []
+    offset = 0
+
+    def add_array(array):
+        nonlocal offset
+        array = np.ascontiguousarray(array)
+        record = {"offset": offset, "shape": list(array.shape), "dtype": array.dtype.str}
+        blobs.append((offset, array))
+        offset = (offset + array.nbytes + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+        return record
+
+    for rel_path, path in _template_files(template_dir):
+        # 与ImageRecognition.load_template一致：按BGR读取后转灰度
+        image = cv2.imread(path)
+        if image is None:
+            logger.warning(f"无法读取模板，已跳过: {path}")
+            continue
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        pyramid = []
+        level_image = gray
+        while len(pyramid) < pyramid_levels and (min(gray.shape[:2]) >> (len(pyramid) + 1)) >= min_template_size:
+            level_image = cv2.pyrDown(level_image)
+            pyramid.append(add_array(level_image))
+
+        stat = os.stat(path)
+        entries[rel_path] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha1": file_digest(path),
+            "gray": add_array(gray),
+            "pyramid": pyramid,
+        }
+
+    index = json.dumps({"pyramid_levels": pyramid_levels, "templates": entries},
+                       ensure_ascii=False, sort_keys=True).encode("utf-8")
+    data_start = (_HEADER_SIZE + len(index) + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+    # 文件名只取决于索引（模板内容哈希、修改时间和编译参数），相同输入得到相同文件
+    data_path = _data_path(output_path, hashlib.sha1(index).hexdigest()[:16])
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if not os.path.exists(data_path):
+        temp_path = data_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(CACHE_MAGIC + CACHE_VERSION.to_bytes(4, "little") + len(index).to_bytes(8, "little"))
+            f.write(index)
+            for blob_offset, array in blobs:
+                f.seek(data_start + blob_offset)
+                f.write(array.tobytes())
+        os.replace(temp_path, data_path)
+
+    # 指针文件只在打开缓存时短暂读取，不会被映射
+    temp_path = output_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"data": os.path.basename(data_path)}, f)
+    try:
+        _replace_with_retry(temp_path, output_path)
+    except PermissionError:
+        logger.error(f"模板缓存指针文件被占用，无法切换到新版本: {output_path}")
+        os.remove(temp_path)
+        raise
+    _remove_old_versions(output_path, data_path)
+
+    logger.info(f"已编译 {len(entries)} 个模板到 {data_path}，耗时 {time.perf_counter() - start:.2f}秒")
+    return len(entries)
+
+
+class CompiledTemplateCache:
+    """只读内存映射的模板编译缓存
+
+    打开时只读取JSON索引，模板数据按需从映射中取视图，无需解码图像；
+    多个进程映射同一文件时共享操作系统的页缓存。
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: compile_templates生成的指针文件路径
+        """
+        self.path = path
+        with open(path, "r", encoding="utf-8") as f:
+            pointer = json.load(f)
+        self.data_path = os.path.join(os.path.dirname(path), pointer["data"])
+        with open(self.data_path, "rb") as f:
+            header = f.read(_HEADER_SIZE)
+            if header[:4] != CACHE_MAGIC or int.from_bytes(header[4:8], "little") != CACHE_VERSION:
+                raise ValueError(f"不是可用的模板缓存文件: {self.data_path}")
+            index_size = int.from_bytes(header[8:16], "little")
+            index = json.loads(f.read(index_size).decode("utf-8"))
+        self.pyramid_levels = index["pyramid_levels"]
+        self.entries = index["templates"]
+        self._data_start = (_HEADER_SIZE + index_size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+        self.data = np.memmap(self.data_path, dtype=np.uint8, mode="r")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _array(self, record):
+        dtype = np.dtype(record["dtype"])
+        start = self._data_start + record["offset"]
+        nbytes = int(np.prod(record["shape"])) * dtype.itemsize
+        return self.data[start:start + nbytes].view(dtype).reshape(record["shape"])
+
+    def is_fresh(self, rel_path, source_path):
+        """检查缓存条目与源文件是否一致：大小和修改时间相同即视为未变化，否则比较内容哈希"""
+        entry = self.entries.get(rel_path)
+        if entry is None:
+            return False
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return False
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        # 修改时间变化但内容可能相同（如重新检出），按内容哈希判断
+        return file_digest(source_path) == entry["sha1"]
+
+    def get(self, rel_path, source_path=None):
+        """获取模板的编译数据
+
+        Args:
+            rel_path: 模板相对模板目录的路径（"/"分隔）
+            source_path: 源文件路径，提供时会校验缓存是否过期
+
+        Returns:
+            {"gray", "pyramid"（第0层为gray）}，数组均为只读视图；不存在或已过期时返回None
+        """
+        entry = self.entries.get(rel_path)
+        if entry is None or (source_path is not None and not self.is_fresh(rel_path, source_path)):
+            return None
+        gray = self._array(entry["gray"])
+        return {
+            "gray": gray,
+            "pyramid": [gray] + [self._array(record) for record in entry["pyramid"]],
+        }
+
+
+def main(argv=None):
+    """命令行入口：python -m core.template_cache --template-dir assets/templates --output cache/templates.tcache"""
+    parser = argparse.ArgumentParser(description="将模板目录编译为可内存映射的缓存文件")
+    parser.add_argument("--template-dir", default="assets/templates", help="模板目录")
+    parser.add_argument("--output", default="cache/templates.tcache", help="缓存指针文件路径")
+    parser.add_argument("--levels", type=int, default=2, help="预先计算的金字塔层数")
+    parser.add_argument("--min-template-size", type=int, default=8, help="缩小后模板的最小边长")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.template_dir):
+        logger.error(f"模板目录不存在: {args.template_dir}")
+        return 1
+    try:
+        compile_templates(args.template_dir, args.output, args.levels, args.min_template_size)
+    except PermissionError:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
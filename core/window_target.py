@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+from loguru import logger
+
+
+class WindowTarget:
+    """绑定到窗口句柄的捕获目标
+
+    首次使用时按标题/类名查找一次窗口并缓存句柄，之后只按间隔用句柄廉价地重新读取窗口矩形；
+    句柄失效（窗口关闭后重新打开）时才再次按标题查找。
+    """
+
+    def __init__(self, hwnd=None, title=None, window_class=None, revalidate_interval=0.5,
+                 client_area=True, win32=None):
+        """
+        Args:
+            hwnd: 窗口句柄，已知时无需按标题查找
+            title: 窗口标题（部分匹配）
+            window_class: 窗口类名
+            revalidate_interval: 重新读取窗口矩形的间隔（秒），0表示每次都读取
+            client_area: 是否只捕获客户区（不含标题栏和边框）
+            win32: 提供IsWindow、IsIconic、GetWindowRect、GetClientRect、ClientToScreen的对象，
+                   None表示使用win32gui（便于在无窗口系统的环境中替换）
+        """
+        self.hwnd = hwnd
+        self.title = title
+        self.window_class = window_class
+        self.revalidate_interval = revalidate_interval
+        self.client_area = client_area
+        self._win32 = win32
+        self.rect = None  # 缓存的屏幕坐标矩形 (x1, y1, x2, y2)
+        self._checked_at = None
+        self.lookups = 0  # 按标题查找窗口的次数
+        self.revalidations = 0  # 重新读取矩形的次数
+        self.rect_changes = 0  # 矩形发生变化的次数
+
+    @property
+    def win32(self):
+        if self._win32 is None:
+            import win32gui
+            self._win32 = win32gui
+        return self._win32
+
+    def _lookup(self):
+        """按标题/类名查找窗口句柄（需要枚举所有窗口，开销较大）"""
+        if not self.title and not self.window_class:
+            return None
+        try:
+            from .window_locator import WindowLocator
+        except ImportError:
+            from core.window_locator import WindowLocator
+        self.lookups += 1
+        hwnd = WindowLocator()._find_window(self.title, self.window_class)
+        if hwnd:
+            logger.info(f"捕获目标绑定到窗口: hwnd={hwnd}, title={self.title}")
+        return hwnd
+
+    def _read_rect(self):
+        """通过句柄读取窗口矩形，窗口最小化或读取失败时返回None"""
+        win32 = self.win32
+        if win32.IsIconic(self.hwnd):
+            return None
+        if self.client_area:
+            _, _, width, height = win32.GetClientRect(self.hwnd)
+            left, top = win32.ClientToScreen(self.hwnd, (0, 0))
+            rect = (left, top, left + width, top + height)
+        else:
+            rect = tuple(win32.GetWindowRect(self.hwnd))
+        if rect[2] <= rect[0] or rect[3] <= rect[1]:
+            return None
+        return rect
+
+    def current_rect(self, force=False):
+        """获取窗口当前的屏幕坐标矩形
+
+        间隔内直接返回缓存值；到期后重新读取，窗口移动或缩放时更新缓存。
+
+        Args:
+            force: 忽略间隔立即重新读取
+
+        Returns:
+            (x1, y1, x2, y2)，窗口不存在时返回None，最小化时返回上一次的矩形
+        """
+        now = time.perf_counter()
+        if not force and self._checked_at is not None and now - self._checked_at < self.revalidate_interval:
+            return self.rect
+        self._checked_at = now
+        self.revalidations += 1
+
+        try:
+            if not self.hwnd or not self.win32.IsWindow(self.hwnd):
+                self.hwnd = self._lookup()
+                if not self.hwnd:
+                    self.rect = None
+                    return None
+            rect = self._read_rect()
+        except Exception as e:
+            logger.error(f"读取窗口矩形失败: {e}")
+            return self.rect
+
+        if rect is not None and rect != self.rect:
+            if self.rect is not None:
+                self.rect_changes += 1
+                logger.info(f"窗口位置或大小已变化: {self.rect} -> {rect}")
+            self.rect = rect
+        return self.rect
+
+    def get_stats(self):
+        """获取窗口跟踪统计信息"""
+        return {
+            "hwnd": self.hwnd,
+            "rect": self.rect,
+            "lookups": self.lookups,
+            "revalidations": self.revalidations,
+            "rect_changes": self.rect_changes,
+        }
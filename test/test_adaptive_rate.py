@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import tempfile
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.screen_capture import AdaptiveRate, ScreenCapture, Frame, TileChangeTracker
+
+
+def test_backoff_and_snap_back():
+    """静止画面指数退避到最低帧率，画面变化立即恢复最高帧率"""
+    rate = AdaptiveRate(max_fps=50, min_fps=5, backoff=2.0)
+    still = np.zeros((64, 64, 3), dtype=np.uint8)
+    
+    assert rate.observe(still) == 0.02
+    intervals = [rate.observe(still) for _ in range(5)]
+    assert intervals[:3] == [0.04, 0.08, 0.16]
+    assert intervals[-1] == 0.2  # 限制在 1/min_fps
+    
+    moved = still.copy()
+    moved[::8, ::8] = 255
+    assert rate.observe(moved) == 0.02
+    assert rate.observe(None) == 0.02
+
+
+def test_small_change_snaps_back():
+    """几个像素的变化（如光标、文字）也立即恢复最高帧率"""
+    rate = AdaptiveRate(max_fps=50, min_fps=5, backoff=2.0)
+    still = np.zeros((1080 // 4, 1920 // 4), dtype=np.uint8)
+    rate.observe(still)
+    for _ in range(4):
+        rate.observe(still)
+    assert rate.interval == 0.2
+    
+    cursor = still.copy()
+    cursor[13:16, 21:23] = 1  # 不落在任何8像素采样网格上的小变化
+    assert rate.observe(cursor) == 0.02
+    assert rate.observe(cursor) == 0.04
+
+
+def test_uses_tile_state_when_available():
+    """帧带有图块变化状态时直接使用，不再逐像素比较"""
+    tracker = TileChangeTracker(16)
+    rate = AdaptiveRate(max_fps=50, min_fps=5, backoff=2.0)
+    still = np.zeros((64, 64, 3), dtype=np.uint8)
+    for seq in (1, 2, 3):
+        rate.observe(Frame(still, seq, 0, tile_state=tracker.update(still, seq)))
+    assert rate.interval == 0.08 and rate._previous is None
+    
+    changed = still.copy()
+    changed[40, 5] = 1
+    assert rate.observe(Frame(changed, 4, 0, tile_state=tracker.update(changed, 4))) == 0.02
+
+
+def test_continuous_capture_adapts():
+    """continuous_capture在回放的静止画面上逐步降低帧率"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "frames.npy")
+        frames = np.zeros((6, 32, 32, 3), dtype=np.uint8)
+        frames[4:] = 200
+        np.save(source, frames)
+        screen_capture = ScreenCapture({"capture_method": "replay", "quality": "high", "use_delay": False,
+                                        "replay": {"source": source, "mode": "step"},
+                                        "adaptive_rate": {"enabled": True, "min_fps": 100, "backoff": 2.0}})
+        received = []
+        assert screen_capture.continuous_capture(received.append, interval=0.001, max_iterations=6)
+        
+        stats = screen_capture.continuous_rate.get_stats()
+        assert len(received) == 6
+        assert stats["changed_frames"] == 2 and stats["unchanged_frames"] == 4
+
+
+if __name__ == "__main__":
+    test_backoff_and_snap_back()
+    test_small_change_snaps_back()
+    test_uses_tile_state_when_available()
+    test_continuous_capture_adapts()
+    print("自适应帧率测试通过")
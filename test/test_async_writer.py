@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import tempfile
+import cv2
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.async_writer import AsyncImageWriter
+from core.screen_capture import ScreenCapture
+
+
+def _image(seed=1, size=(64, 96)):
+    rng = np.random.default_rng(seed)
+    return cv2.GaussianBlur(rng.integers(0, 255, (*size, 3), dtype=np.uint8), (5, 5), 1)
+
+
+def test_drop_when_queue_full():
+    """队列已满时立即丢弃并计数，不阻塞"""
+    writer = AsyncImageWriter({"workers": 0, "queue_size": 2})
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [writer.submit(_image(), os.path.join(tmp, f"{i}.png")) for i in range(5)]
+        assert results == [True, True, False, False, False]
+        stats = writer.get_stats()
+        assert stats["submitted"] == 2 and stats["dropped_queue_full"] == 3 and stats["queued"] == 2
+
+
+def test_submit_copies_caller_buffer():
+    """入队时复制图像，调用方随后改写缓冲区不影响写入的内容"""
+    image = _image()
+    expected = image.copy()
+    writer = AsyncImageWriter({"workers": 1})
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "frame.png")
+        assert writer.submit(image, path)
+        image[:] = 0
+        writer.close()
+        assert np.array_equal(cv2.imread(path), expected)
+
+
+def test_disk_budget():
+    """写入量达到磁盘预算后丢弃并计数"""
+    image = _image()
+    ok, encoded = cv2.imencode(".png", image, [cv2.IMWRITE_PNG_COMPRESSION, 3])
+    budget_mb = encoded.nbytes * 2.5 / (1024 * 1024)
+    writer = AsyncImageWriter({"workers": 1, "png_compression": 3, "max_disk_mb": budget_mb})
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(4):
+            writer.submit(image, os.path.join(tmp, "shots", f"{i}.png"))
+        writer.flush()
+        stats = writer.get_stats()
+        assert stats["written"] == 2 and stats["dropped_budget"] == 2
+        assert stats["bytes_written"] == encoded.nbytes * 2
+        assert sorted(os.listdir(os.path.join(tmp, "shots"))) == ["0.png", "1.png"]
+        writer.close()
+
+
+def test_png_compression_and_jpeg_quality():
+    """PNG压缩级别和JPEG质量作用于编码结果，JPEG质量沿用ScreenCapture的质量设置"""
+    image = _image(size=(240, 320))
+    with tempfile.TemporaryDirectory() as tmp:
+        sizes = {}
+        for level in (0, 9):
+            writer = AsyncImageWriter({"workers": 1, "png_compression": level})
+            path = os.path.join(tmp, f"level{level}.png")
+            writer.submit(image, path)
+            writer.close()
+            assert np.array_equal(cv2.imread(path), image)  # PNG无损
+            sizes[level] = os.path.getsize(path)
+        assert sizes[9] < sizes[0]
+
+        for quality, expected in (("low", 60), ("high", 95)):
+            screen_capture = ScreenCapture({"capture_method": "replay", "quality": quality,
+                                            "replay": {"source": tmp, "mode": "step"},
+                                            "async_writer": {"enabled": True, "workers": 1}})
+            writer = screen_capture.async_writer
+            assert writer.jpeg_quality == expected
+            path = os.path.join(tmp, f"{quality}.jpg")
+            writer.submit(image, path)
+            writer.close()
+            _, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, expected])
+            with open(path, "rb") as f:
+                assert f.read() == encoded.tobytes()
+        assert os.path.getsize(os.path.join(tmp, "low.jpg")) < os.path.getsize(os.path.join(tmp, "high.jpg"))
+
+
+if __name__ == "__main__":
+    test_drop_when_queue_full()
+    test_submit_copies_caller_buffer()
+    test_disk_budget()
+    test_png_compression_and_jpeg_quality()
+    print("后台图像写入器测试通过")
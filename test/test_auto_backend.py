@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import tempfile
+import numpy as np
+
+# 添加项目根目录到Python路径
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from core import capture_backends, screen_metrics
+from core.capture_backends import CaptureBackend, register_capture_backend, select_capture_backend
+from core.screen_capture import ScreenCapture
+from core.screen_metrics import ScreenMetrics, StubMetricsProvider, set_screen_metrics
+
+
+class FakeScreenBackend(CaptureBackend):
+    """模拟显示器的后端，grab_seconds控制抓取耗时，报告的屏幕尺寸与抓到的画面一致"""
+
+    requires_display = False
+    grab_seconds = 0.0
+    frame_size = (320, 200)
+    grabs = 0
+    instances = 0
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        type(self).instances += 1
+
+    def grab(self, monitor=None):
+        type(self).grabs += 1
+        time.sleep(self.grab_seconds)
+        width, height = self.frame_size
+        return np.zeros((height, width, 3), dtype=np.uint8)
+
+    def monitors(self):
+        width, height = self.frame_size
+        return [{"left": 0, "top": 0, "width": width, "height": height}]
+
+
+@register_capture_backend("test_auto_fast")
+class FastBackend(FakeScreenBackend):
+    grab_seconds = 0.001
+
+
+@register_capture_backend("test_auto_slow")
+class SlowBackend(FakeScreenBackend):
+    grab_seconds = 0.005
+
+
+@register_capture_backend("test_auto_scaled")
+class ScaledBackend(FakeScreenBackend):
+    """按物理像素抓屏的后端（模拟系统缩放125%时的mss）：自身报告的尺寸与画面一致，但与系统坐标不符"""
+    grab_seconds = 0.0
+    frame_size = (400, 250)
+
+
+@register_capture_backend("test_auto_display")
+class DisplayBackend(FakeScreenBackend):
+    """需要真实显示器的后端，抓取最快"""
+    requires_display = True
+    grab_seconds = 0.0
+
+
+def _stub_metrics(width=320, height=200, dpi_scale=1.0):
+    return ScreenMetrics(StubMetricsProvider([{"left": 0, "top": 0, "width": width, "height": height}], dpi_scale))
+
+
+def _config(cache_file, candidates=("test_auto_slow", "test_auto_scaled", "test_auto_fast")):
+    return {"capture_method": "auto", "quality": "high", "use_delay": False,
+            "auto": {"candidates": list(candidates), "benchmark_seconds": 0.06, "cache_file": cache_file}}
+
+
+def test_auto_selects_fastest_valid_backend_and_caches():
+    previous = screen_metrics._screen_metrics
+    set_screen_metrics(_stub_metrics())
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_file = os.path.join(tmp, "capture_backend.json")
+            config = _config(cache_file)
+
+            screen_capture = ScreenCapture(dict(config))
+            assert screen_capture.capture_method == "test_auto_fast"
+            with open(cache_file, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            (entry,) = cache.values()
+            assert entry["backend"] == "test_auto_fast"
+            # 缩放后端自身一致，但与系统报告的尺寸不符，未通过校验
+            assert set(entry["grab_ms"]) == {"test_auto_slow", "test_auto_fast"}
+
+            # 显示配置不变时直接使用缓存，不创建也不测试任何候选后端
+            for cls in (FastBackend, SlowBackend, ScaledBackend):
+                cls.grabs = cls.instances = 0
+            assert select_capture_backend(dict(config)) == "test_auto_fast"
+            assert FastBackend.instances == SlowBackend.instances == ScaledBackend.instances == 0
+            assert FastBackend.grabs == SlowBackend.grabs == 0
+    finally:
+        set_screen_metrics(previous)
+
+
+def test_display_change_invalidates_cache():
+    """显示器布局或缩放比例变化后重新测试"""
+    with tempfile.TemporaryDirectory() as tmp:
+        config = _config(os.path.join(tmp, "capture_backend.json"))
+        assert select_capture_backend(config, metrics=_stub_metrics()) == "test_auto_fast"
+
+        ScaledBackend.instances = 0
+        # 系统坐标与物理像素一致（如缩放改回100%且分辨率为400x250）时，只有该后端的尺寸正确
+        assert select_capture_backend(config, metrics=_stub_metrics(400, 250)) == "test_auto_scaled"
+        assert ScaledBackend.instances == 1
+
+        ScaledBackend.instances = 0
+        assert select_capture_backend(config, metrics=_stub_metrics(dpi_scale=1.25)) == "test_auto_fast"
+        assert ScaledBackend.instances == 1
+        with open(config["auto"]["cache_file"], "r", encoding="utf-8") as f:
+            assert len(json.load(f)) == 3
+
+
+def test_relative_cache_file_resolves_against_project_root():
+    """相对的缓存路径基于项目根目录，与当前工作目录无关"""
+    relative = os.path.join("cache", f"test_auto_backend_{os.getpid()}.json")
+    cached = os.path.join(PROJECT_ROOT, relative)
+    previous_cwd = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            assert select_capture_backend(_config(relative), metrics=_stub_metrics()) == "test_auto_fast"
+            assert os.path.exists(cached)
+            assert not os.path.exists(os.path.join(tmp, relative))
+            os.chdir(previous_cwd)
+    finally:
+        os.chdir(previous_cwd)
+        if os.path.exists(cached):
+            os.remove(cached)
+
+
+def test_headless_skips_display_backends():
+    """没有显示器时不创建需要显示器的后端，有显示器时正常参与选择"""
+    original_has_display = capture_backends.has_display
+    candidates = ("test_auto_display", "test_auto_slow")
+    config = _config(None, candidates)
+    try:
+        capture_backends.has_display = lambda: False
+        DisplayBackend.instances = 0
+        assert select_capture_backend(config, metrics=_stub_metrics()) == "test_auto_slow"
+        assert DisplayBackend.instances == 0
+
+        capture_backends.has_display = lambda: True
+        assert select_capture_backend(config, metrics=_stub_metrics()) == "test_auto_display"
+        assert DisplayBackend.instances == 1
+    finally:
+        capture_backends.has_display = original_has_display
+
+
+if __name__ == "__main__":
+    test_auto_selects_fastest_valid_backend_and_caches()
+    test_display_change_invalidates_cache()
+    test_relative_cache_file_resolves_against_project_root()
+    test_headless_skips_display_backends()
+    print("自动选择截图方法测试通过")
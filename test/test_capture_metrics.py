@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import tempfile
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.capture_metrics import LatencyHistogram
+from core.screen_capture import ScreenCapture
+
+
+def test_histogram_percentiles_within_precision():
+    """分位数的相对误差不超过 1/2^precision_bits"""
+    histogram = LatencyHistogram(precision_bits=4)
+    values = np.arange(1, 100001) * 1000  # 1us - 100ms
+    for value in values:
+        histogram.record(int(value))
+    
+    for q in (50, 90, 99, 99.9):
+        exact = np.percentile(values, q)
+        assert abs(histogram.percentile(q) - exact) / exact <= 1 / 16
+    assert histogram.max == values[-1] and histogram.min == values[0]
+    assert histogram.count == len(values)
+
+
+def test_screen_capture_metrics_per_stage():
+    """capture()按阶段记录延迟，回放结束返回None时累加计数"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "frames.npy")
+        np.save(source, np.zeros((3, 40, 60, 3), dtype=np.uint8))
+        screen_capture = ScreenCapture({"capture_method": "replay", "quality": "medium", "use_delay": False,
+                                        "replay": {"source": source, "mode": "step"}})
+        for _ in range(4):
+            screen_capture.capture()
+        
+        metrics = screen_capture.get_metrics()
+        for stage in ("sleep", "grab", "convert", "resize", "total"):
+            assert metrics["stages"][stage]["replay"]["count"] >= 3
+        assert metrics["stages"]["grab"]["replay"]["count"] == 4
+        assert metrics["counters"]["none"]["replay"] == 1
+        
+        screen_capture.reset_metrics()
+        assert screen_capture.get_metrics()["stages"] == {}
+
+
+if __name__ == "__main__":
+    test_histogram_percentiles_within_precision()
+    test_screen_capture_metrics_per_stage()
+    print("截图指标测试通过")
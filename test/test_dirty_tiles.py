@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import cv2
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.screen_capture import Frame, TileChangeTracker
+from core.image_recognition import ImageRecognition
+
+
+def test_tile_tracker_detects_changed_tiles():
+    """只有发生变化的图块被标记为脏"""
+    tracker = TileChangeTracker(tile_size=64)
+    image = np.random.randint(0, 255, (1080, 1920, 3), dtype=np.uint8)
+    
+    first = tracker.update(image, 1)
+    assert len(first.dirty_tiles) == 17 * 30  # 首帧全部视为变化，1080行填充为17个图块
+    
+    second = tracker.update(image.copy(), 2)
+    assert second.dirty_tiles == frozenset()
+    assert second.is_clean_since(1)
+    
+    changed = image.copy()
+    changed[1070, 130] ^= 0xFF  # 最后一行图块（填充部分）中的单个像素
+    third = tracker.update(changed, 3)
+    assert third.dirty_tiles == frozenset({(16, 2)})
+    assert not third.is_clean_since(2)
+    assert third.is_clean_since(2, (0, 0, 1920, 1024))
+    assert not third.is_clean_since(2, (128, 1000, 192, 1080))
+
+
+def test_unchanged_frame_reuses_match_result():
+    """帧未变化时识别模块直接复用上次的匹配结果"""
+    image = np.random.randint(0, 255, (300, 400, 3), dtype=np.uint8)
+    with tempfile.TemporaryDirectory() as tmp:
+        cv2.imwrite(os.path.join(tmp, "target.png"), image[100:140, 200:260])
+        image_recognition = ImageRecognition({"template_dir": tmp})
+        tracker = TileChangeTracker(tile_size=64)
+        
+        def make_frame(img, seq):
+            return Frame(img, seq, time.perf_counter_ns(), (0, 0, 400, 300), 1.0, tracker.update(img, seq))
+        
+        first = image_recognition.find_template(make_frame(image, 1), "target")
+        assert first["found"] and first["position"] == (200, 100)
+        
+        second = image_recognition.find_template(make_frame(image.copy(), 2), "target")
+        assert second["position"] == (200, 100) and second["frame_seq"] == 2
+        assert image_recognition.reuse_hits == 1
+        
+        # 目标被遮挡后重新匹配
+        covered = image.copy()
+        covered[100:140, 200:260] = 0
+        third = image_recognition.find_template(make_frame(covered, 3), "target")
+        assert not third["found"]
+        assert image_recognition.reuse_hits == 1
+
+
+if __name__ == "__main__":
+    test_tile_tracker_detects_changed_tiles()
+    test_unchanged_frame_reuses_match_result()
+    print("脏区检测测试通过")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import tempfile
+import threading
+import cv2
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.image_recognition import ImageRecognition
+
+
+def _setup(tmp):
+    rng = np.random.default_rng(7)
+    screenshot = rng.integers(0, 255, (240, 320, 3), dtype=np.uint8)
+    cv2.imwrite(os.path.join(tmp, "button.png"), screenshot[40:80, 50:110])
+    cv2.imwrite(os.path.join(tmp, "icon.png"), screenshot[150:190, 200:240])
+    cv2.imwrite(os.path.join(tmp, "missing.png"), rng.integers(0, 255, (30, 30, 3), dtype=np.uint8))
+    return screenshot, ImageRecognition({"template_dir": tmp, "batch_workers": 3})
+
+
+def test_find_templates_matches_single_calls():
+    """批量匹配结果与逐个调用find_template一致"""
+    with tempfile.TemporaryDirectory() as tmp:
+        screenshot, recognition = _setup(tmp)
+        names = ["button", "icon", "missing", "not_exist"]
+        results = recognition.find_templates(screenshot, names)
+        
+        assert list(results) == names
+        assert results["button"]["position"] == (50, 40)
+        assert results["icon"]["position"] == (200, 150)
+        assert results["missing"]["found"] is False
+        assert results["not_exist"] is None
+        for name in names[:3]:
+            assert results[name] == recognition.find_template(screenshot, name)
+
+
+def test_find_templates_early_stop():
+    """按优先级找到第一个匹配后停止"""
+    with tempfile.TemporaryDirectory() as tmp:
+        screenshot, recognition = _setup(tmp)
+        results = recognition.find_templates(screenshot, ["missing", "icon", "button"], early_stop=True)
+        assert list(results) == ["missing", "icon"]
+        assert results["icon"]["found"]
+
+
+def test_close_shuts_down_match_workers():
+    """close释放批量匹配线程池，之后再次调用会重新创建"""
+    def workers():
+        return [t for t in threading.enumerate() if t.name.startswith("TemplateMatch")]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        screenshot, recognition = _setup(tmp)
+        before = set(workers())
+        recognition.find_templates(screenshot, ["button", "icon"])
+        assert set(workers()) - before
+        
+        recognition.close()
+        assert recognition._match_executor is None
+        assert not set(workers()) - before
+        recognition.close()  # 重复关闭无副作用
+        
+        results = recognition.find_templates(screenshot, ["button"])
+        assert results["button"]["position"] == (50, 40)
+        recognition.close()
+
+
+if __name__ == "__main__":
+    test_find_templates_matches_single_calls()
+    test_find_templates_early_stop()
+    test_close_shuts_down_match_workers()
+    print("批量模板匹配测试通过")
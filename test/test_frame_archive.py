@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.screen_capture import Frame, ScreenCapture
+from core.frame_archive import FrameArchiveWriter, FrameArchiveReader
+
+
+def test_archive_random_access_across_chunks():
+    """帧跨越多个分块写入后仍可按索引随机访问，元数据完整保留"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session.sfa")
+        writer = FrameArchiveWriter(path, chunk_mb=0.1)
+        base = time.perf_counter_ns()
+        for i in range(12):
+            shape = (120, 160) if i % 3 == 0 else (120, 160, 3)
+            image = np.full(shape, i, dtype=np.uint8)
+            writer.append(Frame(image, 100 + i, base + i * 20_000_000, (5, 5, 165, 125), 1.0))
+        writer.close()
+        
+        reader = FrameArchiveReader(path)
+        assert len(reader) == 12
+        frame = reader.read_frame(7)
+        assert frame.seq == 107 and frame.region == (5, 5, 165, 125)
+        assert frame.image.shape == (120, 160, 3) and int(frame.image[10, 10, 1]) == 7
+        assert reader.read(9).shape == (120, 160)
+        assert abs(reader.timestamp(11) - 0.22) < 1e-9
+
+
+def test_recording_replays_through_screen_capture():
+    """录制的会话可直接作为回放源"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "frames.npy")
+        frames = np.random.randint(0, 255, (4, 60, 80, 3), dtype=np.uint8)
+        np.save(source, frames)
+        archive = os.path.join(tmp, "session.sfa")
+        
+        recorder = ScreenCapture({"capture_method": "replay", "quality": "high", "use_delay": False,
+                                  "replay": {"source": source, "mode": "step"}})
+        assert recorder.start_recording(archive)
+        for _ in range(4):
+            recorder.capture()
+        recorder.stop_recording()
+        
+        player = ScreenCapture({"capture_method": "replay", "quality": "high", "use_delay": False,
+                                "replay": {"source": archive, "mode": "step"}})
+        for expected in frames:
+            assert np.array_equal(player.capture(), expected)
+        assert player.capture() is None
+
+
+if __name__ == "__main__":
+    test_archive_random_access_across_chunks()
+    test_recording_replays_through_screen_capture()
+    print("帧归档测试通过")
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import subprocess
+import multiprocessing
+import numpy as np
+from multiprocessing import shared_memory
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.screen_capture import Frame
+from core.frame_bus import FrameBusWriter, FrameBusReader
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _read_in_child(name, queue):
+    """子进程中的读取端：读取最新帧后报告序列号和是否与写入端共享资源跟踪器"""
+    reader = FrameBusReader(name)
+    try:
+        frame = reader.wait_for_frame(timeout=1.0)
+        queue.put((frame.seq, int(frame.image[0, 0]), reader.shares_writer_tracker))
+    finally:
+        reader.close()
+
+
+def _segment_exists(name):
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False) if sys.version_info >= (3, 13) \
+            else shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    shm.close()
+    return True
+
+
+def test_frame_bus_round_trip():
+    """写入端写入的帧及元数据可被读取端完整读出"""
+    writer = FrameBusWriter(slots=3, max_frame_bytes=120 * 160 * 3)
+    reader = FrameBusReader(writer.name)
+    try:
+        assert reader.read_latest() is None
+        
+        for seq in range(1, 6):
+            image = np.full((120, 160, 3), seq, dtype=np.uint8)
+            assert writer.write(Frame(image, seq, time.perf_counter_ns(), (10, 20, 170, 140), 1.0))
+        
+        frame = reader.read_latest()
+        assert frame.seq == 5 and frame.region == (10, 20, 170, 140)
+        assert frame.image.shape == (120, 160, 3) and int(frame.image[0, 0, 0]) == 5
+        assert reader.read_latest(min_seq=5) is None
+        
+        # 灰度帧
+        writer.write(Frame(np.full((50, 60), 9, dtype=np.uint8), 6, time.perf_counter_ns()))
+        frame = reader.wait_for_frame(min_seq=5, timeout=0.1)
+        assert frame.image.shape == (50, 60) and frame.region is None
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_frame_bus_detects_overwrite():
+    """零拷贝视图在槽位被覆盖后校验失败，写入中的槽位不会被读取"""
+    writer = FrameBusWriter(slots=2, max_frame_bytes=100)
+    reader = FrameBusReader(writer.name)
+    try:
+        writer.write(Frame(np.zeros((10, 10), dtype=np.uint8), 1, 0))
+        frame, ticket = reader.view_latest()
+        assert frame.seq == 1 and reader.is_valid(ticket)
+        
+        writer.write(Frame(np.ones((10, 10), dtype=np.uint8), 2, 0))
+        assert reader.is_valid(ticket)  # 写入的是另一个槽位
+        writer.write(Frame(np.ones((10, 10), dtype=np.uint8), 3, 0))
+        assert not reader.is_valid(ticket)
+        
+        # 模拟写入端正在写最新槽位
+        latest = int(writer.layout.header["latest_slot"])
+        writer.layout.slot_headers[latest]["lock"] += 1
+        assert reader.read_latest() is None
+        
+        # 超出容量的帧被跳过
+        assert not writer.write(np.zeros((20, 20), dtype=np.uint8))
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_frame_bus_child_process_reader():
+    """写入进程派生的读取进程与写入端共享资源跟踪器，读取进程退出后共享内存仍在，写入端关闭时删除"""
+    writer = FrameBusWriter(slots=2, max_frame_bytes=100)
+    try:
+        writer.write(Frame(np.full((10, 10), 7, dtype=np.uint8), 42, 0))
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(target=_read_in_child, args=(writer.name, queue))
+        process.start()
+        seq, value, shares_tracker = queue.get(timeout=30)
+        process.join(30)
+        assert process.exitcode == 0
+        assert (seq, value) == (42, 7)
+        if os.name == "posix" and sys.version_info < (3, 13):
+            assert shares_tracker
+        assert _segment_exists(writer.name)
+    finally:
+        writer.close()
+    assert not _segment_exists(writer.name)
+
+
+def test_frame_bus_independent_process_reader():
+    """独立启动的读取进程退出后，其资源跟踪器不会删除写入端仍在使用的共享内存"""
+    writer = FrameBusWriter(slots=2, max_frame_bytes=100)
+    try:
+        writer.write(Frame(np.full((10, 10), 3, dtype=np.uint8), 5, 0))
+        script = ("from core.frame_bus import FrameBusReader\n"
+                  f"reader = FrameBusReader({writer.name!r})\n"
+                  "frame = reader.read_latest()\n"
+                  "print(frame.seq, reader.shares_writer_tracker)\n"
+                  "reader.close()\n")
+        result = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.split() == ["5", "False"]
+        
+        # 读取进程的资源跟踪器在其退出后异步清理，稍等后确认共享内存仍可读取
+        time.sleep(0.5)
+        reader = FrameBusReader(writer.name)
+        try:
+            assert reader.read_latest().seq == 5
+        finally:
+            reader.close()
+    finally:
+        writer.close()
+
+
+if __name__ == "__main__":
+    test_frame_bus_round_trip()
+    test_frame_bus_detects_overwrite()
+    test_frame_bus_child_process_reader()
+    test_frame_bus_independent_process_reader()
+    print("帧总线测试通过")
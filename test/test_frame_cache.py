@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.capture_backends import CaptureBackend, register_capture_backend
+from core.screen_capture import ScreenCapture
+from core.game_operations import GameOperations
+
+
+@register_capture_backend("test_cache_counter")
+class CounterBackend(CaptureBackend):
+    """画面内容为抓取次数的后端，像素写入同一个原始缓冲区"""
+
+    color_order = "BGRA"
+    requires_display = False
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.count = 0
+        self.raw = np.zeros((24, 32, 4), dtype=np.uint8)
+
+    def grab(self, monitor=None):
+        self.count += 1
+        self.raw[:] = self.count
+        return self.raw
+
+
+class FakeRecognition:
+    """总是找到模板的识别模块"""
+
+    def find_template(self, screenshot, template_name, threshold=None):
+        return {"found": True, "position": (5, 5), "template_name": template_name}
+
+
+class FakeInput:
+    """记录调用的输入控制器"""
+
+    overlimit_detection = False
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def action(*args, **kwargs):
+            self.calls.append(name)
+            return True
+        return action
+
+
+def _operations(ttl, **capture_config):
+    screen_capture = ScreenCapture(dict({"capture_method": "test_cache_counter", "quality": "high", "use_delay": False},
+                                        **capture_config))
+    operations = GameOperations(FakeRecognition(), FakeInput(), screen_capture,
+                                {"game_operations": {"frame_cache_ttl": ttl}, "default_interval": 0})
+    return operations, screen_capture._get_backend()
+
+
+def test_ttl_hit_reuses_frame():
+    """新鲜度窗口内连续获取复用同一帧，不重新抓屏"""
+    operations, backend = _operations(ttl=10.0)
+    first = operations._capture()
+    assert operations._capture() is first
+    assert operations.appear("button")["found"]
+    assert backend.count == 1 and operations.frame_cache_hits == 2
+
+
+def test_input_invalidates_cache():
+    """点击、拖动、输入文本、组合键和返回操作之后重新抓屏"""
+    operations, backend = _operations(ttl=10.0)
+    actions = [
+        lambda: operations.appear_then_click("button"),
+        lambda: operations.appear_then_drag("button", 10, 10),
+        lambda: operations.appear_then_type("button", "abc"),
+        lambda: operations.appear_then_hotkey("button", "ctrl", "a"),
+        operations.back,
+    ]
+    frame = operations._capture()
+    for action in actions:
+        assert action()
+        refreshed = operations._capture()
+        assert refreshed.seq != frame.seq
+        frame = refreshed
+    assert backend.count == len(actions) + 1
+
+
+def test_zero_ttl_disables_cache():
+    """frame_cache_ttl为0时每次都重新抓屏"""
+    operations, backend = _operations(ttl=0)
+    first = operations._capture()
+    second = operations._capture()
+    assert first.seq != second.seq
+    assert backend.count == 2 and operations.frame_cache_hits == 0
+    assert operations._cached_frame is None
+
+
+def test_zero_copy_frame_is_copied_before_caching():
+    """零拷贝模式下缓存的帧不与捕获缓冲区共享内存，后续捕获不会改变其像素"""
+    operations, backend = _operations(ttl=10.0, frame_mode="zero_copy")
+    cached = operations._capture()
+    assert np.all(cached.image == 1)
+
+    latest = operations.screen_capture.capture()
+    assert np.all(latest == 2)
+    assert not np.shares_memory(cached.image, latest)
+    assert operations._capture() is cached and np.all(cached.image == 1)
+
+
+if __name__ == "__main__":
+    test_ttl_hit_reuses_frame()
+    test_input_invalidates_cache()
+    test_zero_ttl_disables_cache()
+    test_zero_copy_frame_is_copied_before_caching()
+    print("帧缓存测试通过")
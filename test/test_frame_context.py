@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import tempfile
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.frame_context import FrameContextSampler
+from core.screen_capture import ScreenCapture
+
+
+def test_context_attached_and_window_text_cached():
+    """每帧附加鼠标位置和前台窗口，窗口标题只在句柄变化时查询"""
+    state = {"cursor": (10, 20), "hwnd": 100}
+    lookups = []
+    
+    def window_info(hwnd):
+        lookups.append(hwnd)
+        return f"窗口{hwnd}", "GameClass"
+    
+    sampler = FrameContextSampler(get_cursor=lambda: state["cursor"], get_foreground=lambda: state["hwnd"],
+                                  get_window_info=window_info)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "frames.npy")
+        np.save(source, np.zeros((1, 20, 30, 3), dtype=np.uint8))
+        screen_capture = ScreenCapture({"capture_method": "replay", "quality": "high", "use_delay": False,
+                                        "replay": {"source": source, "loop": True}})
+        screen_capture.context_sampler = sampler
+        
+        first = screen_capture.capture_frame()
+        state["cursor"] = (15, 25)
+        second = screen_capture.capture_frame()
+        state["hwnd"] = 200
+        third = screen_capture.capture_frame()
+    
+    assert first.context["cursor"] == (10, 20) and second.context["cursor"] == (15, 25)
+    assert second.context["foreground_window"] == {"handle": 100, "title": "窗口100", "class": "GameClass"}
+    assert third.context["foreground_window"]["handle"] == 200
+    assert lookups == [100, 200]
+    assert third.copy().context is third.context
+
+
+if __name__ == "__main__":
+    test_context_attached_and_window_text_cached()
+    print("帧上下文测试通过")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.capture_backends import CaptureBackend, register_capture_backend
+from core.screen_capture import ScreenCapture, Frame
+
+
+@register_capture_backend("test_metadata_static")
+class StaticBackend(CaptureBackend):
+    """返回固定画面的后端"""
+
+    requires_display = False
+
+    def grab(self, monitor=None):
+        height = monitor["height"] if monitor else 60
+        width = monitor["width"] if monitor else 80
+        return np.full((height, width, 3), 90, dtype=np.uint8)
+
+
+def _capture(**overrides):
+    return ScreenCapture(dict({"capture_method": "test_metadata_static", "quality": "high", "use_delay": False},
+                              **overrides))
+
+
+def test_seq_and_timestamp_monotonic_across_instances():
+    """序列号在进程内单调递增（跨实例不重复），捕获时间戳不回退"""
+    first, second = _capture(), _capture()
+    frames = [first.capture_frame(), second.capture_frame(), first.capture_frame(), second.capture_frame()]
+    seqs = [frame.seq for frame in frames]
+    timestamps = [frame.timestamp_ns for frame in frames]
+    assert seqs == sorted(seqs) and len(set(seqs)) == len(seqs)
+    assert timestamps == sorted(timestamps)
+
+    before = time.perf_counter_ns()
+    frame = first.capture_frame()
+    assert before <= frame.timestamp_ns <= time.perf_counter_ns()
+    assert frame.age_ms() >= 0
+
+
+def test_frame_carries_region_and_scale():
+    """帧携带捕获区域和缩放比例，帧内坐标可换算回屏幕坐标"""
+    frame = _capture(region=[100, 50, 300, 250], quality="low").capture_frame()
+    assert frame.region == (100, 50, 300, 250)
+    assert frame.scale_factor == 0.5
+    assert frame.shape == (100, 100, 3) and not frame.is_gray
+    assert frame.to_screen(10, 20) == (120, 90)
+
+
+def test_frame_slots_and_copy():
+    """Frame使用__slots__，copy复制像素并保留全部元数据"""
+    frame = Frame(np.zeros((4, 4), dtype=np.uint8), 7, 123, (1, 2, 5, 6), 0.75, context={"cursor": (3, 4)})
+    assert not hasattr(frame, "__dict__")
+    try:
+        frame.extra = 1
+        assert False, "Frame不应允许新增属性"
+    except AttributeError:
+        pass
+
+    copied = frame.copy()
+    assert copied.image is not frame.image and np.array_equal(copied.image, frame.image)
+    assert (copied.seq, copied.timestamp_ns, copied.region, copied.scale_factor, copied.context) == \
+        (7, 123, (1, 2, 5, 6), 0.75, {"cursor": (3, 4)})
+    assert copied.is_gray
+
+
+if __name__ == "__main__":
+    test_seq_and_timestamp_monotonic_across_instances()
+    test_frame_carries_region_and_scale()
+    test_frame_slots_and_copy()
+    print("帧元数据测试通过")
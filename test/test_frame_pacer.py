@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.screen_capture import FramePacer
+
+
+class FakeClock:
+    """可控时钟，sleep只推进时间并记录休眠时长"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def _pacer(**kwargs):
+    clock = FakeClock()
+    return FramePacer(sleep=clock.sleep, clock=clock, **kwargs), clock
+
+
+def test_sleeps_only_remaining_budget():
+    """只休眠到上一帧开始时刻加帧预算的截止时刻，工作耗时计入预算"""
+    pacer, clock = _pacer(max_fps=10)
+    assert pacer.wait() == 0.0  # 第一帧不等待
+
+    clock.advance(0.03)  # 本帧工作耗时30ms
+    slept = pacer.wait()
+    assert abs(slept - 0.07) < 1e-9
+    assert abs(clock.now - 100.1) < 1e-9
+
+    clock.advance(0.1)  # 正好用完预算
+    assert pacer.wait() == 0.0
+    assert abs(pacer.get_stats()["total_sleep_s"] - 0.07) < 1e-9
+
+
+def test_overrun_does_not_sleep_and_is_recorded():
+    """单帧超出预算时不休眠，记录为超时"""
+    pacer, clock = _pacer(frame_budget=0.05)
+    pacer.wait()
+    clock.advance(0.08)
+    pacer.record(0.08)
+    assert pacer.wait() == 0.0
+    assert clock.sleeps == []
+
+    pacer.record(0.02)
+    stats = pacer.get_stats()
+    assert stats["frames"] == 2 and stats["overruns"] == 1
+    assert abs(stats["max_overrun_ms"] - 30.0) < 1e-6
+
+
+def test_deadline_resets_after_falling_behind():
+    """落后之后以当前时刻为新起点，不连续抓帧追赶累积的延迟"""
+    pacer, clock = _pacer(frame_budget=0.1)
+    pacer.wait()
+    clock.advance(0.5)  # 一次长时间停顿，落后约4帧
+    assert pacer.wait() == 0.0
+
+    clock.advance(0.01)
+    # 下一帧仍需等待完整的剩余预算，而不是立即返回以补齐落下的帧
+    assert abs(pacer.wait() - 0.09) < 1e-9
+    assert abs(pacer.wait() - 0.1) < 1e-9
+
+
+def test_unlimited_budget_never_sleeps():
+    """未设置帧预算时从不休眠"""
+    pacer, clock = _pacer()
+    for _ in range(5):
+        assert pacer.wait() == 0.0
+    assert clock.sleeps == []
+
+
+if __name__ == "__main__":
+    test_sleeps_only_remaining_budget()
+    test_overrun_does_not_sleep_and_is_recorded()
+    test_deadline_resets_after_falling_behind()
+    test_unlimited_budget_never_sleeps()
+    print("帧节拍器测试通过")
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyautogui
+from core import screen_metrics
+from core.input_controller import InputController
+from core.screen_metrics import ScreenMetrics, StubMetricsProvider, set_screen_metrics
+
+
+def test_clamp_follows_display_change():
+    """显示配置变化后点击坐标按新的屏幕范围限制，无需重新创建输入控制器"""
+    provider = StubMetricsProvider([{"left": 0, "top": 0, "width": 1920, "height": 1080}])
+    metrics = ScreenMetrics(provider)
+    previous = screen_metrics._screen_metrics
+    original_move_to = pyautogui.moveTo
+    moves = []
+    pyautogui.moveTo = lambda x, y, duration=None: moves.append((x, y))
+    set_screen_metrics(metrics)
+    try:
+        controller = InputController({"use_delay": False})
+        assert controller.set_mouse_position(3000, 2000)
+        assert moves[-1] == (1919, 1079)
+
+        provider._monitors = [{"left": 0, "top": 0, "width": 2560, "height": 1440}]
+        metrics.invalidate()
+        assert (controller.screen_width, controller.screen_height) == (2560, 1440)
+        assert controller.set_mouse_position(3000, 2000)
+        assert moves[-1] == (2559, 1439)
+    finally:
+        pyautogui.moveTo = original_move_to
+        set_screen_metrics(previous)
+
+
+if __name__ == "__main__":
+    test_clamp_follows_display_change()
+    print("输入控制器测试通过")
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import tempfile
+import cv2
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.image_recognition import ImageRecognition
+
+
+def _place(background, patch, x, y):
+    screenshot = background.copy()
+    screenshot[y:y + patch.shape[0], x:x + patch.shape[1]] = patch
+    return screenshot
+
+
+def test_locality_hit_and_fallback():
+    """元素小幅移动时在上次位置附近命中，大幅移动时回退到整帧搜索"""
+    rng = np.random.default_rng(5)
+    background = rng.integers(0, 255, (300, 400, 3), dtype=np.uint8)
+    patch = rng.integers(0, 255, (30, 40, 3), dtype=np.uint8)
+    with tempfile.TemporaryDirectory() as tmp:
+        cv2.imwrite(os.path.join(tmp, "button.png"), patch)
+        recognition = ImageRecognition({"template_dir": tmp, "locality": {"margin": 10}})
+        
+        assert recognition.find_template(_place(background, patch, 100, 80), "button")["position"] == (100, 80)
+        assert recognition.get_locality_stats()["hits"] == 0  # 首次没有历史位置
+        
+        assert recognition.find_template(_place(background, patch, 106, 75), "button")["position"] == (106, 75)
+        assert recognition.get_locality_stats()["hits"] == 1
+        
+        assert recognition.find_template(_place(background, patch, 300, 200), "button")["position"] == (300, 200)
+        stats = recognition.get_locality_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+        
+        recognition.forget_position("button")
+        assert recognition.get_locality_stats()["tracked_templates"] == 0
+
+
+if __name__ == "__main__":
+    test_locality_hit_and_fallback()
+    print("就近搜索测试通过")
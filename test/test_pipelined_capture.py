@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.capture_backends import CaptureBackend, register_capture_backend
+from core.screen_capture import ScreenCapture
+
+
+@register_capture_backend("test_slow_grab")
+class SlowGrabBackend(CaptureBackend):
+    """每次抓取耗时固定的后端，画面内容为抓取次数"""
+    
+    requires_display = False
+    grab_seconds = 0.02
+    
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.count = 0
+    
+    def grab(self, monitor=None):
+        time.sleep(self.grab_seconds)
+        self.count += 1
+        return np.full((48, 64, 3), self.count % 256, dtype=np.uint8)
+
+
+def test_pipeline_overlaps_capture_and_processing():
+    """捕获与处理重叠执行，总耗时接近较慢阶段而不是两者之和"""
+    screen_capture = ScreenCapture({"capture_method": "test_slow_grab", "quality": "high", "use_delay": False})
+    values = []
+    
+    def process(image):
+        time.sleep(0.02)
+        values.append(int(image[0, 0, 0]))
+    
+    start = time.perf_counter()
+    assert screen_capture.pipelined_capture(process, max_iterations=10)
+    elapsed = time.perf_counter() - start
+    
+    assert values == list(range(1, 11))  # 按顺序处理，不丢帧
+    assert elapsed < 0.02 * 2 * 10 * 0.85
+    stats = screen_capture.get_pipeline_stats()
+    assert stats["capture"]["frames"] == 10 and stats["process"]["frames"] == 10
+
+
+def test_stop_pipeline_from_callback():
+    """在回调中调用stop_pipeline可以结束流水线"""
+    screen_capture = ScreenCapture({"capture_method": "test_slow_grab", "quality": "high", "use_delay": False})
+    seen = []
+    
+    def process(image):
+        seen.append(image)
+        if len(seen) == 3:
+            screen_capture.stop_pipeline()
+    
+    assert screen_capture.pipelined_capture(process, queue_size=1)
+    assert len(seen) == 3
+
+
+def _exhausted_replay(tmp, count=3, **config):
+    """回放count帧后耗尽的步进回放"""
+    source = os.path.join(tmp, "frames.npy")
+    np.save(source, np.arange(count, dtype=np.uint8)[:, None, None, None] * np.ones((1, 16, 16, 3), dtype=np.uint8))
+    return ScreenCapture(dict({"capture_method": "replay", "quality": "high", "use_delay": False,
+                               "replay": {"source": source, "mode": "step"}}, **config))
+
+
+def test_failed_grabs_count_toward_max_iterations():
+    """回放耗尽后捕获失败也计入max_iterations，流水线按时结束而不是空转"""
+    with tempfile.TemporaryDirectory() as tmp:
+        screen_capture = _exhausted_replay(tmp)
+        values = []
+        start = time.perf_counter()
+        assert screen_capture.pipelined_capture(lambda image: values.append(int(image[0, 0, 0])), max_iterations=10)
+        assert time.perf_counter() - start < 2.0
+        assert values == [0, 1, 2]
+        stats = screen_capture.get_pipeline_stats()
+        assert stats["capture"]["frames"] == 3 and stats["capture"]["failures"] == 7
+
+
+def test_consecutive_failures_end_pipeline():
+    """不限次数时，连续失败达到上限后结束并返回False，失败期间退避而不是忙等"""
+    with tempfile.TemporaryDirectory() as tmp:
+        screen_capture = _exhausted_replay(tmp, pipeline={"max_consecutive_failures": 5})
+        grabs = []
+        original = screen_capture.capture_frame
+        screen_capture.capture_frame = lambda: grabs.append(1) or original()
+        values = []
+        start = time.perf_counter()
+        assert not screen_capture.pipelined_capture(values.append)
+        assert time.perf_counter() - start < 2.0
+        assert len(values) == 3 and len(grabs) == 8
+
+
+if __name__ == "__main__":
+    test_pipeline_overlaps_capture_and_processing()
+    test_stop_pipeline_from_callback()
+    test_failed_grabs_count_toward_max_iterations()
+    test_consecutive_failures_end_pipeline()
+    print("流水线捕获测试通过")
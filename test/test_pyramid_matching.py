@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import tempfile
+import cv2
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.image_recognition import ImageRecognition
+from core.screen_capture import Frame
+
+
+def _scene(seed=11):
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 255, (540, 960, 3), dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (7, 7), 2)
+
+
+def test_pyramid_matches_full_resolution_result():
+    """金字塔匹配的位置与全分辨率一致，相似度为全分辨率下的值"""
+    screenshot = _scene()
+    with tempfile.TemporaryDirectory() as tmp:
+        cv2.imwrite(os.path.join(tmp, "panel.png"), screenshot[151:215, 403:499])
+        cv2.imwrite(os.path.join(tmp, "tiny.png"), screenshot[300:310, 600:612])
+        standard = ImageRecognition({"template_dir": tmp})
+        pyramid = ImageRecognition({"template_dir": tmp, "engine": "pyramid", "pyramid": {"levels": 2, "top_k": 3}})
+        
+        frame = Frame(screenshot, 1, 0)
+        for name in ("panel", "tiny"):
+            expected = standard.find_template(screenshot, name)
+            result = pyramid.find_template(frame, name)
+            assert result["found"] and result["position"] == expected["position"]
+        
+        template = pyramid.load_template("panel")
+        gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
+        value, position = pyramid._pyramid_match(frame, gray, (0, 0), template, "panel")
+        assert position == (403, 151) and value > 0.999
+        # 模板过小时不使用金字塔
+        assert pyramid._pyramid_levels(pyramid.load_template("tiny")) == 0
+        # 同一帧的金字塔被缓存
+        assert pyramid._frame_pyramid_seq == 1 and len(pyramid._frame_pyramids) == 1
+
+
+def test_engine_selectable_per_template():
+    """模板清单可为单个模板指定引擎"""
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "manifest.yaml"), "w", encoding="utf-8") as f:
+            f.write("templates:\n  panel:\n    engine: pyramid\n")
+        recognition = ImageRecognition({"template_dir": tmp})
+        assert recognition._template_engine("panel.png") == "pyramid"
+        assert recognition._template_engine("other") == "standard"
+
+
+if __name__ == "__main__":
+    test_pyramid_matches_full_resolution_result()
+    test_engine_selectable_per_template()
+    print("金字塔匹配测试通过")
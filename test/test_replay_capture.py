@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import cv2
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.screen_capture import ScreenCapture
+from core.image_recognition import ImageRecognition
+
+
+def _make_frames(count=5, size=(120, 160)):
+    """生成带有移动方块的测试帧"""
+    frames = []
+    for i in range(count):
+        frame = np.full((*size, 3), 40, dtype=np.uint8)
+        cv2.rectangle(frame, (10 + i * 10, 20), (40 + i * 10, 50), (0, 200, 255), -1)
+        cv2.putText(frame, str(i), (100, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        frames.append(frame)
+    return frames
+
+
+def _replay_config(source, **replay):
+    """构造回放模式的屏幕捕获配置"""
+    return {
+        "capture_method": "replay",
+        "quality": "high",
+        "use_delay": False,
+        "replay": dict({"source": source, "mode": "step"}, **replay),
+    }
+
+
+def test_replay_png_directory_step():
+    """图片目录按步进模式逐帧回放，结束后返回None"""
+    frames = _make_frames()
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, frame in enumerate(frames):
+            cv2.imwrite(os.path.join(tmp, f"{i:04d}.png"), frame)
+        
+        screen_capture = ScreenCapture(_replay_config(tmp))
+        assert screen_capture.get_screen_size() == (160, 120)
+        
+        for frame in frames:
+            captured = screen_capture.capture()
+            assert np.array_equal(captured, frame)
+        assert screen_capture.capture() is None
+
+
+def test_replay_npy_region_and_recognition():
+    """内存映射的原始帧支持区域捕获，并可直接驱动模板匹配"""
+    frames = _make_frames()
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "frames.npy")
+        np.save(source, np.stack(frames))
+        template_dir = os.path.join(tmp, "templates")
+        os.makedirs(template_dir)
+        cv2.imwrite(os.path.join(template_dir, "digit.png"), frames[2][80:110, 95:130])
+        
+        screen_capture = ScreenCapture(_replay_config(source, loop=True))
+        region = screen_capture.capture_region(10, 20, 60, 50)
+        assert region.shape == (30, 50, 3)
+        assert np.array_equal(region, frames[0][20:50, 10:60])
+        
+        # 区域捕获同样消耗一帧，回到开头后逐帧识别
+        screen_capture.backend.rewind()
+        image_recognition = ImageRecognition({"template_dir": template_dir, "threshold": 0.99})
+        results = [image_recognition.find_template(screen_capture.capture_frame(), "digit")["found"] for _ in frames]
+        assert results == [False, False, True, False, False]
+
+
+def test_replay_gray_color_mode():
+    """灰度颜色模式直接输出单通道图像，零拷贝模式复用同一缓冲区"""
+    frames = _make_frames()
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "frames.npy")
+        np.save(source, np.stack(frames))
+        
+        config = _replay_config(source)
+        config["color_mode"] = "gray"
+        gray = ScreenCapture(config).capture()
+        assert gray.shape == (120, 160)
+        assert np.array_equal(gray, cv2.cvtColor(frames[0], cv2.COLOR_BGR2GRAY))
+        
+        config["frame_mode"] = "zero_copy"
+        screen_capture = ScreenCapture(config)
+        first = screen_capture.capture_frame()
+        second = screen_capture.capture_frame()
+        assert first.is_gray and first.image is second.image
+        assert np.array_equal(second.image, cv2.cvtColor(frames[1], cv2.COLOR_BGR2GRAY))
+
+
+def test_replay_capture_regions():
+    """多区域捕获只抓取一次，各区域为同一次抓取结果的视图，携带屏幕坐标和独立的序列号"""
+    frames = _make_frames()
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "frames.npy")
+        np.save(source, np.stack(frames))
+        
+        screen_capture = ScreenCapture(_replay_config(source))
+        views = screen_capture.capture_regions({"hp": (5, 10, 60, 55), "digit": (95, 80, 130, 110)})
+        
+        assert np.array_equal(views["hp"].image, frames[0][10:55, 5:60])
+        assert np.array_equal(views["digit"].image, frames[0][80:110, 95:130])
+        assert views["hp"].seq != views["digit"].seq
+        assert views["hp"].timestamp_ns == views["digit"].timestamp_ns
+        assert views["hp"].image.base is views["digit"].image.base
+        assert views["digit"].to_screen(5, 5) == (100, 85)
+        
+        # 只消耗了一帧
+        assert np.array_equal(screen_capture.capture(), frames[1])
+        
+        # 同一次调用得到的两个区域依次识别，各自使用自己的灰度图
+        template_dir = os.path.join(tmp, "templates")
+        os.makedirs(template_dir)
+        cv2.imwrite(os.path.join(template_dir, "hp.png"), frames[0][15:35, 5:30])
+        cv2.imwrite(os.path.join(template_dir, "digit.png"), frames[0][82:106, 98:126])
+        image_recognition = ImageRecognition({"template_dir": template_dir, "threshold": 0.99,
+                                              "locality": {"enabled": False}})
+        hp = image_recognition.find_template(views["hp"], "hp")
+        digit = image_recognition.find_template(views["digit"], "digit")
+        assert hp["found"] and hp["position"] == (0, 5)
+        assert digit["found"] and digit["position"] == (3, 2)
+
+
+def test_replay_realtime_speed():
+    """realtime模式按录制时间轴加速回放"""
+    frames = _make_frames(count=3)
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, frame in enumerate(frames):
+            cv2.imwrite(os.path.join(tmp, f"{i:04d}.png"), frame)
+        
+        # 10fps的源以20倍速回放，每帧约5毫秒
+        screen_capture = ScreenCapture(_replay_config(tmp, mode="realtime", fps=10, speed=20))
+        assert np.array_equal(screen_capture.capture(), frames[0])
+        time.sleep(0.012)
+        assert np.array_equal(screen_capture.capture(), frames[2])
+        time.sleep(0.01)
+        assert screen_capture.capture() is None
+
+
+if __name__ == "__main__":
+    test_replay_png_directory_step()
+    test_replay_npy_region_and_recognition()
+    test_replay_gray_color_mode()
+    test_replay_capture_regions()
+    test_replay_realtime_speed()
+    print("回放捕获测试通过")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import screen_metrics
+from core.screen_metrics import ScreenMetrics, StubMetricsProvider, set_screen_metrics
+from core.capture_backends import PilBackend
+
+
+class CountingProvider(StubMetricsProvider):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+    
+    def query(self):
+        self.calls += 1
+        return super().query()
+
+
+def test_metrics_cached_until_display_change():
+    """多显示器的虚拟桌面范围，结果缓存到显示配置变化"""
+    provider = CountingProvider([
+        {"left": 0, "top": 0, "width": 1920, "height": 1080},
+        {"left": -1280, "top": 200, "width": 1280, "height": 1024, "dpi_scale": 1.25},
+    ])
+    metrics = ScreenMetrics(provider)
+    changes = []
+    metrics.add_listener(lambda: changes.append(metrics.generation))
+    
+    assert metrics.virtual_bounds() == (-1280, 0, 1920, 1224)
+    assert metrics.screen_size() == (3200, 1224)
+    assert metrics.dpi_scale(1) == 1.25 and metrics.primary_monitor()["primary"]
+    assert provider.calls == 1
+    
+    provider._monitors = provider._monitors[:1]
+    assert metrics.screen_size() == (3200, 1224)  # 未收到变化事件前仍使用缓存
+    metrics.invalidate()
+    assert metrics.screen_size() == (1920, 1080)
+    assert provider.calls == 2 and changes == [1]
+
+
+def test_pil_backend_screen_size_without_grab():
+    """PIL后端的屏幕尺寸来自共享的屏幕信息服务"""
+    previous = screen_metrics._screen_metrics
+    try:
+        set_screen_metrics(ScreenMetrics(StubMetricsProvider([{"left": 0, "top": 0, "width": 2560, "height": 1440}])))
+        assert PilBackend().screen_size() == (2560, 1440)
+    finally:
+        set_screen_metrics(previous)
+
+
+if __name__ == "__main__":
+    test_metrics_cached_until_display_change()
+    test_pil_backend_screen_size_without_grab()
+    print("屏幕信息服务测试通过")
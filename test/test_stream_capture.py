@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import threading
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.capture_backends import CaptureBackend, register_capture_backend
+from core.screen_capture import ScreenCapture, Frame, FrameRingBuffer
+
+
+@register_capture_backend("test_stream_counter")
+class CounterBackend(CaptureBackend):
+    """画面内容为抓取次数的后端"""
+
+    requires_display = False
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.count = 0
+
+    def grab(self, monitor=None):
+        self.count += 1
+        return np.full((24, 32, 3), self.count % 256, dtype=np.uint8)
+
+
+@register_capture_backend("test_stream_blocking")
+class BlockingBackend(CaptureBackend):
+    """release未设置时抓取一直阻塞的后端，模拟卡在抓取中的捕获线程"""
+
+    requires_display = False
+    release = threading.Event()
+
+    def grab(self, monitor=None):
+        self.release.wait()
+        return np.zeros((24, 32, 3), dtype=np.uint8)
+
+
+def _frame(seq, shape=(8, 8)):
+    return Frame(np.full(shape, seq % 256, dtype=np.uint8), seq, seq * 1000)
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline, "等待超时"
+        time.sleep(0.005)
+
+
+def test_latest_returns_snapshot():
+    """latest返回最新帧的快照，生产者继续写入不会改变已返回帧的元数据"""
+    ring = FrameRingBuffer(size=2)
+    assert ring.latest() is None
+
+    ring.write(_frame(1))
+    ring.write(_frame(2))
+    view = ring.latest()
+    copied = ring.latest(copy=True)
+    assert view.seq == 2 and copied.seq == 2 and copied.timestamp_ns == 2000
+
+    for seq in range(3, 6):
+        ring.write(_frame(seq))
+    assert view.seq == 2 and view.timestamp_ns == 2000
+    assert np.all(copied.image == 2)
+    assert ring.latest().seq == 5
+
+
+def test_drop_counting():
+    """未被读取就被新帧取代的帧计为丢弃，读取后的下一帧不计"""
+    ring = FrameRingBuffer(size=3)
+    for seq in range(1, 4):
+        ring.write(_frame(seq))
+    assert ring.get_stats()["frames_dropped"] == 2
+
+    ring.latest()
+    ring.write(_frame(4))
+    stats = ring.get_stats()
+    assert stats["frames_written"] == 4 and stats["frames_dropped"] == 2
+
+
+def test_copy_never_tears_under_concurrent_writes():
+    """生产者持续覆盖槽位时，复制得到的像素始终与seq属于同一帧"""
+    ring = FrameRingBuffer(size=2)
+    stop = threading.Event()
+
+    def produce():
+        seq = 0
+        while not stop.is_set():
+            seq += 1
+            ring.write(_frame(seq, shape=(1024, 1024)))
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    try:
+        _wait_for(lambda: ring.latest() is not None)
+        for _ in range(300):
+            frame = ring.latest(copy=True)
+            assert np.all(frame.image == frame.seq % 256)
+    finally:
+        stop.set()
+        producer.join()
+
+
+def test_stream_start_stop_restart():
+    """流式捕获可以停止后重新启动，重复启动被拒绝"""
+    screen_capture = ScreenCapture({"capture_method": "test_stream_counter", "quality": "high", "use_delay": False})
+    assert screen_capture.latest_frame() is None
+
+    assert screen_capture.start_stream(target_fps=200, ring_size=3)
+    assert not screen_capture.start_stream()
+    _wait_for(lambda: screen_capture.latest_frame() is not None)
+    first = screen_capture.latest_frame(copy=True)
+    assert screen_capture.is_streaming()
+
+    assert screen_capture.stop_stream()
+    assert not screen_capture.is_streaming()
+    assert not screen_capture.stop_stream()
+    written = screen_capture.get_stream_stats()["frames_written"]
+    time.sleep(0.05)
+    assert screen_capture.get_stream_stats()["frames_written"] == written
+
+    assert screen_capture.start_stream(target_fps=200)
+    _wait_for(lambda: screen_capture.latest_frame() is not None)
+    assert screen_capture.latest_frame().seq > first.seq
+    screen_capture.stop_stream()
+
+
+def test_stream_stats_available_right_after_start():
+    """启动后立即可以查询统计，重新启动后报告的是新一轮的节拍器"""
+    screen_capture = ScreenCapture({"capture_method": "test_stream_counter", "quality": "high", "use_delay": False})
+    assert screen_capture.start_stream(target_fps=200)
+    stats = screen_capture.get_stream_stats()
+    assert "pacing" in stats
+    first_pacer = screen_capture.stream_pacer
+    assert screen_capture.stop_stream()
+
+    assert screen_capture.start_stream(target_fps=100)
+    assert screen_capture.stream_pacer is not first_pacer
+    assert screen_capture.get_stream_stats()["frames_written"] <= 1
+    screen_capture.stop_stream()
+
+
+def test_restart_refused_while_old_thread_stuck():
+    """停止超时后旧线程仍卡在抓取中时拒绝重新启动，旧线程退出后不再写入缓冲区"""
+    BlockingBackend.release.clear()
+    screen_capture = ScreenCapture({"capture_method": "test_stream_blocking", "quality": "high", "use_delay": False})
+    try:
+        assert screen_capture.start_stream(target_fps=200)
+        time.sleep(0.02)
+        assert not screen_capture.stop_stream(timeout=0.05)
+        assert screen_capture.is_streaming()
+        assert not screen_capture.start_stream()
+    finally:
+        BlockingBackend.release.set()
+    assert screen_capture.stop_stream()
+    assert screen_capture.get_stream_stats()["frames_written"] == 0
+    assert screen_capture.start_stream(target_fps=200)
+    _wait_for(lambda: screen_capture.latest_frame() is not None)
+    assert screen_capture.stop_stream()
+
+
+if __name__ == "__main__":
+    test_latest_returns_snapshot()
+    test_drop_counting()
+    test_copy_never_tears_under_concurrent_writes()
+    test_stream_start_stop_restart()
+    test_stream_stats_available_right_after_start()
+    test_restart_refused_while_old_thread_stuck()
+    print("流式捕获测试通过")
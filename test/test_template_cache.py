@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import tempfile
+import cv2
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.image_recognition import ImageRecognition
+from core.template_cache import compile_templates, CompiledTemplateCache
+
+
+def _scene(seed=5):
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 255, (360, 640, 3), dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (7, 7), 2)
+
+
+def test_compiled_cache_matches_decoded_templates():
+    """编译缓存中的灰度图和金字塔与直接解码的结果一致"""
+    screenshot = _scene()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "ui"))
+        cv2.imwrite(os.path.join(tmp, "button.png"), screenshot[40:104, 80:176])
+        cv2.imwrite(os.path.join(tmp, "ui", "icon.png"), screenshot[200:232, 300:348])
+        cache_path = os.path.join(tmp, "templates.tcache")
+
+        assert compile_templates(tmp, cache_path, pyramid_levels=2, min_template_size=12) == 2
+        cache = CompiledTemplateCache(cache_path)
+        button = cache.get("button.png", os.path.join(tmp, "button.png"))
+        expected = cv2.cvtColor(cv2.imread(os.path.join(tmp, "button.png")), cv2.COLOR_BGR2GRAY)
+        assert np.array_equal(button["gray"], expected)
+        assert len(button["pyramid"]) == 3
+        assert np.array_equal(button["pyramid"][1], cv2.pyrDown(expected))
+        assert not button["gray"].flags.writeable
+
+        icon = cache.get("ui/icon.png", os.path.join(tmp, "ui", "icon.png"))
+        assert len(icon["pyramid"]) == 2  # 再缩小一层会小于最小边长
+
+
+def test_recompile_switches_version_without_touching_mapped_file():
+    """重新编译写入新版本的数据文件并切换指针，已映射旧版本的读取方不受影响"""
+    screenshot = _scene()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "templates", "button.png")
+        os.makedirs(os.path.dirname(path))
+        cv2.imwrite(path, screenshot[40:104, 80:176])
+        cache_path = os.path.join(tmp, "templates.tcache")
+        compile_templates(os.path.dirname(path), cache_path)
+        old = CompiledTemplateCache(cache_path)
+        old_gray = old.get("button.png")["gray"]
+        expected = np.array(old_gray)
+
+        # 模板未变化时数据文件不变
+        compile_templates(os.path.dirname(path), cache_path)
+        assert CompiledTemplateCache(cache_path).data_path == old.data_path
+
+        # 模拟Windows：仍被映射的旧版本无法删除，编译照常完成并保留旧文件
+        cv2.imwrite(path, screenshot[41:105, 80:176])
+        original_remove = os.remove
+
+        def remove(target, *args, **kwargs):
+            if os.path.abspath(target) == os.path.abspath(old.data_path):
+                raise PermissionError(target)
+            return original_remove(target, *args, **kwargs)
+
+        os.remove = remove
+        try:
+            compile_templates(os.path.dirname(path), cache_path)
+        finally:
+            os.remove = original_remove
+        new = CompiledTemplateCache(cache_path)
+        assert new.data_path != old.data_path and os.path.exists(old.data_path)
+        assert new.get("button.png", path) is not None
+        assert np.array_equal(old_gray, expected)
+
+        # 下次编译时清理不再使用的旧版本
+        compile_templates(os.path.dirname(path), cache_path)
+        assert sorted(os.listdir(tmp)) == sorted(["templates", "templates.tcache", os.path.basename(new.data_path)])
+
+
+def test_invalidation_by_mtime_and_hash():
+    """修改时间变化但内容相同时仍有效，内容变化后失效"""
+    screenshot = _scene()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "button.png")
+        cv2.imwrite(path, screenshot[40:104, 80:176])
+        cache_path = os.path.join(tmp, "templates.tcache")
+        compile_templates(tmp, cache_path)
+
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert CompiledTemplateCache(cache_path).get("button.png", path) is not None
+
+        cv2.imwrite(path, screenshot[41:105, 80:176])
+        assert CompiledTemplateCache(cache_path).get("button.png", path) is None
+        assert CompiledTemplateCache(cache_path).get("missing.png") is None
+
+
+def test_image_recognition_uses_compiled_cache():
+    """配置编译缓存后加载模板不再解码图像，过期条目回退到读取源文件"""
+    screenshot = _scene()
+    with tempfile.TemporaryDirectory() as tmp:
+        cv2.imwrite(os.path.join(tmp, "button.png"), screenshot[40:104, 80:176])
+        cv2.imwrite(os.path.join(tmp, "label.png"), screenshot[150:182, 400:480])
+        cache_path = os.path.join(tmp, "templates.tcache")
+        compile_templates(tmp, cache_path)
+        cv2.imwrite(os.path.join(tmp, "label.png"), screenshot[151:183, 400:480])
+
+        recognition = ImageRecognition({"template_dir": tmp, "compiled_cache": cache_path,
+                                        "engine": "pyramid", "locality": {"enabled": False}})
+        assert recognition.compiled_cache is not None
+        result = recognition.find_template(screenshot, "button")
+        assert result["found"] and result["position"] == (80, 40)
+        assert ("button", 2) in recognition._template_pyramids
+
+        result = recognition.find_template(screenshot, "label")
+        assert result["found"] and result["position"] == (400, 151)
+        assert recognition.compiled_hits == 1 and recognition.compiled_misses == 1
+
+
+if __name__ == "__main__":
+    test_compiled_cache_matches_decoded_templates()
+    test_recompile_switches_version_without_touching_mapped_file()
+    test_invalidation_by_mtime_and_hash()
+    test_image_recognition_uses_compiled_cache()
+    print("模板编译缓存测试通过")
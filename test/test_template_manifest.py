@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import tempfile
+import cv2
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.image_recognition import ImageRecognition
+from core.screen_capture import Frame
+
+
+MANIFEST = """
+templates:
+  icon:
+    roi: [180, 130, 260, 200]
+  icon_elsewhere.png:
+    roi: [0, 0, 100, 100]
+  icon_window:
+    roi: [0.5, 0.5, 1.0, 1.0]
+    relative_to: window
+"""
+
+
+def _setup(tmp):
+    rng = np.random.default_rng(3)
+    screenshot = rng.integers(0, 255, (240, 320, 3), dtype=np.uint8)
+    for name in ("icon", "icon_elsewhere", "icon_window"):
+        cv2.imwrite(os.path.join(tmp, name + ".png"), screenshot[150:190, 200:240])
+    with open(os.path.join(tmp, "manifest.yaml"), "w", encoding="utf-8") as f:
+        f.write(MANIFEST)
+    return screenshot, ImageRecognition({"template_dir": tmp})
+
+
+def test_roi_crops_and_translates_back():
+    """只在搜索区域内匹配，结果换算回整帧坐标"""
+    with tempfile.TemporaryDirectory() as tmp:
+        screenshot, recognition = _setup(tmp)
+        assert recognition._search_rect("icon", screenshot) == (180, 130, 260, 200)
+        assert recognition.find_template(screenshot, "icon")["position"] == (200, 150)
+        # 搜索区域不包含模板所在位置时找不到
+        assert recognition.find_template(screenshot, "icon_elsewhere")["found"] is False
+        matches = recognition.find_all_templates(screenshot, "icon", threshold=0.99)
+        assert [m["top_left"] for m in matches] == [(200, 150)]
+
+
+def test_window_relative_roi_on_region_frame():
+    """相对窗口的比例区域，屏幕坐标考虑捕获区域偏移"""
+    with tempfile.TemporaryDirectory() as tmp:
+        screenshot, recognition = _setup(tmp)
+        frame = Frame(screenshot, 1, 0, region=(100, 50, 420, 290))
+        assert recognition._search_rect("icon_window", frame) == (160, 120, 320, 240)
+        result = recognition.find_template(frame, "icon_window")
+        assert result["position"] == (200, 150)
+        assert result["screen_position"] == (300, 200)
+        # 屏幕坐标的区域按帧区域换算
+        assert recognition._search_rect("icon", frame) == (80, 80, 160, 150)
+
+
+if __name__ == "__main__":
+    test_roi_crops_and_translates_back()
+    test_window_relative_roi_on_region_frame()
+    print("模板清单测试通过")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.capture_backends import CaptureBackend, register_capture_backend
+from core.screen_capture import ScreenCapture
+
+
+@register_capture_backend("test_thread_bound")
+class ThreadBoundBackend(CaptureBackend):
+    """模拟mss：实例只能在创建它的线程中使用"""
+    
+    thread_safe = False
+    requires_display = False
+    instances = []
+    
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.owner = threading.get_ident()
+        self.closed = False
+        self.screen = np.arange(200 * 300 * 3, dtype=np.uint8).reshape(200, 300, 3)
+        ThreadBoundBackend.instances.append(self)
+    
+    def grab(self, monitor=None):
+        assert threading.get_ident() == self.owner, "后端被跨线程使用"
+        if monitor is None:
+            return self.screen
+        left, top = monitor["left"], monitor["top"]
+        return self.screen[top:top + monitor["height"], left:left + monitor["width"]]
+    
+    def close(self):
+        self.closed = True
+
+
+def test_capture_region_from_thread_pool():
+    """线程池中并发捕获时每个线程惰性创建自己的后端，线程结束后自动关闭"""
+    ThreadBoundBackend.instances.clear()
+    screen_capture = ScreenCapture({"capture_method": "test_thread_bound", "quality": "high",
+                                    "use_delay": False, "frame_mode": "zero_copy", "color_mode": "bgr"})
+    
+    def grab(index):
+        x = index % 10 * 20
+        region = screen_capture.capture_region(x, 10, x + 20, 30)
+        return np.array_equal(region, screen_capture.backend.screen[10:30, x:x + 20])
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert all(pool.map(grab, range(200)))
+    
+    worker_backends = ThreadBoundBackend.instances[1:]
+    assert 1 <= len(worker_backends) <= 4
+    assert all(backend.closed for backend in worker_backends)
+    assert not screen_capture.backend.closed
+
+
+if __name__ == "__main__":
+    test_capture_region_from_thread_pool()
+    print("多线程捕获测试通过")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import tempfile
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.screen_capture import ScreenCapture
+
+
+class FakeWin32:
+    """模拟win32gui的窗口查询接口"""
+    
+    def __init__(self, hwnd, rect):
+        self.hwnd = hwnd
+        self.rect = rect
+        self.calls = 0
+    
+    def IsWindow(self, hwnd):
+        return hwnd == self.hwnd
+    
+    def IsIconic(self, hwnd):
+        return False
+    
+    def GetWindowRect(self, hwnd):
+        self.calls += 1
+        return self.rect
+    
+    def GetClientRect(self, hwnd):
+        self.calls += 1
+        left, top, right, bottom = self.rect
+        return (0, 0, right - left, bottom - top)
+    
+    def ClientToScreen(self, hwnd, point):
+        return (self.rect[0] + point[0], self.rect[1] + point[1])
+
+
+def test_capture_follows_window():
+    """捕获区域跟随窗口移动，间隔内不重复查询窗口"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "frames.npy")
+        screen = np.random.randint(0, 255, (1, 300, 400, 3), dtype=np.uint8)
+        np.save(source, screen)
+        screen_capture = ScreenCapture({"capture_method": "replay", "quality": "high", "use_delay": False,
+                                        "replay": {"source": source, "loop": True}})
+        
+        win32 = FakeWin32(hwnd=42, rect=(10, 20, 110, 80))
+        assert screen_capture.bind_window(hwnd=42, revalidate_interval=60, win32=win32)
+        frame = screen_capture.capture_frame()
+        assert frame.region == (10, 20, 110, 80)
+        assert np.array_equal(frame.image, screen[0, 20:80, 10:110])
+        
+        # 间隔内窗口移动不会被立即察觉，也不会重复查询
+        win32.rect = (50, 60, 250, 160)
+        calls = win32.calls
+        assert screen_capture.capture_frame().region == (10, 20, 110, 80)
+        assert win32.calls == calls
+        
+        screen_capture.window_target.revalidate_interval = 0
+        frame = screen_capture.capture_frame()
+        assert frame.region == (50, 60, 250, 160)
+        assert np.array_equal(frame.image, screen[0, 60:160, 50:250])
+        assert screen_capture.window_target.get_stats()["rect_changes"] == 1
+
+
+if __name__ == "__main__":
+    test_capture_follows_window()
+    print("窗口绑定捕获测试通过")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import threading
+import cv2
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.capture_backends import CaptureBackend, register_capture_backend
+from core.screen_capture import ScreenCapture
+
+
+@register_capture_backend("test_bgra_raw")
+class BgraRawBackend(CaptureBackend):
+    """模拟mss：每次抓取覆盖同一个BGRA原始缓冲区并返回只读视图"""
+
+    color_order = "BGRA"
+    requires_display = False
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.raw = np.zeros((48, 64, 4), dtype=np.uint8)
+        self.count = 0
+
+    def grab(self, monitor=None):
+        self.count += 1
+        rng = np.random.default_rng(self.count)
+        self.raw[:] = rng.integers(0, 255, self.raw.shape, dtype=np.uint8)
+        view = self.raw.view()
+        view.flags.writeable = False
+        return view
+
+
+def _config(**overrides):
+    return dict({"capture_method": "test_bgra_raw", "frame_mode": "zero_copy", "quality": "high", "use_delay": False},
+                **overrides)
+
+
+def test_zero_copy_outputs_gray_into_reused_buffer():
+    """零拷贝模式一次性转换为灰度图并写入复用的输出缓冲区"""
+    screen_capture = ScreenCapture(_config())
+    backend = screen_capture._get_backend()
+
+    first = screen_capture.capture()
+    expected_first = cv2.cvtColor(backend.raw, cv2.COLOR_BGRA2GRAY)
+    assert first.shape == (48, 64) and np.array_equal(first, expected_first)
+    assert not np.shares_memory(first, backend.raw)  # 不把后端内部缓冲区直接交给调用方
+
+    kept = screen_capture.capture_frame().copy()
+    second = screen_capture.capture()
+    # 输出缓冲区被复用：之前返回的数组被下一帧覆盖，copy()得到的帧不受影响
+    assert second is first
+    assert np.array_equal(first, cv2.cvtColor(backend.raw, cv2.COLOR_BGRA2GRAY))
+    assert not np.array_equal(kept.image, first)
+    assert not np.shares_memory(kept.image, first)
+
+
+def test_zero_copy_scaled_and_bgr_buffers_reused():
+    """缩放和BGR颜色模式同样复用各自的缓冲区"""
+    screen_capture = ScreenCapture(_config(quality="low"))
+    first = screen_capture.capture()
+    assert first.shape == (24, 32)
+    assert screen_capture.capture() is first
+
+    screen_capture = ScreenCapture(_config(color_mode="bgr"))
+    first = screen_capture.capture()
+    backend = screen_capture._get_backend()
+    assert first.shape == (48, 64, 3)
+    assert np.array_equal(first, cv2.cvtColor(backend.raw, cv2.COLOR_BGRA2BGR))
+    assert screen_capture.capture() is first
+
+
+def test_standard_mode_allocates_per_frame():
+    """标准模式每次返回新分配的数组"""
+    screen_capture = ScreenCapture(_config(frame_mode="standard"))
+    first = screen_capture.capture()
+    second = screen_capture.capture()
+    assert first.shape == (48, 64, 3)
+    assert not np.shares_memory(first, second)
+
+
+def test_zero_copy_buffers_are_per_thread():
+    """输出缓冲区按线程隔离，其他线程的捕获不会覆盖本线程的帧"""
+    screen_capture = ScreenCapture(_config())
+    mine = screen_capture.capture()
+    snapshot = mine.copy()
+    others = []
+    thread = threading.Thread(target=lambda: others.append(screen_capture.capture()))
+    thread.start()
+    thread.join()
+
+    assert others[0] is not mine and not np.shares_memory(others[0], mine)
+    assert np.array_equal(mine, snapshot)
+
+
+if __name__ == "__main__":
+    test_zero_copy_outputs_gray_into_reused_buffer()
+    test_zero_copy_scaled_and_bgr_buffers_reused()
+    test_standard_mode_allocates_per_frame()
+    test_zero_copy_buffers_are_per_thread()
+    print("零拷贝捕获测试通过")